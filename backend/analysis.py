@@ -5,9 +5,18 @@ from datetime import datetime, timedelta
 import google.generativeai as genai
 import yfinance as yf
 
+from database import init_db
+from news_store import NEWS_STORE
+from segment_log import SegmentLog
+
 # Load Env (or rely on system env)
 # In production, use python-dotenv. Here we assume exported vars.
+# Legacy archive; imported into news_items when that is empty, as the scraper does
 JSON_FILE = "moneycontrol_news.json"
+# Analysis results keyed by link, as an append-only segment log (see segment_log).
+# The articles themselves are only in the news store.
+ANALYSIS_LOG_DIR = os.getenv("ANALYSIS_LOG_DIR", "analysis_log")
+ANALYSIS_FIELDS = ("ticker", "suggested_question", "actual_impact")
 
 def init_gemini():
     api_key = os.getenv("GEMINI_API_KEY")
@@ -17,15 +26,23 @@ def init_gemini():
     genai.configure(api_key=api_key)
     return genai.GenerativeModel('gemini-2.5-flash')
 
-def load_news():
-    if os.path.exists(JSON_FILE):
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-def save_news(news_list):
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(news_list, f, indent=4, ensure_ascii=False)
+def load_news(log):
+    """The scraped articles (news store), with the analysis already in the log carried over by link."""
+    init_db()
+    if not NEWS_STORE.count() and os.path.exists(JSON_FILE):
+        print(f"Importing {JSON_FILE} into the news store...")
+        NEWS_STORE.import_json(JSON_FILE)
+    analysed = {result["link"]: result for result in log.load()}
+    news_list = NEWS_STORE.load()
+    for article in news_list:
+        result = analysed.get(article.link)
+        if result:
+            article.extra = {**(article.extra or {}), **{key: result.get(key) for key in ANALYSIS_FIELDS}}
+    return news_list
+
+def save_results(log, updated):
+    """Appends the analysis of the updated articles, one record per link."""
+    log.append([{"link": article.link, **{key: article.get(key) for key in ANALYSIS_FIELDS}} for article in updated])
 
 def extract_ticker(model, headline):
     prompt = f"""
@@ -47,10 +64,9 @@ def extract_ticker(model, headline):
         print(f"Gemini Error: {e}")
         return {"ticker": None, "short_question": None}
 
-def calculate_impact(ticker_symbol, news_timestamp_str):
+def calculate_impact(ticker_symbol, news_epoch):
     try:
-        # timestamp format: "YYYY-MM-DD HH:MM:SS"
-        news_time = datetime.strptime(news_timestamp_str, "%Y-%m-%d %H:%M:%S")
+        news_time = datetime.fromtimestamp(news_epoch)
         
         # If news is after market close (3:30 PM), look at next day
         if news_time.hour >= 15 and news_time.minute >= 30:
@@ -86,8 +102,10 @@ def main():
     if not model:
         return
 
-    news_list = load_news()
+    log = SegmentLog(ANALYSIS_LOG_DIR)
+    news_list = load_news(log)
     updated_count = 0
+    pending = []
 
     print(f"Processing {len(news_list)} news items...")
 
@@ -96,21 +114,22 @@ def main():
         if "ticker" in item and "actual_impact" in item:
             continue
 
-        print(f"Analyzing: {item['headline'][:50]}...")
+        print(f"Analyzing: {(item.headline or '')[:50]}...")
         
         # 1. Extract Ticker & Question
-        result = extract_ticker(model, item['headline'])
+        result = extract_ticker(model, item.headline)
         ticker = result.get('ticker')
         question = result.get('short_question')
         
-        item['ticker'] = ticker
-        item['suggested_question'] = question
+        # Analysis fields aren't part of the article schema; they ride along in `extra`
+        item.extra = {**(item.extra or {}), 'ticker': ticker, 'suggested_question': question}
         
         # 2. Calculate Impact if ticker found
         impact = None
         if ticker:
             print(f"  -> Found Ticker: {ticker} | Q: {question}")
-            impact = calculate_impact(ticker, item['timestamp'])
+            if item.epoch is not None:
+                impact = calculate_impact(ticker, item.epoch)
             if impact is not None:
                 print(f"  -> Impact: {impact}%")
             else:
@@ -118,17 +137,20 @@ def main():
         else:
             print("  -> No specific ticker identified.")
 
-        item['actual_impact'] = impact
+        item.extra['actual_impact'] = impact
         updated_count += 1
+        pending.append(item)
         
         # Rate limiting to be safe
         time.sleep(1) 
 
         # Save periodically
         if updated_count % 5 == 0:
-            save_news(news_list)
+            save_results(log, pending)
+            pending = []
 
-    save_news(news_list)
+    save_results(log, pending)
+    log.close()
     print(f"Analysis Complete. Updated {updated_count} items.")
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+"""
+Response helpers shared by the API routes: fast JSON rendering and
+negotiated gzip/Brotli compression with a cache of precompressed bodies.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed (several times faster
+    than the stdlib encoder for the feed), falling back to the regular JSONResponse.
+    Content must already be plain JSON types; routes return it directly so
+    FastAPI's jsonable_encoder pass is skipped as well.
+    """
+
+    def render(self, content):
+        if orjson is None:
+            return super().render(content)
+        # yfinance values are often numpy scalars
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Bodies smaller than this aren't worth compressing
+COMPRESS_MIN_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def negotiate_encoding(accept_encoding):
+    """Picks br (if the brotli package is available) or gzip from an Accept-Encoding header."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    def allowed(name):
+        return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return "identity"
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class CompressedResponseCache:
+    """
+    LRU of rendered response bodies keyed by (key, data version, encoding).
+    Each body is rendered and compressed once per data version and then
+    reused until the version changes; old versions simply age out.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, cache_key):
+        with self.lock:
+            body = self.entries.get(cache_key)
+            if body is not None:
+                self.entries.move_to_end(cache_key)
+            return body
+
+    def _put(self, cache_key, body):
+        with self.lock:
+            self.entries[cache_key] = body
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_body(self, key, version, encoding, render):
+        """Returns (body, encoding actually used), rendering/compressing only on a miss."""
+        cache_key = (key, version, encoding)
+        body = self._get(cache_key)
+        if body is not None:
+            self.hits += 1
+            return body, encoding
+        self.misses += 1
+
+        raw = self._get((key, version, "identity"))
+        if raw is None:
+            raw = render()
+            self._put((key, version, "identity"), raw)
+        if encoding == "identity" or len(raw) < COMPRESS_MIN_SIZE:
+            return raw, "identity"
+
+        body = compress(raw, encoding)
+        self._put(cache_key, body)
+        return body, encoding
+
+    def stats(self):
+        with self.lock:
+            size = sum(len(body) for body in self.entries.values())
+        return {"entries": len(self.entries), "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+RESPONSE_CACHE = CompressedResponseCache()
+
+
+def _encoded_response(body, encoding, headers=None):
+    response_headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    if headers:
+        response_headers.update(headers)
+    return Response(content=body, media_type="application/json", headers=response_headers)
+
+
+def compressed_json_response(request, content, headers=None):
+    """JSON response compressed per request, for large responses that aren't worth caching."""
+    body = FastJSONResponse(content).body
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding == "identity" or len(body) < COMPRESS_MIN_SIZE:
+        return _encoded_response(body, "identity", headers)
+    return _encoded_response(compress(body, encoding), encoding, headers)
+
+
+def cached_json_response(request, key, version, build_content, headers=None):
+    """
+    JSON response for a cacheable endpoint. `build_content` is only called
+    when (key, version) hasn't been rendered yet; the rendered bytes and
+    their gzip/br variants are reused for every later request.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body, used = RESPONSE_CACHE.get_body(
+        key, version, encoding,
+        lambda: FastJSONResponse(build_content()).body
+    )
+    return _encoded_response(body, used, headers)
@@ -0,0 +1,245 @@
+"""
+Typed, compact article record.
+
+Articles used to travel through the pipeline as loose dicts: timestamps as
+display strings ("29 Jan 2026, 08:33 PM") that every consumer re-parsed
+with its own strptime chain, sentiment scores that were sometimes strings,
+and one copy of every category and label string per article. An Article
+is normalized once, when it is built:
+
+- timestamp -> epoch (float seconds), by a compiled parser covering every
+  format the site and the stored data use
+- category and sentiment label -> interned strings
+- sentiment_score -> float
+- stock_symbols -> tuple
+- the body is not held: Article.body loads it from the article store on
+  demand (an article built at ingest carries its freshly fetched body until
+  it is saved)
+
+to_dict / from_dict convert to and from the JSON shape the API, the news
+store and the legacy archive use, and an Article also reads like that dict
+(item["timestamp"], item.get(...), "full_content" in item, dict(item)), so
+code that only reads articles works with either.
+"""
+import re
+import sys
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%d %b %Y, %I:%M %p"
+
+MONTHS = {}
+for _number, _name in enumerate(("january", "february", "march", "april", "may", "june", "july",
+                                  "august", "september", "october", "november", "december"), 1):
+    MONTHS[_name] = _number
+    MONTHS[_name[:3]] = _number
+MONTHS["sept"] = 9
+
+# "29 Jan 2026, 08:33 PM" (the stored format) and "29 January 2026, 08:33 PM"
+_DAY_MONTH_RE = re.compile(r"^\s*(\d{1,2}) ([A-Za-z]+) (\d{4}), (\d{1,2}):(\d{2}) ([AaPp][Mm])\s*$")
+# "January 27, 2026 13:06 IST"
+_MONTH_DAY_RE = re.compile(r"^\s*([A-Za-z]+) (\d{1,2}), (\d{4}) (\d{1,2}):(\d{2}) IST\s*$")
+# "27-01-2026 13:06:00"
+_DMY_RE = re.compile(r"^\s*(\d{1,2})-(\d{1,2})-(\d{4}) (\d{1,2}):(\d{2}):(\d{2})\s*$")
+
+
+def _epoch(year, month, day, hour, minute, second=0):
+    try:
+        return datetime(year, month, day, hour, minute, second).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_timestamp(ts):
+    """
+    Epoch seconds for a timestamp in any format the site or the stored data use, or None.
+    Times are wall-clock times as the site shows them, read as local time (as the
+    stored strings always have been); an ISO offset only says which wall clock that is.
+    """
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    if not ts or not isinstance(ts, str):
+        return None
+    match = _DAY_MONTH_RE.match(ts)
+    if match:
+        day, month, year, hour, minute, ampm = match.groups()
+        month = MONTHS.get(month.lower())
+        hour = int(hour)
+        if month is None or not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm.upper() == "PM" else 0)
+        return _epoch(int(year), month, int(day), hour, int(minute))
+    match = _MONTH_DAY_RE.match(ts)
+    if match:
+        month, day, year, hour, minute = match.groups()
+        month = MONTHS.get(month.lower())
+        return _epoch(int(year), month, int(day), int(hour), int(minute)) if month else None
+    match = _DMY_RE.match(ts)
+    if match:
+        day, month, year, hour, minute, second = map(int, match.groups())
+        return _epoch(year, month, day, hour, minute, second)
+    try:
+        # ISO 8601, from JSON-LD ("2026-01-29T20:33:00+05:30") or "2026-01-29 20:33:00"
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).replace(tzinfo=None).timestamp()
+    except ValueError:
+        return None
+
+
+def format_timestamp(epoch):
+    """The stored display format for an epoch ("29 Jan 2026, 08:33 PM"), or None."""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch).strftime(TIMESTAMP_FORMAT)
+
+
+def _label(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Article:
+    __slots__ = ("link", "headline", "category", "description", "image_url", "epoch",
+                 "sentiment", "sentiment_score", "stock_symbols", "extra", "_body")
+
+    # Keys of the JSON shape backed by a slot, in output order; anything else lives in `extra`
+    FIELDS = ("category", "headline", "link", "description", "image_url", "timestamp",
+              "sentiment", "sentiment_score", "stock_symbols")
+
+    def __init__(self, link, headline=None, category=None, description=None, image_url=None, epoch=None,
+                 sentiment="neutral", sentiment_score=0.0, stock_symbols=None, extra=None, body=None):
+        self.link = link
+        self.headline = headline
+        self.category = _label(category)
+        self.description = description
+        self.image_url = image_url
+        self.epoch = epoch
+        self.sentiment = _label(sentiment)
+        self.sentiment_score = _score(sentiment_score)
+        # None until the article has been tagged
+        self.stock_symbols = tuple(stock_symbols) if stock_symbols is not None else None
+        self.extra = extra or None
+        self._body = body
+
+    @classmethod
+    def from_dict(cls, item):
+        """Builds an Article from the JSON shape (or returns it if it already is one)."""
+        if isinstance(item, Article):
+            return item
+        extra = {key: value for key, value in item.items() if key not in _DICT_KEYS}
+        return cls(
+            item.get("link"),
+            headline=item.get("headline"),
+            category=item.get("category"),
+            description=item.get("description"),
+            image_url=item.get("image_url"),
+            epoch=parse_timestamp(item.get("timestamp")),
+            sentiment=item.get("sentiment") or "neutral",
+            sentiment_score=item.get("sentiment_score"),
+            stock_symbols=item.get("stock_symbols"),
+            extra=extra,
+            body=item.get("full_content"),
+        )
+
+    def to_dict(self, body=False):
+        """The JSON shape; with body=True the body is included (loaded if the article doesn't carry it)."""
+        item = {key: self[key] for key in self.keys() if key != "full_content"}
+        if body:
+            item["full_content"] = self.body
+        return item
+
+    @property
+    def timestamp(self):
+        return format_timestamp(self.epoch)
+
+    @property
+    def has_body(self):
+        """True if the body travels with the article (fetched, not yet saved)."""
+        return self._body is not None
+
+    @property
+    def body(self):
+        if self._body is not None:
+            return self._body
+        # Imported here: the article store builds on this module
+        from article_store import ARTICLE_STORE
+        return ARTICLE_STORE.body(self.link)
+
+    def without_body(self):
+        """This article without the body it carries: the form snapshots keep."""
+        if self._body is None:
+            return self
+        return Article(self.link, self.headline, self.category, self.description, self.image_url, self.epoch,
+                       self.sentiment, self.sentiment_score, self.stock_symbols, self.extra)
+
+    def merged(self, changes):
+        """A new Article with the fields in `changes` (JSON shape) replacing this one's."""
+        return Article.from_dict({**self.to_dict(), **({"full_content": self._body} if self._body else {}), **changes})
+
+    # --- read-only dict interface, in the JSON shape ---
+
+    def keys(self):
+        keys = ["category", "headline", "link"]
+        if self.description is not None:
+            keys.append("description")
+        keys += ["image_url", "timestamp", "sentiment", "sentiment_score"]
+        if self.stock_symbols is not None:
+            keys.append("stock_symbols")
+        if self.extra:
+            keys += self.extra
+        if self._body is not None:
+            keys.append("full_content")
+        return keys
+
+    def __getitem__(self, key):
+        if key == "timestamp":
+            return format_timestamp(self.epoch)
+        if key == "full_content":
+            if self._body is None:
+                raise KeyError(key)
+            return self._body
+        if key in _SLOT_KEYS:
+            value = getattr(self, key)
+            if value is None and key in ("description", "stock_symbols"):
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return self.to_dict() == other.to_dict() and self._body == other._body
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Article({self.link!r}, {self.headline!r}, {self.timestamp!r})"
+
+
+_SLOT_KEYS = frozenset(Article.FIELDS) - {"timestamp"}
+_DICT_KEYS = frozenset(Article.FIELDS) | {"full_content"}
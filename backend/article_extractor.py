@@ -0,0 +1,204 @@
+"""
+Single-pass article extractor.
+
+One parse of an article page yields everything deep fetch needs: image
+(og:image / JSON-LD), publish time (JSON-LD, meta tags, article_schedule,
+<time>) and body (JSON-LD articleBody, else the content container's
+paragraphs). The page is parsed with lxml when it is installed, which is
+several times faster than BeautifulSoup's html.parser; otherwise the same
+lookups run on BeautifulSoup.
+"""
+import html as html_lib
+import json
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+from bs4 import BeautifulSoup
+
+NO_CONTENT = "Could not extract article content."
+
+# Paragraph filters for the content-container fallback
+MIN_PARAGRAPH_LENGTH = 30
+NOISE_PHRASES = ["read also", "click here", "read more", "follow us on", "download", "whatsapp channel"]
+
+CONTENT_CONTAINERS = [("class", "content_wrapper"), ("class", "arti-flow"), ("id", "article-main")]
+REMOVED_TAGS = ("script", "style", "aside")
+
+
+def _has_class(value, name):
+    return name in (value or "").split()
+
+
+class _LxmlPage:
+    """Lookups over an lxml tree."""
+
+    def __init__(self, html):
+        try:
+            self.root = lxml_html.fromstring(html)
+        except ValueError:
+            # Pages with an XML encoding declaration must be parsed from bytes
+            self.root = lxml_html.fromstring(html.encode("utf-8"))
+
+    def meta(self, attr, value):
+        for el in self.root.iter("meta"):
+            if el.get(attr) == value:
+                return el.get("content")
+        return None
+
+    def ld_json(self):
+        return [el.text for el in self.root.iter("script") if el.get("type") == "application/ld+json" and el.text]
+
+    def schedule_text(self):
+        for el in self.root.iter("span"):
+            if _has_class(el.get("class"), "article_schedule"):
+                return "".join(t.strip() for t in el.itertext())
+        return None
+
+    def time_value(self):
+        for el in self.root.iter("time"):
+            return el.get("datetime") or "".join(t.strip() for t in el.itertext())
+        return None
+
+    def content_paragraphs(self):
+        container = None
+        for attr, value in CONTENT_CONTAINERS:
+            for el in self.root.iter("div"):
+                if (attr == "class" and _has_class(el.get("class"), value)) or (attr == "id" and el.get("id") == value):
+                    container = el
+                    break
+            if container is not None:
+                break
+        if container is None:
+            return None
+        for el in list(container.iter(*REMOVED_TAGS)):
+            el.drop_tree()
+        return ["".join(t.strip() for t in p.itertext()) for p in container.iter("p")]
+
+
+class _SoupPage:
+    """The same lookups over BeautifulSoup (html.parser), used when lxml is not installed."""
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, "html.parser")
+
+    def meta(self, attr, value):
+        el = self.soup.find("meta", attrs={attr: value})
+        return el.get("content") if el else None
+
+    def ld_json(self):
+        return [s.string for s in self.soup.find_all("script", type="application/ld+json") if s.string]
+
+    def schedule_text(self):
+        el = self.soup.find("span", class_="article_schedule")
+        return el.get_text(strip=True) if el else None
+
+    def time_value(self):
+        el = self.soup.find("time")
+        return (el.get("datetime") or el.get_text(strip=True)) if el else None
+
+    def content_paragraphs(self):
+        container = None
+        for attr, value in CONTENT_CONTAINERS:
+            container = self.soup.find("div", class_=value) if attr == "class" else self.soup.find("div", id=value)
+            if container:
+                break
+        if not container:
+            return None
+        for tag in container(list(REMOVED_TAGS)):
+            tag.decompose()
+        return [p.get_text(strip=True) for p in container.find_all("p")]
+
+
+def _ld_objects(page):
+    """Parsed JSON-LD objects. strict=False accepts the raw newlines Moneycontrol leaves in articleBody."""
+    objects = []
+    for text in page.ld_json():
+        try:
+            data = json.loads(text, strict=False)
+        except ValueError:
+            continue
+        if isinstance(data, list):
+            objects.extend(d for d in data if isinstance(d, dict))
+        elif isinstance(data, dict):
+            objects.append(data)
+    return objects
+
+
+def _ld_image(image):
+    if isinstance(image, dict):
+        return image.get("url")
+    if isinstance(image, list) and image:
+        return _ld_image(image[0])
+    if isinstance(image, str):
+        return image
+    return None
+
+
+def _clean_paragraphs(paragraphs):
+    clean_text = []
+    for text in paragraphs:
+        # Filter out garbage commonly causing hallucinations
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+        text_lower = text.lower()
+        # Stop phrases that indicate the end of the article
+        if "disclaimer" in text_lower and len(text) < 100:
+            break
+        if "copyright" in text_lower and "all rights reserved" in text_lower:
+            break
+        # Skip promotional/link noise
+        if any(phrase in text_lower for phrase in NOISE_PHRASES):
+            continue
+        clean_text.append(text)
+    return "\n\n".join(clean_text)
+
+
+def parse_page(html, use_lxml=True):
+    if use_lxml and lxml_html is not None:
+        return _LxmlPage(html)
+    return _SoupPage(html)
+
+
+def extract_article(html, image_url=None, timestamp=None, use_lxml=True):
+    """
+    Image URL, raw publish timestamp and body text from one article page.
+    `image_url` / `timestamp` are kept where the page doesn't provide one
+    (og:image still overrides the image, as before). Returns a dict with
+    image_url, timestamp and full_content.
+    """
+    if not html or not html.strip():
+        return {"image_url": image_url, "timestamp": timestamp, "full_content": None}
+    page = parse_page(html, use_lxml)
+
+    # Extract high-quality image from OG tag
+    image_url = page.meta("property", "og:image") or image_url
+
+    ld_objects = _ld_objects(page)
+    body = None
+    for data in ld_objects:
+        if not timestamp and data.get("datePublished"):
+            timestamp = data["datePublished"]
+        if not image_url and data.get("image"):
+            image_url = _ld_image(data["image"])
+        text = data.get("articleBody")
+        if body is None and isinstance(text, str) and len(text) > 100:
+            body = html_lib.unescape(text)
+
+    # Meta tag fallbacks for the publish time
+    if not timestamp:
+        timestamp = (page.meta("property", "article:published_time")
+                     or page.meta("property", "og:article:published_time")
+                     or page.meta("name", "datePublished")
+                     or page.meta("property", "og:published_time"))
+    # MoneyControl often has publish time in span with class "article_schedule", else a <time> element
+    if not timestamp:
+        timestamp = page.schedule_text() or page.time_value()
+
+    if body is None:
+        paragraphs = page.content_paragraphs()
+        body = _clean_paragraphs(paragraphs) if paragraphs is not None else NO_CONTENT
+
+    return {"image_url": image_url, "timestamp": timestamp, "full_content": body}
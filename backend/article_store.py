@@ -0,0 +1,243 @@
+"""
+Persistent article store: compressed bodies on disk, a bounded hot tier in memory.
+
+Article bodies (full_content) live zlib-compressed in the article_bodies
+table instead of on every article dict, so the published news snapshot
+and the search index only hold metadata. A body is decompressed when
+something actually needs it: /news/article, summaries, watchlist
+notifications, search indexing.
+
+Point reads (body) go through a hot tier: an LRU bounded by the
+uncompressed bytes it holds (ARTICLE_HOT_BYTES), so memory stays flat
+however many articles are retained. Bulk scans (bodies) bypass it by
+default, so one pass over the archive doesn't evict the hot set.
+
+A write drops the bodies it replaced from the hot tier once it has
+committed, and a read that overlapped such a write doesn't admit what it
+loaded: it may be the old row, read before the commit.
+
+The store also answers what the scraper used to keep in ARTICLE_CACHE:
+which listed articles were already deep-fetched, and their details.
+"""
+import collections
+import hashlib
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from article import TIMESTAMP_FORMAT
+from database import IN_BATCH_SIZE, WRITE_BATCH_SIZE, ReadSessionLocal, ArticleBody, NewsItem, chunks
+from db_writer import DB_WRITER
+
+# Uncompressed bytes of article bodies kept in memory
+ARTICLE_HOT_BYTES = int(os.getenv("ARTICLE_HOT_BYTES", str(16 * 1024 * 1024)))
+ARTICLE_COMPRESSION_LEVEL = int(os.getenv("ARTICLE_COMPRESSION_LEVEL", "6"))
+
+
+def body_hash(raw):
+    return hashlib.sha1(raw).hexdigest()
+
+
+def compress_body(raw):
+    return zlib.compress(raw, ARTICLE_COMPRESSION_LEVEL)
+
+
+def decompress_body(data):
+    return zlib.decompress(data).decode("utf-8")
+
+
+class ArticleStore:
+    def __init__(self, db_session_factory=ReadSessionLocal, writer=DB_WRITER, hot_bytes=ARTICLE_HOT_BYTES):
+        # Reads use their own (read-only) sessions; writes go through the single-writer queue
+        self.db_session_factory = db_session_factory
+        self.writer = writer
+        self.hot_bytes = hot_bytes
+        self.hot = collections.OrderedDict()   # link -> (body, size), most recently used last
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.forgets = 0   # committed writes that dropped hot entries; reads spanning one don't admit
+        self.lock = threading.Lock()
+
+    # --- hot tier ---
+
+    def _admit(self, link, body, size):
+        if size > self.hot_bytes:
+            return
+        old = self.hot.pop(link, None)
+        if old is not None:
+            self.resident_bytes -= old[1]
+        self.hot[link] = (body, size)
+        self.resident_bytes += size
+        while self.resident_bytes > self.hot_bytes:
+            _, (_, evicted_size) = self.hot.popitem(last=False)
+            self.resident_bytes -= evicted_size
+            self.evictions += 1
+
+    def _forget(self, links):
+        with self.lock:
+            self.forgets += 1
+            for link in links:
+                old = self.hot.pop(link, None)
+                if old is not None:
+                    self.resident_bytes -= old[1]
+
+    # --- reads ---
+
+    def _load(self, links):
+        """{link: (body, size)} straight from the table."""
+        loaded = {}
+        db = self.db_session_factory()
+        try:
+            for chunk in chunks(links, IN_BATCH_SIZE):
+                rows = (db.query(ArticleBody.link, ArticleBody.body, ArticleBody.size)
+                        .filter(ArticleBody.link.in_(chunk)).all())
+                for link, data, size in rows:
+                    loaded[link] = (decompress_body(data), size)
+        except Exception as e:
+            # e.g. the table doesn't exist yet; treat everything as missing
+            print(f"Error reading article bodies: {e}")
+        finally:
+            db.close()
+        with self.lock:
+            self.loads += len(loaded)
+        return loaded
+
+    def bodies(self, links, cache=False):
+        """
+        {link: full_content} for the stored ones among `links`. Hot entries are used either way;
+        with cache=True the loaded bodies are also admitted to the hot tier.
+        """
+        links = [link for link in dict.fromkeys(links) if link]
+        found = {}
+        with self.lock:
+            forgets = self.forgets
+            for link in links:
+                entry = self.hot.get(link)
+                if entry is not None:
+                    self.hot.move_to_end(link)
+                    found[link] = entry[0]
+            self.hits += len(found)
+        missing = [link for link in links if link not in found]
+        if missing:
+            loaded = self._load(missing)
+            with self.lock:
+                self.misses += len(missing)
+                admit = cache and self.forgets == forgets
+                for link, (body, size) in loaded.items():
+                    found[link] = body
+                    if admit:
+                        self._admit(link, body, size)
+        return found
+
+    def body(self, link):
+        """One article's full_content (None if it was never fetched), through the hot tier."""
+        return self.bodies([link], cache=True).get(link)
+
+    def details(self, links):
+        """
+        Stored details of the `links` that were already deep-fetched (have a body):
+        {link: {"image_url", "timestamp", "sentiment", "sentiment_score"}}. No bodies are loaded.
+        """
+        details = {}
+        db = self.db_session_factory()
+        try:
+            for chunk in chunks(dict.fromkeys(links), IN_BATCH_SIZE):
+                rows = (db.query(NewsItem.link, NewsItem.image_url, NewsItem.timestamp,
+                                 NewsItem.sentiment, NewsItem.sentiment_score)
+                        .join(ArticleBody, ArticleBody.link == NewsItem.link)
+                        .filter(NewsItem.link.in_(chunk)).all())
+                for link, image_url, timestamp, sentiment, sentiment_score in rows:
+                    details[link] = {
+                        "image_url": image_url,
+                        "timestamp": timestamp.strftime(TIMESTAMP_FORMAT) if timestamp else None,
+                        "sentiment": sentiment,
+                        "sentiment_score": sentiment_score,
+                    }
+        except Exception as e:
+            print(f"Error reading article details: {e}")
+        finally:
+            db.close()
+        return details
+
+    # --- writes (inside a DB_WRITER operation) ---
+
+    def write(self, db, bodies):
+        """Stores new or changed bodies ({link: full_content}). Returns how many were written."""
+        bodies = {link: body for link, body in bodies.items() if link and body is not None}
+        if not bodies:
+            return 0
+        stored = {}
+        for chunk in chunks(bodies, IN_BATCH_SIZE):
+            stored.update(db.query(ArticleBody.link, ArticleBody.body_hash).filter(ArticleBody.link.in_(chunk)).all())
+
+        now = datetime.now()
+        rows = []
+        for link, body in bodies.items():
+            raw = body.encode("utf-8")
+            digest = body_hash(raw)
+            # Unchanged bodies cost a hash, not a compression
+            if stored.get(link) != digest:
+                rows.append({"link": link, "body": compress_body(raw), "size": len(raw), "body_hash": digest,
+                             "updated_at": now})
+        for batch in chunks(rows, WRITE_BATCH_SIZE):
+            stmt = insert(ArticleBody).values(batch)
+            updates = {column: stmt.excluded[column] for column in batch[0] if column != "link"}
+            db.execute(stmt.on_conflict_do_update(index_elements=[ArticleBody.link], set_=updates))
+        # A rewritten body must not be served from the hot tier; dropped once the new one is visible
+        written = [row["link"] for row in rows]
+        if written:
+            self.writer.after_commit(lambda: self._forget(written))
+        return len(rows)
+
+    def delete(self, db, links):
+        links = list(links)
+        removed = 0
+        for chunk in chunks(links, IN_BATCH_SIZE):
+            removed += db.query(ArticleBody).filter(ArticleBody.link.in_(chunk)).delete(synchronize_session=False)
+        self.writer.after_commit(lambda: self._forget(links))
+        return removed
+
+    def put_many(self, bodies):
+        return self.writer.run(lambda db: self.write(db, bodies))
+
+    def invalidate(self, link):
+        """Drops an article's body, so the next scrape that lists it deep-fetches it again."""
+        return self.writer.run(lambda db: self.delete(db, [link]))
+
+    # --- inspection ---
+
+    def stats(self):
+        db = self.db_session_factory()
+        try:
+            stored, stored_bytes, raw_bytes = db.query(
+                func.count(ArticleBody.link), func.sum(func.length(ArticleBody.body)), func.sum(ArticleBody.size)).one()
+        except Exception:
+            stored, stored_bytes, raw_bytes = None, None, None
+        finally:
+            db.close()
+        total = self.hits + self.misses
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+                "loads": self.loads,
+                "hot_entries": len(self.hot),
+                "resident_bytes": self.resident_bytes,
+                "hot_bytes_limit": self.hot_bytes,
+                "stored_articles": stored,
+                "stored_bytes": stored_bytes,
+                "uncompressed_bytes": raw_bytes,
+            }
+
+
+# Shared store used by the scraper, the news store and the API
+ARTICLE_STORE = ArticleStore()
@@ -0,0 +1,53 @@
+"""
+Benchmark: article page extraction, BeautifulSoup (html.parser) vs. lxml.
+
+Both run the same single-pass extract_article over stand-in article pages
+(no server needed) and report pages per second. Before the unified
+extractor, each article was fetched and parsed twice with html.parser,
+once for metadata and once for the body; that cost is shown as well.
+
+Run from the backend directory:
+    python benchmarks/bench_article_extractor.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from article_extractor import extract_article, lxml_html
+from standin import StandinServer
+
+CATEGORIES = ["Markets", "Economy", "Companies", "Stocks"]
+ROUNDS = 3
+
+
+def bench(pages, use_lxml):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for html in pages:
+            extract_article(html, use_lxml=use_lxml)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    standin = StandinServer(CATEGORIES, articles_per_category=25)
+    pages = [standin.article_html(path) for path in standin._articles]
+    size = sum(len(p) for p in pages) / len(pages)
+    print(f"{len(pages)} stand-in article pages, {size / 1024:.0f} KB each")
+
+    soup = bench(pages, use_lxml=False)
+    print(f"legacy (2 parses): {len(pages) / (soup * 2):7.1f} pages/s")
+    print(f"html.parser:       {len(pages) / soup:7.1f} pages/s")
+    if lxml_html is None:
+        print("lxml:              not installed")
+        return
+    fast = bench(pages, use_lxml=True)
+    print(f"lxml:              {len(pages) / fast:7.1f} pages/s ({soup / fast:.1f}x html.parser)")
+
+
+if __name__ == "__main__":
+    main()
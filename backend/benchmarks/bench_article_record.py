@@ -0,0 +1,99 @@
+"""
+Benchmark: 100k articles as loose dicts vs. Article records.
+
+    memory      bytes held by 100k articles loaded from JSON (tracemalloc): the
+                dicts as parsed, vs. Articles built from them with the dicts dropped
+    timestamps  parsing every timestamp: the strptime chain consumers used
+                (try the stored format, fall back to ISO) vs. the compiled parser
+    convert     from_dict / to_dict, per article
+    recent      a typical consumer pass, "articles of the last 7 days, newest
+                first": dicts re-parse each timestamp string, Articles compare epochs
+
+Run from the backend directory:
+    python benchmarks/bench_article_record.py
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from article import Article, TIMESTAMP_FORMAT, parse_timestamp
+from synthetic_news import make_articles
+
+ARTICLES = 100_000
+
+
+def legacy_parse(ts):
+    try:
+        return datetime.strptime(ts, TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        try:
+            return datetime.fromisoformat(ts.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def traced(fn):
+    """Result of fn() and the bytes it leaves allocated."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    # What loading the archive gives: every string a separate object, scores sometimes strings
+    raw = json.dumps(make_articles(ARTICLES, with_content=False))
+
+    dicts, dict_bytes = traced(lambda: json.loads(raw))
+
+    def load_articles():
+        return [Article.from_dict(item) for item in json.loads(raw)]
+    articles, article_bytes = traced(load_articles)
+
+    stamps = [item["timestamp"] for item in dicts]
+    _, legacy_s = timed(lambda: [legacy_parse(ts) for ts in stamps])
+    _, compiled_s = timed(lambda: [parse_timestamp(ts) for ts in stamps])
+    _, from_s = timed(lambda: [Article.from_dict(item) for item in dicts])
+    _, to_s = timed(lambda: [article.to_dict() for article in articles])
+
+    cutoff = datetime.now() - timedelta(days=7)
+
+    def recent_dicts():
+        dated = [(datetime.strptime(item["timestamp"], TIMESTAMP_FORMAT), item) for item in dicts]
+        return [item for dt, item in sorted(dated, key=lambda pair: pair[0], reverse=True) if dt >= cutoff]
+
+    def recent_articles():
+        since = cutoff.timestamp()
+        return sorted((a for a in articles if a.epoch >= since), key=lambda a: a.epoch, reverse=True)
+
+    by_dicts, recent_dicts_s = timed(recent_dicts)
+    by_articles, recent_articles_s = timed(recent_articles)
+    assert [item["link"] for item in by_dicts] == [a.link for a in by_articles]
+
+    per = lambda seconds: seconds / ARTICLES * 1e6
+    print(f"{ARTICLES:,} articles (no bodies)")
+    print(f"  memory      dicts {dict_bytes / 2**20:7.1f} MB | Articles {article_bytes / 2**20:7.1f} MB "
+          f"({sys.getsizeof(dicts[0])} vs {sys.getsizeof(articles[0])} bytes per container)")
+    print(f"  timestamps  strptime {per(legacy_s):5.2f} us | compiled {per(compiled_s):5.2f} us per article")
+    print(f"  convert     from_dict {per(from_s):5.2f} us | to_dict {per(to_s):5.2f} us per article")
+    print(f"  recent      dicts {recent_dicts_s * 1000:7.1f} ms | Articles {recent_articles_s * 1000:7.1f} ms "
+          f"({len(by_articles):,} of the last 7 days)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: memory held for article bodies as retention grows, in-memory dict vs. ArticleStore.
+
+The old ARTICLE_CACHE kept every retained article's full_content in a dict.
+ArticleStore keeps bodies compressed in SQLite and only a hot tier, bounded
+by ARTICLE_HOT_BYTES, in memory. For each retention size this measures the
+memory each approach holds (the dict's bodies; what tracemalloc sees the
+store retain after a skewed read workload, 80% of reads going to the newest
+10% of articles), plus the hot tier's hit rate and the on-disk size of the
+compressed bodies.
+
+Run from the backend directory:
+    python benchmarks/bench_article_store.py
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy.orm import sessionmaker
+
+from article_store import ArticleStore
+from database import Base, create_write_engine
+from db_writer import DBWriter
+from synthetic_news import make_articles
+
+SIZES = [2_000, 10_000, 30_000]
+HOT_BYTES = 2 * 1024 * 1024
+READS = 5_000
+
+
+def reads(links, rng):
+    recent = links[:max(len(links) // 10, 1)]
+    return [rng.choice(recent) if rng.random() < 0.8 else rng.choice(links) for _ in range(READS)]
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    print(f"Hot tier {HOT_BYTES // 2**20} MiB, {READS:,} reads (80% to the newest 10%)")
+    for size in SIZES:
+        articles = make_articles(size)
+        links = [a["link"] for a in articles]
+        workload = reads(links, random.Random(7))
+
+        # The dict keeps every body alive, whichever ones are read
+        cache = {a["link"]: a["full_content"] for a in articles}
+        dict_mb = (sys.getsizeof(cache) + sum(sys.getsizeof(body) for body in cache.values())) / 2**20
+        del cache
+
+        engine = create_write_engine(os.path.join(tmp, f"articles_{size}.db"))
+        Base.metadata.create_all(bind=engine)
+        writer = DBWriter(sessionmaker(bind=engine))
+        store = ArticleStore(sessionmaker(bind=engine), writer=writer, hot_bytes=HOT_BYTES)
+        store.put_many({a["link"]: a["full_content"] for a in articles})
+        del articles
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for link in workload:
+            store.body(link)
+        read_us = (time.perf_counter() - start) / READS * 1e6
+        store_mb = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+
+        stats = store.stats()
+        print(f"{size:>7,} retained: dict {dict_mb:7.1f} MB | store {store_mb:5.1f} MB in memory "
+              f"(hot {stats['resident_bytes'] / 2**20:4.1f} MB, hit rate {stats['hit_rate']:.2f}, "
+              f"{stats['evictions']:,} evictions, {read_us:5.0f} us/read), "
+              f"{stats['stored_bytes'] / 2**20:5.1f} MB on disk for {stats['uncompressed_bytes'] / 2**20:5.1f} MB of text")
+        writer.stop()
+        engine.dispose()
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: bytes on the wire and CPU per request for hot cacheable responses.
+
+For a /news page 1 (real archive), a /search-stocks prefix and a /market
+payload, compares:
+  identity    - render JSON on every request, no compression
+  gzip/req    - render + gzip on every request (what a plain middleware does)
+  cached gzip - precompressed body reused from the response cache
+  cached br   - same with Brotli (if the brotli package is installed)
+
+Run from the backend directory:
+    python benchmarks/bench_compression.py
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from starlette.requests import Request
+
+from api_responses import FastJSONResponse, cached_json_response, brotli, GZIP_LEVEL
+from stock_tagger import load_stock_list
+
+LIST_FIELDS = ["category", "headline", "link", "image_url", "timestamp", "sentiment", "sentiment_score", "stock_symbols", "views"]
+REPEATS = 2000
+
+
+def make_request(accept_encoding):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def cpu_per_request(fn):
+    start = time.process_time()
+    for _ in range(REPEATS):
+        body = fn()
+    return (time.process_time() - start) * 1e6 / REPEATS, body
+
+
+def payloads():
+    with open(os.path.join(BACKEND_DIR, "moneycontrol_news.json"), "r", encoding="utf-8") as f:
+        news = json.load(f)
+    page = [{k: item[k] for k in LIST_FIELDS if k in item} for item in news[:24]]
+    stocks = load_stock_list()
+    prefix = [s for s in stocks if "ban" in s["name"].lower() or "ban" in s["symbol"].lower()]
+    market = {
+        "indices": {name: {"price": 23000.5, "change": -12.3, "percent_change": -0.05, "symbol": sym,
+                           "history": [23000.0 + i * 1.7 for i in range(20)]}
+                    for name, sym in [("Nifty 50", "^NSEI"), ("Sensex", "^BSESN")]},
+        "commodities": {name: {"price": 100.0, "change": 1.0, "percent_change": 1.0, "symbol": name}
+                        for name in ["Gold", "Silver", "USD/INR", "EUR/INR", "BTC/USD"]},
+    }
+    return [
+        ("/news page 1", {"items": page, "total": len(news), "page": 1, "pages": 32, "next_cursor": None}),
+        ("/search-stocks?q=ban", prefix),
+        ("/market", market),
+    ]
+
+
+def main():
+    print(f"{'endpoint':<22} | {'mode':<11} | {'bytes':>8} | {'cpu/req':>9}")
+    print("-" * 60)
+    for name, content in payloads():
+        modes = [
+            ("identity", lambda: FastJSONResponse(content).body),
+            ("gzip/req", lambda: gzip.compress(FastJSONResponse(content).body, compresslevel=GZIP_LEVEL)),
+            ("cached gzip", lambda: cached_json_response(make_request("gzip, deflate"), name, 1, lambda: content).body),
+        ]
+        if brotli is not None:
+            modes.append(("cached br", lambda: cached_json_response(make_request("gzip, br"), name, 1, lambda: content).body))
+        for mode, fn in modes:
+            cpu_us, body = cpu_per_request(fn)
+            print(f"{name:<22} | {mode:<11} | {len(body):>8,} | {cpu_us:>7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
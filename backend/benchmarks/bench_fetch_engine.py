@@ -0,0 +1,56 @@
+"""
+Benchmark: full scrape (17 listing pages + deep fetch of every article)
+against a local moneycontrol stand-in, thread-pool path vs. FetchEngine.
+
+Reports articles per second, HTTP requests and TCP connections opened.
+The threads path opens a connection per request; the async path fetches
+over the shared keep-alive pool.
+
+Run from the backend directory:
+    python benchmarks/bench_fetch_engine.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import scraper
+from standin import StandinServer
+
+LISTING_LATENCY = 0.05
+ARTICLE_LATENCY = 0.08
+
+
+def run(mode, standin):
+    scraper.SCRAPER_MODE = mode
+    standin.reset_counters()
+    start = time.perf_counter()
+    # The scraper prints per article; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        news = scraper.scrape_moneycontrol()
+        news = scraper.deep_fetch_metadata(news)
+    elapsed = time.perf_counter() - start
+    complete = sum(1 for item in news if item.get("full_content") and not item.get("needs_deep_fetch"))
+    print(f"{mode:>7}: {complete} articles in {elapsed:5.2f} s = {complete / elapsed:6.1f} articles/s | "
+          f"{standin.requests} requests, {standin.connections} connections")
+
+
+def main():
+    standin = StandinServer(scraper.CATEGORY_URLS, listing_latency=LISTING_LATENCY, article_latency=ARTICLE_LATENCY)
+    standin.start()
+    scraper.CATEGORY_URLS = standin.category_urls()
+    print(f"Stand-in: {len(scraper.CATEGORY_URLS)} categories, {standin.article_count()} articles, "
+          f"{LISTING_LATENCY * 1000:.0f} ms listing / {ARTICLE_LATENCY * 1000:.0f} ms article latency")
+    try:
+        for mode in ("threads", "async"):
+            run(mode, standin)
+    finally:
+        scraper.FETCH_ENGINE.close()
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: deep fetch of recorded article pages, one step after another vs. the staged pipeline.
+
+Article pages are recorded once from the stand-in's generator (real markup
+sizes, JSON-LD, filler) and replayed from memory with a per-page network
+delay, so no server or network is involved. The replay sits under the
+FetchEngine's session, so both runs go through its per-host concurrency cap
+(the resilience layer's rate limit is off). Sentiment is a stand-in model
+that holds the GIL for a fixed cost per batch plus a cost per headline, as
+tokenization and the Python side of inference do.
+
+    sequential   what SCRAPER_MODE=async does: fetch every page, classify every
+                 headline, then parse every page in this thread
+    pipeline     IngestPipeline with the parse stage in this process (0 workers)
+                 and in a process pool
+
+Reported per run: wall time and articles per second; for the pipeline also
+each stage's throughput and the queue depths, which show the bottleneck: at
+80 ms per page the fetch stage is, at 5 ms the queue in front of parsing and
+sentiment fills and fetching waits. The machine's core count bounds what the
+process pool can add.
+
+Run from the backend directory:
+    python benchmarks/bench_ingest_pipeline.py
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fetch_engine import FetchEngine
+from ingest_pipeline import IngestPipeline, PIPELINE_PARSE_WORKERS, parse_page
+from resilience import Resilience
+from standin import StandinServer
+
+CATEGORIES = [f"Category {i}" for i in range(17)]
+ARTICLES_PER_CATEGORY = 24
+LATENCIES = [0.08, 0.005]   # seconds per page, +-50%
+BATCH = 32
+BATCH_COST = 0.005      # seconds per model call
+TEXT_COST = 0.001       # seconds per headline
+
+
+class Recorded:
+    def __init__(self, html):
+        self.status_code = 200 if html is not None else 404
+        self.text = html
+        self.headers = {}
+
+
+class ReplaySession:
+    """Stands in for the engine's AsyncSession: recorded pages after a simulated network delay."""
+
+    def __init__(self, pages, latency):
+        self.pages = pages
+        self.latency = latency
+        self.rng = random.Random(3)
+
+    async def get(self, url, headers=None, timeout=None):
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        return Recorded(self.pages.get(url))
+
+    async def close(self):
+        pass
+
+
+class ReplayEngine(FetchEngine):
+    def __init__(self, pages, latency):
+        super().__init__(resilience=Resilience(rate=0))
+        self._session = ReplaySession(pages, latency)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def classify(texts):
+    busy(BATCH_COST + TEXT_COST * len(texts))
+    return [{"label": "neutral", "score": 0.0} for _ in texts]
+
+
+def record():
+    standin = StandinServer(CATEGORIES, articles_per_category=ARTICLES_PER_CATEGORY)
+    pages = {}
+    items = []
+    for path, article in standin._articles.items():
+        url = f"https://www.moneycontrol.com{path}"
+        pages[url] = standin.article_html(path)
+        items.append({"link": url, "headline": article["headline"], "image_url": None, "timestamp": None})
+    return pages, items
+
+
+def sequential(engine, items):
+    pages = engine.fetch_pages(item["link"] for item in items)
+    sentiments = []
+    for i in range(0, len(items), BATCH):
+        sentiments += classify([item["headline"] for item in items[i:i + BATCH]])
+    return [(parse_page(pages[item["link"]], None, None)[0], sentiment) for item, sentiment in zip(items, sentiments)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    pages, items = record()
+    size = sum(len(html) for html in pages.values())
+    print(f"{len(items)} recorded article pages ({size / len(items) / 1024:.0f} KB each), {os.cpu_count()} CPU core(s)")
+    for latency in LATENCIES:
+        print(f"{latency * 1000:.0f} ms simulated latency")
+        replay(pages, items, latency)
+
+
+def replay(pages, items, latency):
+    engine = ReplayEngine(pages, latency)
+    baseline, seconds = timed(lambda: sequential(engine, items))
+    print(f"  {'sequential':<28} {seconds:6.2f} s  {len(items) / seconds:6.1f} articles/s")
+
+    for workers in sorted({0, max(PIPELINE_PARSE_WORKERS, 1)}):
+        pipeline = IngestPipeline(engine, classify, fetch_concurrency=engine.per_host, parse_workers=workers,
+                                  infer_batch=BATCH)
+        if workers:
+            # Start the pool's processes outside the timed run
+            pipeline._get_pool().submit(parse_page, "", None, None).result()
+        results, seconds = timed(lambda: pipeline.run(items))
+        pipeline.shutdown()
+        assert [fields for fields, _ in results] == [fields for fields, _ in baseline]
+        run = pipeline.last_run
+        label = f"pipeline ({workers} parse process{'es' if workers != 1 else ''})" if workers else "pipeline (parse in-process)"
+        print(f"  {label:<28} {seconds:6.2f} s  {len(items) / seconds:6.1f} articles/s")
+        for name, stage in run["stages"].items():
+            print(f"      {name:<10} {stage['items_per_second']:7.1f}/s, {stage['avg_item_ms']:7.2f} ms per item")
+        for name, q in run["queues"].items():
+            print(f"      queue {name:<17} max {q['max_depth']:>2}/{q['capacity']}, avg {q['avg_depth']:5.1f}, "
+                  f"producer blocked {q['producer_blocked_seconds']:.2f} s")
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: refreshing the 17 category listing pages, with and without the
+listing cache, against a local moneycontrol stand-in.
+
+Runs a cold scrape, a refresh with nothing changed, and a refresh after
+three categories published a new article. It does this once against a
+server that sends ETag / Last-Modified (unchanged pages come back as 304)
+and once against one that doesn't (unchanged pages are detected by body
+hash). Reports time, bytes received and pages parsed per refresh.
+
+Run from the backend directory:
+    python benchmarks/bench_listing_cache.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy.orm import sessionmaker
+
+import scraper
+from database import Base, create_write_engine
+from db_writer import DBWriter
+from http_cache import ListingCache
+from standin import StandinServer
+
+LISTING_LATENCY = 0.02
+CHANGED = 3
+
+
+def refresh(label, standin):
+    standin.reset_counters()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        news = scraper.scrape_moneycontrol()
+    elapsed = (time.perf_counter() - start) * 1000
+    stats = scraper.LISTING_CACHE.last_run
+    print(f"  {label:<18} {elapsed:7.1f} ms | {standin.bytes_sent / 1024:6.0f} KB received | "
+          f"{stats['parsed']:2} parsed, {stats['not_modified']:2} not modified, {stats['unchanged']:2} unchanged | "
+          f"{len(news)} articles")
+
+
+def run(validators, tmp):
+    engine = create_write_engine(os.path.join(tmp, f"cache_{validators}.db"))
+    Base.metadata.create_all(bind=engine)
+    writer = DBWriter(sessionmaker(bind=engine))
+    scraper.LISTING_CACHE = ListingCache(sessionmaker(bind=engine), writer=writer)
+
+    standin = StandinServer(scraper.CATEGORY_URLS, listing_latency=LISTING_LATENCY, validators=validators)
+    standin.start()
+    scraper.CATEGORY_URLS = standin.category_urls()
+    print("ETag / Last-Modified:" if validators else "No validators (body hash only):")
+    try:
+        refresh("cold", standin)
+        refresh("nothing changed", standin)
+        for name in standin.categories[:CHANGED]:
+            standin.add_article(name)
+        refresh(f"{CHANGED} changed", standin)
+    finally:
+        scraper.CATEGORY_URLS = dict(zip(standin.categories, scraper.CATEGORY_URLS.values()))
+        standin.stop()
+        writer.stop()
+        engine.dispose()
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    categories = dict(scraper.CATEGORY_URLS)
+    try:
+        for validators in (True, False):
+            scraper.CATEGORY_URLS = dict(categories)
+            run(validators, tmp)
+    finally:
+        scraper.FETCH_ENGINE.close()
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
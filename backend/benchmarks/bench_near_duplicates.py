@@ -0,0 +1,162 @@
+"""
+Benchmark: near-duplicate lookups as the archive grows, and deep fetches saved per scrape.
+
+    lookup     per-headline cost of finding an article's near-duplicates among
+               1k / 10k / 100k indexed headlines: Jaccard against every headline
+               (what a scan would do) vs. the MinHash/LSH index, plus the
+               candidates the index actually compared
+    scrape     one scrape of 17 category listings where stories repeat under other
+               categories and links, with the same or a reworded headline: deep
+               fetches with exact-link dedup vs. with near-duplicates held back, and
+               how many held-back articles were matched to the wrong story
+    archive    the real moneycontrol_news.json: multi-article clusters from headlines
+               alone, and how many of them hold different headlines
+
+Synthetic headlines are drawn from a vocabulary of a few market words and a
+long tail of names, like real headlines. A reworded variant swaps, drops or
+adds one word; most fall below the headline threshold, as real relistings
+repeat the headline.
+
+Run from the backend directory:
+    python benchmarks/bench_near_duplicates.py
+"""
+import json
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from article import parse_timestamp
+from near_duplicates import DEDUP_HEADLINE_THRESHOLD, NearDuplicateIndex, headline_shingles
+from synthetic_news import FILLER, WORDS
+
+SIZES = [1_000, 10_000, 100_000]
+PROBES = 200            # lookups timed per size
+SCAN_PROBES = 20        # the scan is slow; fewer of those
+CATEGORIES = 17
+LISTED = 24             # articles per category listing
+STORIES = 260           # distinct stories in one scrape
+
+
+def headline(rng):
+    return " ".join(rng.sample(WORDS, 3) + [rng.choice(FILLER) for _ in range(rng.randint(4, 9))])
+
+
+def reworded(rng, text):
+    words = text.split()
+    edit = rng.randrange(3)
+    position = rng.randrange(len(words))
+    if edit == 0:
+        words[position] = rng.choice(WORDS)
+    elif edit == 1 and len(words) > 4:
+        del words[position]
+    else:
+        words.insert(position, rng.choice(FILLER))
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def lookups():
+    rng = random.Random(7)
+    archive = [headline(rng) for _ in range(SIZES[-1])]
+    probes = [reworded(rng, rng.choice(archive[:SIZES[0]])) for _ in range(PROBES)]
+    index = NearDuplicateIndex()
+    shingled = []
+    indexed = 0
+    print("lookup: per headline, against the indexed archive")
+    for size in SIZES:
+        for i in range(indexed, size):
+            index.add(f"a{i}", archive[i])
+            shingled.append(headline_shingles(archive[i]))
+        indexed = size
+
+        def scan():
+            found = 0
+            for text in probes[:SCAN_PROBES]:
+                probe = headline_shingles(text)
+                # The best match, so every headline is compared
+                found += max(jaccard(probe, other) for other in shingled) >= DEDUP_HEADLINE_THRESHOLD
+            return found
+        scan_found, scan_s = timed(scan)
+
+        comparisons = index.comparisons
+
+        def lsh():
+            found = 0
+            for n, text in enumerate(probes):
+                link = f"probe{n}"
+                index.add(link, text)
+                found += index.representative(link) != link
+                index.remove(link)
+            return found
+        lsh_found, lsh_s = timed(lsh)
+        compared = (index.comparisons - comparisons) / PROBES
+
+        print(f"  {size:>7,} headlines: scan {scan_s / SCAN_PROBES * 1000:8.2f} ms "
+              f"({scan_found}/{SCAN_PROBES} matched) | LSH {lsh_s / PROBES * 1000:6.2f} ms, "
+              f"{compared:5.1f} candidates compared ({lsh_found}/{PROBES} matched)")
+
+
+def scrape():
+    rng = random.Random(11)
+    stories = [headline(rng) for _ in range(STORIES)]
+    # Each listing slot shows some story; a story listed again is a new link with a reworded headline
+    listed = []
+    seen = set()
+    for category in range(CATEGORIES):
+        for slot in range(LISTED):
+            story = rng.randrange(STORIES)
+            text = reworded(rng, stories[story]) if story in seen and rng.random() < 0.5 else stories[story]
+            seen.add(story)
+            listed.append((story, f"https://example.com/{story}/{category}-{slot}", text))
+
+    index = NearDuplicateIndex()
+    story_of = {}
+    fetched = 0
+    wrong = 0
+    for story, link, text in listed:
+        story_of[link] = story
+        index.add(link, text)
+        representative = index.representative(link)
+        if representative == link:
+            fetched += 1
+        elif story_of[representative] != story:
+            wrong += 1
+    print(f"scrape: {len(listed)} listed articles (all different links), {len(seen)} distinct stories")
+    print(f"  deep fetches: exact-link dedup {len(listed)} | near-duplicates held back {fetched} "
+          f"({len(listed) - fetched} saved, {wrong} matched to the wrong story)")
+
+
+def archive():
+    with open(os.path.join(BACKEND_DIR, "moneycontrol_news.json"), "r", encoding="utf-8") as f:
+        news = json.load(f)
+    index = NearDuplicateIndex()
+    for item in news:
+        index.add(item["link"], item["headline"], published=parse_timestamp(item.get("timestamp")))
+    headlines = {item["link"]: item["headline"] for item in news}
+    clusters = [members for members in index.members.values() if len(members) > 1]
+    mixed = sum(1 for members in clusters if len({headlines[link] for link in members}) > 1)
+    print(f"archive: {len(news)} real articles, {len(clusters)} multi-article clusters, "
+          f"{mixed} with different headlines")
+
+
+def main():
+    lookups()
+    scrape()
+    archive()
+
+
+if __name__ == "__main__":
+    main()
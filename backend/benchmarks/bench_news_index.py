@@ -0,0 +1,85 @@
+"""
+Benchmark: /news request path before and after the precomputed news index.
+
+Compares the old per-request strptime + full sort against slicing the
+prebuilt NewsIndex, at 1k, 10k and 100k articles.
+
+Run from the backend directory:
+    python benchmarks/bench_news_index.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from news_index import NewsIndex
+from synthetic_news import make_articles
+
+SIZES = [1_000, 10_000, 100_000]
+LIMIT = 24
+
+
+def legacy_read(all_news, categories=None, page=1):
+    """The old read_news body: filter, re-parse every timestamp, sort, paginate."""
+    if categories:
+        cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()]
+        all_news = [item for item in all_news if str(item.get("category") or "").lower() in cat_list]
+
+    def get_timestamp(x):
+        ts = x.get("timestamp")
+        if not ts: return datetime.min
+        try:
+            return datetime.strptime(ts, "%d %b %Y, %I:%M %p")
+        except:
+            return datetime.min
+
+    all_news.sort(key=get_timestamp, reverse=True)
+    offset = (page - 1) * LIMIT
+    return all_news[offset:offset + LIMIT]
+
+
+def indexed_read(index, categories=None, page=1):
+    ranks = index.all_ranks()
+    if categories:
+        cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()]
+        ranks = index.ranks_for_categories(cat_list)
+    offset = (page - 1) * LIMIT
+    return [index.items[r] for r in ranks[offset:offset + LIMIT]]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    pos = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[pos]
+
+
+def measure(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def main():
+    print(f"{'articles':>9} | {'scenario':<18} | {'legacy p50':>11} | {'legacy p99':>11} | {'index p50':>10} | {'index p99':>10} | {'build':>9}")
+    print("-" * 96)
+    for n in SIZES:
+        articles = make_articles(n, with_content=False)
+        start = time.perf_counter()
+        index = NewsIndex(articles, 1)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy_repeats = max(5, 20_000 // n * 5)
+        for label, categories in [("page 1", None), ("2 categories", "Stocks,IPO")]:
+            # read_news receives the shared cached list, so legacy sorts a copy each time like a fresh request would
+            l50, l99 = measure(lambda: legacy_read(list(articles), categories), legacy_repeats)
+            i50, i99 = measure(lambda: indexed_read(index, categories), 1000)
+            print(f"{n:>9} | {label:<18} | {l50:>9.3f}ms | {l99:>9.3f}ms | {i50:>8.4f}ms | {i99:>8.4f}ms | {build_ms:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
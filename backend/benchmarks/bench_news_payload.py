@@ -0,0 +1,62 @@
+"""
+Benchmark: /news response size and serialization time for one 24-item page.
+
+"before" is the old response: full article dicts (including full_content)
+passed through FastAPI's jsonable_encoder and the stdlib JSON encoder.
+"after" is the compact list projection rendered by FastJSONResponse.
+
+Run from the backend directory:
+    python benchmarks/bench_news_payload.py
+"""
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api_responses import FastJSONResponse, orjson
+
+PAGE_SIZE = 24
+LIST_FIELDS = ["category", "headline", "link", "image_url", "timestamp", "sentiment", "sentiment_score", "stock_symbols", "views"]
+
+
+def timed(fn, repeats=500):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        body = fn()
+    return (time.perf_counter() - start) * 1000 / repeats, body
+
+
+def main():
+    with open(os.path.join(BACKEND_DIR, "moneycontrol_news.json"), "r", encoding="utf-8") as f:
+        news = json.load(f)
+    page = news[:PAGE_SIZE]
+    for item in page:
+        item["views"] = 3
+
+    def before():
+        payload = {"items": page, "total": len(news), "page": 1, "pages": 32}
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def after():
+        items = [{f: item[f] for f in LIST_FIELDS if f in item} for item in page]
+        payload = {"items": items, "total": len(news), "page": 1, "pages": 32, "next_cursor": "x" * 120}
+        return FastJSONResponse(payload).body
+
+    before_ms, before_body = timed(before)
+    after_ms, after_body = timed(after)
+
+    print(f"page of {PAGE_SIZE} items from moneycontrol_news.json ({len(news)} articles), orjson={'yes' if orjson else 'no'}")
+    print(f"{'':<8} | {'bytes':>9} | {'serialize':>10}")
+    print(f"{'before':<8} | {len(before_body):>9,} | {before_ms:>8.3f}ms")
+    print(f"{'after':<8} | {len(after_body):>9,} | {after_ms:>8.3f}ms")
+    print(f"size: {len(before_body) / len(after_body):.1f}x smaller, serialization: {before_ms / after_ms:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
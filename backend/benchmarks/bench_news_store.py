@@ -0,0 +1,64 @@
+"""
+Benchmark: cost of persisting one scrape, JSON rewrite vs. news_items upserts.
+
+A scrape returns ~400 articles of which only a few are new. The old
+save_news rewrote the whole indented JSON archive; NewsStore.save looks up
+the scraped links' hashes and writes only the new or changed rows.
+
+Run from the backend directory:
+    python benchmarks/bench_news_store.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_write_engine
+from db_writer import DBWriter
+from news_store import NewsStore
+from stock_tagger import tag_articles
+from synthetic_news import make_articles
+
+SIZES = [1_000, 10_000, 50_000]
+SCRAPED = 400   # articles returned by one scrape
+NEW = 20        # of which are new
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    for size in SIZES:
+        articles = tag_articles(make_articles(size + NEW))
+        archive, fresh = articles[:size], articles[size:]
+        scrape = archive[:SCRAPED - NEW] + fresh
+
+        json_path = os.path.join(tmp, f"news_{size}.json")
+        start = time.perf_counter()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(archive + fresh, f, indent=4, ensure_ascii=False)
+        json_ms = (time.perf_counter() - start) * 1000
+
+        engine = create_write_engine(os.path.join(tmp, f"news_{size}.db"))
+        Base.metadata.create_all(bind=engine)
+        writer = DBWriter(sessionmaker(bind=engine))
+        store = NewsStore(sessionmaker(bind=engine), writer=writer)
+        store.save(archive)
+
+        start = time.perf_counter()
+        written, _ = store.save(scrape)
+        db_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>7,} archived: JSON rewrite {json_ms:8.1f} ms | "
+              f"store upsert {db_ms:6.1f} ms ({written} of {len(scrape)} scraped rows written)")
+        writer.stop()
+        engine.dispose()
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: a simulated trading week of refreshes, fixed 5-minute refresh
+of every category vs. the adaptive per-category RefreshScheduler.
+
+Each category publishes as a Poisson process whose rate differs by an
+order of magnitude between categories and drops outside market hours.
+The simulation polls every 30 s, as page loads would. It reports the
+listing requests made and the mean delay from an article's publication
+to its discovery, during and outside market hours, for the busiest
+categories and for all of them.
+
+Run from the backend directory:
+    python benchmarks/bench_refresh_scheduler.py
+"""
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from refresh_scheduler import IST, RefreshScheduler, market_session
+
+# New articles per hour during market hours / off hours
+RATES = {
+    "Stocks": (30, 4), "Companies": (14, 3), "Earnings": (10, 2), "Economy": (6, 2),
+    "Technical Analysis": (5, 0.5), "Equity Research": (4, 0.5), "Banking": (3, 1), "IPO": (2, 0.5),
+    "Commodities": (3, 1), "Currency": (2, 0.5), "Mutual Funds": (1.5, 0.5), "Personal Finance": (1, 0.5),
+    "Startup": (1, 0.3), "Real Estate": (0.5, 0.2), "Gold Rate": (1, 0.2), "Silver Rate": (0.5, 0.1),
+    "AQI": (0.3, 0.2),
+}
+BUSY = ["Stocks", "Companies", "Earnings"]
+FIXED_INTERVAL = 300
+TICK = 30
+LISTING_SIZE = 24
+START = datetime(2026, 1, 26, 0, 0, tzinfo=IST).timestamp()   # a Monday
+DAYS = 5
+
+
+def publications(seed=7):
+    """Publish times per category over the simulated week."""
+    rng = random.Random(seed)
+    times = {}
+    for name, (market_rate, off_rate) in RATES.items():
+        t, out = START, []
+        while t < START + DAYS * 86400:
+            rate = market_rate if market_session(t) == "market" else off_rate
+            # Thinning against the peak rate keeps the process exact across session changes
+            t += rng.expovariate(max(market_rate, off_rate) / 3600)
+            if rng.random() < rate / max(market_rate, off_rate):
+                out.append(t)
+        times[name] = out
+    return times
+
+
+def simulate(pubs, due_fn, record_fn):
+    pending = {name: list(times) for name, times in pubs.items()}
+    delays = {name: [] for name in pubs}
+    requests = 0
+    t = START
+    while t < START + DAYS * 86400:
+        for name in due_fn(t):
+            requests += 1
+            found = [p for p in pending[name] if p <= t]
+            pending[name] = pending[name][len(found):]
+            # The listing only shows the newest articles; older ones are missed
+            delays[name].extend((p, t - p) for p in found[-LISTING_SIZE:])
+            record_fn(name, min(len(found), LISTING_SIZE), t)
+        t += TICK
+    return requests, delays
+
+
+def report(label, requests, delays):
+    def mean_minutes(names, session):
+        values = [d for name in names for p, d in delays[name] if market_session(p) == session]
+        return sum(values) / len(values) / 60 if values else 0.0
+    print(f"{label:<9} {requests:6} requests | mean delay, market hours: busy {mean_minutes(BUSY, 'market'):4.1f} min, "
+          f"all {mean_minutes(RATES, 'market'):4.1f} min | off hours: busy {mean_minutes(BUSY, 'off'):4.1f} min, "
+          f"all {mean_minutes(RATES, 'off'):4.1f} min")
+
+
+def main():
+    pubs = publications()
+    print(f"{DAYS} trading days, {sum(len(p) for p in pubs.values())} articles in {len(RATES)} categories")
+
+    last = {}
+
+    def fixed_due(t):
+        if t - last.get("all", -1e18) >= FIXED_INTERVAL:
+            last["all"] = t
+            return list(RATES)
+        return []
+    report("fixed", *simulate(pubs, fixed_due, lambda name, new, t: None))
+
+    scheduler = RefreshScheduler(RATES)
+    report("adaptive", *simulate(pubs, scheduler.due, scheduler.record))
+    for name in ("Stocks", "Economy", "AQI"):
+        state = scheduler.snapshot(START + DAYS * 86400)["categories"][name]
+        print(f"  {name:<8} rate/h {state['rate_per_hour']}")
+
+
+if __name__ == "__main__":
+    main()
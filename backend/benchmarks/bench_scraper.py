@@ -0,0 +1,295 @@
+"""
+Benchmark: the scraper's full ingest path, offline, against the local moneycontrol stand-in.
+
+Category listings are the stand-in's synthetic markup; article pages are
+variants of the recorded moneycontrol_sample.html (see standin.py). Each
+scenario runs what the ingest worker does on a tick: scraper.ingest over the
+current snapshot, publish the result, read it back through get_latest_news.
+
+    cold        empty store: every listing parsed, every article deep-fetched
+    unchanged   the same listings again (304s, nothing to fetch)
+    3 changed   three categories published one new article each
+    faults      cold ingest of a second stand-in that fails --error-rate of
+                its requests with 503 (retried by the resilience layer);
+                skipped with --error-rate 0
+
+Reported per scenario: wall time, articles per second (new articles
+ingested with a body, over wall time), requests and bytes fetched, and parse time per
+page for listing and article pages. Listing pages are always parsed in this
+process and timed there. Article pages are timed in one of two ways, and each
+record's article_parse_source says which:
+
+    in_process      threads/async modes: scraper.extract_article, timed in this process
+    pipeline_stage  pipeline mode: the parse stage's time per page (INGEST_PIPELINE.last_run),
+                    from submit to result with a process pool, so pickling and
+                    waiting for a worker are included
+
+The two are not the same measurement; compare article parse times within a mode.
+
+The scraper runs as configured, environment variables included: the
+resilience layer's per-host rate limit (FETCH_HOST_RATE, 30/s by default)
+bounds the cold scenarios; FETCH_HOST_RATE=0 measures without it.
+
+Each run appends one JSON record (config, environment, commit, scenarios) to
+--output, and the summary compares it with the previous record there if
+that ran with the same config.
+The run uses a fresh database in a temporary directory.
+
+Run from the backend directory:
+    python benchmarks/bench_scraper.py
+    python benchmarks/bench_scraper.py --article-latency 0.2 --error-rate 0.1 --mode async
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_FILE = os.path.join(BACKEND_DIR, "moneycontrol_sample.html")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "bench_scraper.jsonl")
+CHANGED = 3
+
+
+class Timed:
+    """Wraps a function and sums the time spent in it, across threads."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.calls += 1
+                self.seconds += elapsed
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.seconds = 0.0
+
+    def ms_per_call(self):
+        return round(self.seconds / self.calls * 1000, 3) if self.calls else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the scraper's ingest path.")
+    parser.add_argument("--mode", choices=["pipeline", "async", "threads"], default=None,
+                        help="SCRAPER_MODE to run (default: the scraper's)")
+    parser.add_argument("--articles-per-category", type=int, default=24)
+    parser.add_argument("--listing-latency", type=float, default=0.05, help="seconds per listing page")
+    parser.add_argument("--article-latency", type=float, default=0.08, help="seconds per article page")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of requests failed in the faults scenario")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON Lines file the run is appended to")
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    # The database, listing cache and article store live in the working directory: use a fresh one
+    os.environ.setdefault("SENTIMENT_MODEL_DIR", os.path.join(BACKEND_DIR, "models", "finbert"))
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)
+    try:
+        record = run(args)
+    finally:
+        os.chdir(BACKEND_DIR)
+        shutil.rmtree(tmp, ignore_errors=True)
+    report(record, previous_record(output))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Appended to {output}")
+
+
+def run(args):
+    import scraper
+    import sentiment
+    from article_extractor import NO_CONTENT
+    from article_store import ARTICLE_STORE
+    from database import init_db
+    from db_writer import DB_WRITER
+    from news_snapshot import SNAPSHOTS
+    from news_store import NEWS_STORE
+    from resilience import RESILIENCE
+    from standin import HOST, StandinServer
+
+    if args.mode:
+        scraper.SCRAPER_MODE = args.mode
+    categories = list(scraper.CATEGORY_URLS)
+    init_db()
+    # A model load is not part of a scrape
+    with contextlib.redirect_stdout(io.StringIO()):
+        sentiment.init_model()
+
+    listing_parse = Timed(scraper.parse_listing_rows)
+    article_parse = Timed(scraper.extract_article)
+    scraper.parse_listing_rows = listing_parse
+    scraper.extract_article = article_parse
+
+    def scenario(name, standin):
+        standin.reset_counters()
+        listing_parse.reset()
+        article_parse.reset()
+        before = RESILIENCE.stats().get(HOST, {})
+        pipeline_runs = scraper.INGEST_PIPELINE.runs
+        known = {article.link for article in scraper.get_latest_news()}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            news = scraper.ingest(list(scraper.get_latest_news()), None)
+            if news is not None:
+                SNAPSHOTS.publish(news, NEWS_STORE.state()[0])
+        wall = time.perf_counter() - start
+        links = set(standin.article_urls())
+        new = [article.link for article in scraper.get_latest_news() if article.link in links - known]
+        with_body = sum(1 for body in ARTICLE_STORE.bodies(new).values() if body and body != NO_CONTENT)
+        host = RESILIENCE.stats().get(HOST, {})
+        if scraper.SCRAPER_MODE == "pipeline":
+            # The parse workers don't see the wrapper (and parse_page calls article_extractor directly)
+            article_source, article_ms, article_pages = "pipeline_stage", None, 0
+            if scraper.INGEST_PIPELINE.runs > pipeline_runs:
+                stage = scraper.INGEST_PIPELINE.last_run["stages"]["parse"]
+                article_ms, article_pages = stage["avg_item_ms"], stage["items"]
+        else:
+            article_source, article_ms, article_pages = "in_process", article_parse.ms_per_call(), article_parse.calls
+        return {
+            "name": name,
+            "wall_seconds": round(wall, 3),
+            "articles": with_body,
+            "articles_per_second": round(with_body / wall, 1),
+            "new_articles": len(new),
+            "requests": standin.requests,
+            "not_modified": standin.not_modified,
+            "bytes_fetched": standin.bytes_sent,
+            "faults_injected": standin.faults,
+            "retries": host.get("retries", 0) - before.get("retries", 0),
+            "throttled_seconds": round(host.get("throttled_seconds", 0) - before.get("throttled_seconds", 0), 3),
+            "listing_pages_parsed": listing_parse.calls,
+            "listing_parse_ms_per_page": listing_parse.ms_per_call(),
+            "article_pages_parsed": article_pages,
+            "article_parse_ms_per_page": article_ms,
+            "article_parse_source": article_source,
+        }
+
+    def standin_for(seed, error_rate=0.0):
+        standin = StandinServer(categories, articles_per_category=args.articles_per_category,
+                                listing_latency=args.listing_latency, article_latency=args.article_latency,
+                                seed=seed, error_rate=error_rate, error_status=args.error_status,
+                                article_template=SAMPLE_FILE)
+        standin.start()
+        scraper.CATEGORY_URLS = standin.category_urls()
+        return standin
+
+    scenarios = []
+    try:
+        standin = standin_for(seed=1)
+        try:
+            scenarios.append(scenario("cold", standin))
+            scenarios.append(scenario("unchanged", standin))
+            for name in categories[:CHANGED]:
+                standin.add_article(name)
+            scenarios.append(scenario(f"{CHANGED} changed", standin))
+        finally:
+            standin.stop()
+        if args.error_rate > 0:
+            # Other links and headlines, so nothing is known from the first stand-in
+            standin = standin_for(seed=2, error_rate=args.error_rate)
+            try:
+                scenarios.append(scenario("faults", standin))
+            finally:
+                standin.stop()
+    finally:
+        scraper.INGEST_PIPELINE.shutdown()
+        scraper.FETCH_ENGINE.close()
+        DB_WRITER.stop()
+
+    return {
+        "benchmark": "scraper",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {
+            "mode": scraper.SCRAPER_MODE,
+            "categories": len(categories),
+            "articles_per_category": args.articles_per_category,
+            "listing_latency": args.listing_latency,
+            "article_latency": args.article_latency,
+            "error_rate": args.error_rate,
+            "error_status": args.error_status,
+            "host_rate": RESILIENCE.rate,
+            "parse_workers": scraper.INGEST_PIPELINE.parse_workers,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "sentiment_model": sentiment.MODEL_ID if sentiment.classifier is not None else None,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def previous_record(path):
+    """The last record in the results file, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def report(record, previous):
+    config = record["config"]
+    print(f"mode {config['mode']}, {config['categories']} categories x {config['articles_per_category']} articles, "
+          f"{config['listing_latency'] * 1000:.0f} ms listing / {config['article_latency'] * 1000:.0f} ms article latency, "
+          f"sentiment model: {record['environment']['sentiment_model'] or 'none'}")
+    before = {}
+    if previous and previous.get("config") == config:
+        before = {s["name"]: s for s in previous["scenarios"]}
+        print(f"(change vs. the previous run at {previous['started_at']}, commit {previous['commit']})")
+    sources = {s.get("article_parse_source") for s in record["scenarios"]}
+    if "pipeline_stage" in sources:
+        print(f"(article parse ms/page: pipeline parse stage, {config['parse_workers']} worker process(es); "
+              f"not comparable with the in-process figure of the other modes)")
+    for s in record["scenarios"]:
+        listing = f"{s['listing_parse_ms_per_page']:.2f}" if s["listing_parse_ms_per_page"] is not None else "-"
+        article = f"{s['article_parse_ms_per_page']:.2f}" if s["article_parse_ms_per_page"] is not None else "-"
+        line = (f"  {s['name']:<10} {s['wall_seconds']:6.2f} s  {s['articles']:4} articles  "
+                f"{s['articles_per_second']:6.1f}/s | {s['requests']:4} requests, {s['bytes_fetched'] / 1024:7.0f} KB | "
+                f"parse ms/page: listing {listing}, article {article}")
+        if s["faults_injected"]:
+            line += f" | {s['faults_injected']} faults, {s['retries']} retries"
+        old = before.get(s["name"])
+        if old and old["wall_seconds"]:
+            line += f" | wall {(s['wall_seconds'] / old['wall_seconds'] - 1) * 100:+.0f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
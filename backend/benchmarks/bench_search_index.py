@@ -0,0 +1,56 @@
+"""
+Benchmark: /news `q` search, substring scan vs. the BM25 inverted index.
+
+The scan cost grows with the corpus; the index cost should track the
+number of matching documents instead.
+
+Run from the backend directory:
+    python benchmarks/bench_search_index.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from search_index import SearchIndex
+from synthetic_news import make_articles
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = ["reliance", "ipo listing", "repo rate policy"]
+
+
+def substring_scan(articles, q):
+    query = q.lower().strip()
+    return [
+        item for item in articles
+        if query in str(item.get("headline") or "").lower() or
+           query in str(item.get("description") or "").lower() or
+           query in str(item.get("category") or "").lower()
+    ]
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeats, result
+
+
+def main():
+    print(f"{'articles':>9} | {'query':<18} | {'scan':>10} | {'index':>10} | {'matches':>8} | {'build':>9}")
+    print("-" * 78)
+    for n in SIZES:
+        articles = make_articles(n, with_content=(n <= 10_000))
+        index = SearchIndex()
+        start = time.perf_counter()
+        index.upsert_many(articles)
+        build_ms = (time.perf_counter() - start) * 1000
+        for q in QUERIES:
+            scan_ms, _ = timed(lambda: substring_scan(articles, q), 5)
+            index_ms, matches = timed(lambda: index.search(q), 5)
+            print(f"{n:>9} | {q:<18} | {scan_ms:>8.2f}ms | {index_ms:>8.2f}ms | {len(matches):>8} | {build_ms:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: whole-file JSON archive vs. append-only segment log, at 10k and 100k articles.
+
+The JSON archive is rewritten with indent=4 on every save and json.load-ed
+whole on every load; the segment log appends the changed articles and
+compacts in the background once half its lines are superseded.
+
+    load       seconds to get the article list back from disk: json.load of the archive
+               vs. SegmentLog.load of a freshly compacted log
+    save       seconds for one save of CHANGED articles
+    write amp  bytes written to disk per byte of changed articles. For the JSON
+               archive that is one rewrite; for the log it is every append plus
+               the compaction, over enough saves (of CHANGED articles each) for
+               one compaction to run.
+
+Run from the backend directory:
+    python benchmarks/bench_segment_log.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from segment_log import SegmentLog, _dumps, convert_json
+from synthetic_news import make_articles
+
+SIZES = [10_000, 100_000]
+CHANGED = 20   # articles new or updated per save
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    for size in SIZES:
+        articles = make_articles(size)
+
+        json_path = os.path.join(tmp, f"news_{size}.json")
+
+        def rewrite():
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(articles, f, indent=4, ensure_ascii=False)
+        _, json_save = timed(rewrite)
+        json_bytes = os.path.getsize(json_path)
+
+        def json_load():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        _, json_load_s = timed(json_load)
+
+        log_dir = os.path.join(tmp, f"log_{size}")
+        log = SegmentLog(log_dir)
+        convert_json(json_path, log)
+        log.compact()
+        log.close()
+        loaded, log_load_s = timed(lambda: SegmentLog(log_dir).load())
+        assert len(loaded) == size
+        del loaded
+
+        # Saves of CHANGED updated articles each, until one background compaction has run
+        log = SegmentLog(log_dir)
+        log.load()
+        start = log.stats()
+        changed_bytes = 0
+        saves = 0
+        save_s = 0.0
+        while log.compactions == start["compactions"]:
+            batch = [{**article, "sentiment_score": saves} for article in
+                     articles[(saves * CHANGED) % size:(saves * CHANGED) % size + CHANGED]]
+            changed_bytes += sum(len(_dumps(article)) + 1 for article in batch)
+            _, seconds = timed(lambda: log.append(batch))
+            save_s += seconds
+            saves += 1
+            log.wait()
+        end = log.stats()
+        log.close()
+        log_written = (end["bytes_appended"] - start["bytes_appended"]) + (end["bytes_compacted"] - start["bytes_compacted"])
+
+        one_change = changed_bytes / saves
+        print(f"{size:>7,} articles ({json_bytes / 2**20:.0f} MB as JSON, {end['disk_bytes'] / 2**20:.0f} MB as a log)")
+        print(f"  JSON archive: load {json_load_s:6.2f} s | save {json_save * 1000:8.1f} ms | "
+              f"write amp {json_bytes / one_change:9.0f}x")
+        print(f"  segment log:  load {log_load_s:6.2f} s | save {save_s / saves * 1000:8.1f} ms | "
+              f"write amp {log_written / changed_bytes:9.1f}x ({saves} saves, incl. 1 compaction)")
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: FinBERT headline sentiment on CPU, texts per second by batch size.
+
+Part 1 runs classify_batch directly at batch sizes 1, 8, 32 and 64.
+Part 2 compares the old per-call pattern with the micro-batching service.
+In the old pattern, 10 deep-fetch threads each classified one headline
+at a time against the shared model. In the new one, the same 10 threads
+call analyze() on a SentimentBatcher.
+
+Needs torch and transformers. If ProsusAI/finbert can't be downloaded,
+a randomly initialised model of the same architecture (BERT-base, 3
+labels) is used. Throughput depends on the architecture, not the weights.
+
+Run from the backend directory:
+    python benchmarks/bench_sentiment.py
+"""
+import concurrent.futures
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import sentiment
+from sentiment import SentimentBatcher, classify_batch
+from synthetic_news import WORDS, make_articles
+
+BATCH_SIZES = [1, 8, 32, 64]
+TEXTS = 256
+THREADS = 10
+
+
+def load_model():
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+    try:
+        tokenizer = BertTokenizer.from_pretrained(sentiment.model_name)
+        model = BertForSequenceClassification.from_pretrained(sentiment.model_name)
+        label = sentiment.model_name
+    except Exception:
+        # Offline: same shape as FinBERT, random weights, word-level vocab over the benchmark's words
+        vocab_path = os.path.join(tempfile.mkdtemp(), "vocab.txt")
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS)) + [f"w{i}" for i in range(20_000)]
+        with open(vocab_path, "w") as f:
+            f.write("\n".join(vocab))
+        tokenizer = BertTokenizer(vocab_path)
+        config = BertConfig(num_labels=3, id2label={0: "positive", 1: "negative", 2: "neutral"},
+                            label2id={"positive": 0, "negative": 1, "neutral": 2})
+        model = BertForSequenceClassification(config)
+        label = "BERT-base, random weights (FinBERT unavailable offline)"
+    model.eval()
+    return model, tokenizer, label
+
+
+def main():
+    import torch
+    model, tokenizer, label = load_model()
+    texts = [a["headline"] for a in make_articles(TEXTS, with_content=False)]
+    classify = lambda batch: classify_batch(batch, model, tokenizer)
+    classify(texts[:8])  # warm up
+    print(f"Model: {label} | {TEXTS} headlines | {torch.get_num_threads()} torch threads")
+
+    for size in BATCH_SIZES:
+        start = time.perf_counter()
+        for i in range(0, TEXTS, size):
+            classify(texts[i:i + size])
+        elapsed = time.perf_counter() - start
+        print(f"batch {size:>3}: {TEXTS / elapsed:7.1f} texts/s")
+
+    # Old pattern: concurrent callers, one text per model call, serialized on the shared model
+    lock = threading.Lock()
+
+    def one(text):
+        with lock:
+            return classify([text])[0]
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(one, texts))
+    old = TEXTS / (time.perf_counter() - start)
+
+    batcher = SentimentBatcher(classify=classify)
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(batcher.analyze, texts))
+    new = TEXTS / (time.perf_counter() - start)
+    stats = batcher.stats()
+    batcher.stop()
+    print(f"{THREADS} threads, per-call:  {old:7.1f} texts/s")
+    print(f"{THREADS} threads, batcher:   {new:7.1f} texts/s (avg batch {stats['avg_batch']})")
+
+    batcher = SentimentBatcher(classify=classify)
+    start = time.perf_counter()
+    batcher.analyze_many(texts)
+    many = TEXTS / (time.perf_counter() - start)
+    stats = batcher.stats()
+    batcher.stop()
+    print(f"analyze_many:         {many:7.1f} texts/s (avg batch {stats['avg_batch']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: FinBERT sentiment backends (torch fp32, torch dynamic int8, ONNX Runtime) on CPU.
+
+Exports the model for every backend into a temporary directory, then
+measures each backend in a fresh process, so load time and memory are
+not skewed by the others:
+
+    load        seconds from nothing to a ready classifier (artifacts already exported)
+    RSS         resident memory after load and the runs below, the part added by
+                loading the model (imports excluded), and the peak
+    latency     median time to classify one headline
+    throughput  headlines per second in batches of 32
+
+It finishes with the parity check on sentiment_headlines.json (accuracy,
+and agreement with fp32).
+
+Needs torch, transformers, onnx and onnxruntime. If ProsusAI/finbert can't
+be downloaded, a randomly initialised BERT-base with 3 labels is used.
+Speed and memory depend on the architecture, not the weights, but the
+accuracy column only means something with the real model.
+
+Run from the backend directory:
+    python benchmarks/bench_sentiment_backends.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import sentiment_backends
+from sentiment_backends import BACKENDS, export, load_classifier, load_headlines, parity
+from synthetic_news import make_articles
+
+TEXTS = 256
+BATCH = 32
+LATENCY_RUNS = 50
+
+
+def memory_mb(field):
+    """VmRSS (current) or VmHWM (peak) of this process. Unlike ru_maxrss, VmHWM starts afresh at exec."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+
+
+def dir_mb(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 2**20
+
+
+def prepare_model(workdir):
+    """ProsusAI/finbert if it can be downloaded, else a random BERT-base saved to `workdir`. Returns (name, label)."""
+    from transformers import AutoTokenizer, BertForSequenceClassification
+    try:
+        AutoTokenizer.from_pretrained("ProsusAI/finbert")
+        BertForSequenceClassification.from_pretrained("ProsusAI/finbert")
+        return "ProsusAI/finbert", "ProsusAI/finbert"
+    except Exception:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from bench_sentiment import load_model
+        model, tokenizer, label = load_model()
+        path = os.path.join(workdir, "base")
+        model.save_pretrained(path)
+        tokenizer.save_pretrained(path)
+        return path, label
+
+
+def measure(backend, model_name, root):
+    """Runs in a child process: loads `backend` and times it."""
+    texts = [a["headline"] for a in make_articles(TEXTS, with_content=False)]
+    before = memory_mb("VmRSS")
+    start = time.perf_counter()
+    classify = load_classifier(backend, model_name, root)
+    load = time.perf_counter() - start
+
+    classify(texts[:BATCH])  # warm up
+    latencies = []
+    for text in texts[:LATENCY_RUNS]:
+        start = time.perf_counter()
+        classify([text])
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(0, TEXTS, BATCH):
+        classify(texts[i:i + BATCH])
+    throughput = TEXTS / (time.perf_counter() - start)
+    return {
+        "load_s": load,
+        "rss_mb": memory_mb("VmRSS"),
+        "model_mb": memory_mb("VmRSS") - before,
+        "peak_mb": memory_mb("VmHWM"),
+        "latency_ms": statistics.median(latencies) * 1000,
+        "throughput": throughput,
+    }
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        print(json.dumps(measure(*sys.argv[2:])))
+        return
+
+    workdir = tempfile.mkdtemp()
+    root = os.path.join(workdir, "models")
+    model_name, label = prepare_model(workdir)
+    for backend in BACKENDS:
+        export(backend, model_name, root)
+
+    rows = {}
+    for backend in BACKENDS:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", backend, model_name, root],
+                                capture_output=True, text=True, check=True).stdout
+        rows[backend] = json.loads(output.strip().splitlines()[-1])
+        rows[backend]["artifact_mb"] = dir_mb(sentiment_backends.artifact_dir(backend, root))
+
+    classifiers = {backend: load_classifier(backend, model_name, root) for backend in BACKENDS}
+    report = parity(classifiers, load_headlines())
+
+    print(f"\nModel: {label} | {TEXTS} headlines, batches of {BATCH}")
+    print(f"{'backend':<12} {'load s':>7} {'RSS MB':>7} {'model MB':>9} {'peak MB':>8} {'on disk MB':>11} "
+          f"{'p50 1-text ms':>14} {'texts/s':>8} {'accuracy':>9} {'agree fp32':>11}")
+    for backend, row in rows.items():
+        print(f"{backend:<12} {row['load_s']:>7.2f} {row['rss_mb']:>7.0f} {row['model_mb']:>9.0f} {row['peak_mb']:>8.0f} "
+              f"{row['artifact_mb']:>11.0f} {row['latency_ms']:>14.1f} {row['throughput']:>8.1f} "
+              f"{report[backend]['accuracy']:>9.3f} {report[backend]['agreement']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
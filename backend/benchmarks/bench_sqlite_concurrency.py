@@ -0,0 +1,144 @@
+"""
+Benchmark: mixed read/write load on SQLite, before and after WAL + single writer.
+
+Writer threads each perform small write transactions (a view-count upsert,
+like /news/view flushes and watchlist edits); reader threads run indexed
+lookups (like login and the watchlist page) at the same time.
+
+  legacy  - default engine: rollback journal, every thread commits on its own
+  wal     - create_write_engine (WAL + pragmas) behind one DBWriter thread
+            with group commit, readers on the read-only engine
+
+Run from the backend directory:
+    python benchmarks/bench_sqlite_concurrency.py
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, NewsAnalytics, create_write_engine, create_read_engine
+from db_writer import DBWriter
+
+WRITER_THREADS = 8
+READER_THREADS = 8
+WRITES_PER_THREAD = 200
+READS_PER_THREAD = 1_000
+LINKS = 5_000
+
+
+def _upsert(db, link):
+    stmt = insert(NewsAnalytics).values(news_link=link, views=1)
+    db.execute(stmt.on_conflict_do_update(index_elements=[NewsAnalytics.news_link],
+                                          set_={"views": NewsAnalytics.views + 1}))
+
+
+def _seed(engine):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(NewsAnalytics), [{"news_link": f"link-{i}", "views": 0} for i in range(LINKS)])
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct), len(values) - 1)] * 1000 if values else 0.0
+
+
+def run(mode, path):
+    if mode == "legacy":
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        _seed(engine)
+        write_sessions = read_sessions = sessionmaker(bind=engine)
+        writer = None
+    else:
+        engine = create_write_engine(path)
+        _seed(engine)
+        write_sessions = sessionmaker(bind=engine)
+        read_sessions = sessionmaker(bind=create_read_engine(path))
+        writer = DBWriter(write_sessions)
+
+    write_latencies, read_latencies = [], []
+    errors = {"write": 0, "read": 0}
+    lock = threading.Lock()
+
+    def write_worker(seed):
+        rng = random.Random(seed)
+        for _ in range(WRITES_PER_THREAD):
+            link = f"link-{rng.randrange(LINKS)}"
+            start = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.run(lambda db: _upsert(db, link))
+                else:
+                    db = write_sessions()
+                    try:
+                        _upsert(db, link)
+                        db.commit()
+                    finally:
+                        db.close()
+            except Exception:
+                with lock:
+                    errors["write"] += 1
+                continue
+            with lock:
+                write_latencies.append(time.perf_counter() - start)
+
+    def read_worker(seed):
+        rng = random.Random(seed)
+        for _ in range(READS_PER_THREAD):
+            link = f"link-{rng.randrange(LINKS)}"
+            start = time.perf_counter()
+            db = read_sessions()
+            try:
+                db.query(NewsAnalytics.views).filter(NewsAnalytics.news_link == link).scalar()
+            except Exception:
+                with lock:
+                    errors["read"] += 1
+                continue
+            finally:
+                db.close()
+            with lock:
+                read_latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=write_worker, args=(i,)) for i in range(WRITER_THREADS)]
+    threads += [threading.Thread(target=read_worker, args=(100 + i,)) for i in range(READER_THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    commits = writer.stats()["commits"] if writer is not None else len(write_latencies)
+    if writer is not None:
+        writer.stop()
+    engine.dispose()
+
+    print(f"{mode:>6}: {elapsed:6.2f} s | writes {len(write_latencies) / elapsed:7.0f}/s "
+          f"p50 {_percentile(write_latencies, 0.5):6.2f} ms p99 {_percentile(write_latencies, 0.99):7.2f} ms "
+          f"({commits} commits, {errors['write']} failed) | reads {len(read_latencies) / elapsed:7.0f}/s "
+          f"p99 {_percentile(read_latencies, 0.99):6.2f} ms ({errors['read']} failed)")
+
+
+def main():
+    print(f"{WRITER_THREADS} writer threads x {WRITES_PER_THREAD} writes, "
+          f"{READER_THREADS} reader threads x {READS_PER_THREAD} reads")
+    tmp = tempfile.mkdtemp()
+    try:
+        for mode in ("legacy", "wal"):
+            run(mode, os.path.join(tmp, f"{mode}.db"))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
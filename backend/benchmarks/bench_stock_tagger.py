@@ -0,0 +1,80 @@
+"""
+Benchmark: ingest-time stock tagging throughput (articles per second).
+
+Tags the real headlines from moneycontrol_news.json with the Aho-Corasick
+tagger compiled from stocks.json, and compares against the old approach of
+building an alternation regex per /news?stocks= request and scanning
+every headline with it.
+
+Run from the backend directory:
+    python benchmarks/bench_stock_tagger.py
+"""
+import json
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from stock_tagger import StockTagger, load_stock_list, stock_keywords
+
+WATCHLIST = ["RELIANCE", "TCS", "INFY", "HDFCBANK", "ICICIBANK"]
+
+
+def legacy_watchlist_scan(stocks, headlines, watchlist):
+    """Old /news?stocks= cost: walk every stock, build the regex, scan every headline."""
+    requested = {s.lower() for s in watchlist}
+    keywords = set(requested)
+    for stock in stocks:
+        if stock.get("symbol", "").lower() in requested:
+            keywords |= stock_keywords(stock)
+    pattern = r'\b(' + '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r')\b'
+    regex = re.compile(pattern, re.IGNORECASE)
+    return [h for h in headlines if regex.search(h)]
+
+
+def main():
+    stocks = load_stock_list()
+    with open(os.path.join(BACKEND_DIR, "moneycontrol_news.json"), "r", encoding="utf-8") as f:
+        headlines = [item.get("headline", "") for item in json.load(f)]
+    # Repeat the real headlines to get a stable measurement
+    corpus = headlines * 20
+
+    start = time.perf_counter()
+    tagger = StockTagger(stocks)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    tagged = [tagger.tag(h) for h in corpus]
+    tag_s = time.perf_counter() - start
+
+    postings = {}
+    for i, symbols in enumerate(tagged[:len(headlines)]):
+        for s in symbols:
+            postings.setdefault(s, []).append(i)
+
+    repeats = 200
+    start = time.perf_counter()
+    for _ in range(repeats):
+        matched = sorted(set().union(*(postings.get(s, []) for s in WATCHLIST)))
+    lookup_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    start = time.perf_counter()
+    for _ in range(20):
+        legacy = legacy_watchlist_scan(stocks, headlines, WATCHLIST)
+    legacy_ms = (time.perf_counter() - start) * 1000 / 20
+
+    tagged_count = sum(1 for t in tagged[:len(headlines)] if t)
+    print(f"stocks: {len(stocks)}, keywords: {len(tagger.keywords)}, automaton states: {len(tagger.goto)}")
+    print(f"compile: {compile_ms:.0f} ms (once per process)")
+    print(f"tagging: {len(corpus) / tag_s:,.0f} articles/s ({tag_s / len(corpus) * 1e6:.1f} us/article)")
+    print(f"articles with at least one symbol: {tagged_count}/{len(headlines)}")
+    print(f"watchlist filter over {len(headlines)} articles ({len(WATCHLIST)} symbols):")
+    print(f"  legacy regex build + scan: {legacy_ms:.2f} ms/request ({len(legacy)} matches)")
+    print(f"  posting lookup:            {lookup_ms:.4f} ms/request ({len(matched)} matches)")
+
+
+if __name__ == "__main__":
+    main()
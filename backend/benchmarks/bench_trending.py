@@ -0,0 +1,83 @@
+"""
+Benchmark: trending engine under synthetic view traffic.
+
+Simulates a day of clicks over a rotating set of "hot" stories (Zipf
+popularity, new stories becoming hot every hour) and reports:
+  - record() throughput (view events per second)
+  - trending read latency: engine top-K vs. the old `views > 15` scan
+  - how many of the current top stories each approach surfaces
+
+Run from the backend directory:
+    python benchmarks/bench_trending.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trending import TrendingEngine
+
+ARTICLES = 20_000
+EVENTS = 300_000
+HOURS = 24
+HOT_PER_HOUR = 30
+
+
+def simulate(seed=7):
+    """Yields (timestamp, link) view events; each hour a new batch of stories is hot."""
+    rng = random.Random(seed)
+    start = 1_800_000_000
+    per_hour = EVENTS // HOURS
+    for hour in range(HOURS):
+        hot = [f"article-{(hour * HOT_PER_HOUR + i) % ARTICLES}" for i in range(HOT_PER_HOUR)]
+        for _ in range(per_hour):
+            ts = start + hour * 3600 + rng.random() * 3600
+            if rng.random() < 0.7:
+                # Zipf-ish choice among this hour's hot stories
+                link = hot[min(int(rng.paretovariate(1.2)) - 1, HOT_PER_HOUR - 1)]
+            else:
+                link = f"article-{rng.randrange(ARTICLES)}"
+            yield ts, link
+    return
+
+
+def main():
+    events = list(simulate())
+    end_time = events[-1][0]
+
+    engine = TrendingEngine(half_life_minutes=60, top_k=100, min_score=5)
+    all_time = {}
+    start = time.perf_counter()
+    for ts, link in events:
+        engine.record(link, now=ts)
+    record_s = time.perf_counter() - start
+    for _, link in events:
+        all_time[link] = all_time.get(link, 0) + 1
+
+    repeats = 200
+    start = time.perf_counter()
+    for _ in range(repeats):
+        top = engine.top(now=end_time)
+    engine_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    links = [f"article-{i}" for i in range(ARTICLES)]
+    start = time.perf_counter()
+    for _ in range(20):
+        legacy = [link for link in links if all_time.get(link, 0) > 15]
+    legacy_ms = (time.perf_counter() - start) * 1000 / 20
+
+    last_hour_hot = {f"article-{((HOURS - 1) * HOT_PER_HOUR + i) % ARTICLES}" for i in range(HOT_PER_HOUR)}
+    engine_hits = sum(1 for link, _ in top if link in last_hour_hot)
+    legacy_hits = sum(1 for link in legacy if link in last_hour_hot)
+
+    print(f"{len(events):,} view events over {HOURS}h, {ARTICLES:,} articles")
+    print(f"record(): {len(events) / record_s:,.0f} events/s")
+    print(f"trending read: engine top-K {engine_ms:.3f} ms, legacy views>15 scan {legacy_ms:.3f} ms")
+    print(f"engine list: {len(top)} articles, {engine_hits} of them from the current hour's hot set")
+    print(f"legacy list: {len(legacy)} articles, {legacy_hits} of them from the current hour's hot set")
+
+
+if __name__ == "__main__":
+    main()
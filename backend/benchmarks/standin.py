@@ -0,0 +1,296 @@
+"""
+Local stand-in for moneycontrol.com, used by the scraper benchmarks.
+
+Serves category listing pages in the same markup scrape_category parses
+(li.clearfix > a > h2, plus a relative "N hours ago" span) and article pages
+with og:image, JSON-LD (datePublished, articleBody) and filler markup, with
+configurable per-request latency. It binds to 127.0.0.1 and is addressed as
+www.moneycontrol.com.localhost, which curl resolves to the loopback address,
+so links pass the scraper's "moneycontrol.com" check unchanged.
+
+With article_template (a recorded article page, e.g. moneycontrol_sample.html)
+article pages are variants of that page instead: its real head and JSON-LD
+with each article's headline, image, publish time and body filled in. About
+half carry the body in JSON-LD, the rest only in the content container.
+
+Keep-alive (HTTP/1.1) is supported, so connection reuse shows up in results.
+Listing pages carry ETag / Last-Modified and answer matching conditional
+requests with 304; add_article() changes a listing between scrapes.
+
+Faults: inject_faults() answers the next N requests with an error status
+(or drops the connection), and error_rate fails a random share of them.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOST = "www.moneycontrol.com.localhost"
+
+WORDS = (
+    "shares rally slump profit quarter results bank nifty sensex rupee gold silver crude "
+    "ipo listing subscription dividend buyback merger stake sale rating upgrade downgrade "
+    "inflation repo rate policy budget tax growth exports imports earnings revenue margin "
+    "reliance tata infosys hdfc icici adani wipro maruti bajaj kotak ongc coal power steel"
+).split()
+
+
+def _slug(name):
+    return name.lower().replace(" ", "-")
+
+
+class _Server(ThreadingHTTPServer):
+    # Many concurrent connects from the thread-pool scraper; the default backlog of 5 drops some
+    request_queue_size = 256
+
+
+class StandinServer:
+    def __init__(self, categories, articles_per_category=24, listing_latency=0.05, article_latency=0.08,
+                 page_padding=20_000, seed=1, validators=True, error_rate=0.0, error_status=503,
+                 article_template=None):
+        """
+        categories: category names (e.g. scraper.CATEGORY_URLS keys).
+        Latencies are seconds added to every listing / article response.
+        page_padding: bytes of filler markup per article page, to make parsing realistic.
+        validators: send ETag / Last-Modified on listings and honour conditional requests.
+        error_rate: share of requests answered with error_status instead.
+        article_template: path of a recorded article page to build article pages from.
+        """
+        self.categories = list(categories)
+        self.articles_per_category = articles_per_category
+        self.listing_latency = listing_latency
+        self.article_latency = article_latency
+        self.page_padding = page_padding
+        self.rng = random.Random(seed)
+        self.validators = validators
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.faults = 0
+        self._fault_rng = random.Random(seed)
+        self._pending_faults = []   # statuses for the next requests; None drops the connection
+        self.lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._articles = {}   # path -> article dict
+        self._listings = {}   # path -> listing html
+        self._modified = {}   # listing path -> Last-Modified
+        self._filler = ""
+        self._template = _load_template(article_template) if article_template else None
+        self._build()
+
+    # --- content ---
+
+    def _words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def _build(self):
+        self._filler = "".join(f'<div class="nav-item"><a href="/x/{i}">{self._words(4)}</a></div>'
+                               for i in range(self.page_padding // 60))
+        for c, name in enumerate(self.categories):
+            items = [self._new_article(c, i, self.rng.randint(1, 72)) for i in range(self.articles_per_category)]
+            self._set_listing(name, items)
+
+    def _new_article(self, c, i, hours):
+        """Creates article i of category c, published `hours` ago. Returns its listing <li>."""
+        path = f"/news/business/{_slug(self.categories[c])}/article-{c}-{i}.html"
+        article = {
+            "headline": self._words(10).capitalize(),
+            "published": (datetime.now() - timedelta(hours=hours)).replace(microsecond=0).isoformat(),
+            "image": f"https://images.moneycontrol.com/static-mcnews/standin_{c}_{i}.jpg",
+            "body": "\n\n".join(self._words(60).capitalize() + "." for _ in range(6)),
+            "filler": self._filler,
+        }
+        if self._template:
+            article["variant"] = self.rng.choice(("json_ld", "container"))
+        self._articles[path] = article
+        return (f'<li class="clearfix"><a href="{{base}}{path}"><h2>{article["headline"]}</h2></a>'
+                f'<span>{hours} hours ago</span><p>{self._words(20)}</p></li>')
+
+    def _set_listing(self, name, items):
+        path = f"/news/business/{_slug(name)}/"
+        self._listings[path] = (
+            f"<html><head><title>{name}</title></head><body>{self._filler}<ul>{''.join(items)}</ul></body></html>"
+        )
+        self._modified[path] = formatdate(time.time(), usegmt=True)
+
+    def add_article(self, name):
+        """Publishes a new article at the top of a category's listing (the oldest one drops off)."""
+        c = self.categories.index(name)
+        path = f"/news/business/{_slug(name)}/"
+        with self.lock:
+            items = ['<li class="clearfix">' + item for item in self._listings[path].split('<li class="clearfix">')[1:]]
+            items[-1] = items[-1].split("</ul>")[0]
+            i = sum(1 for p in self._articles if p.startswith(path))
+            self._set_listing(name, [self._new_article(c, i, 1)] + items[:-1])
+
+    def article_html(self, path):
+        article = self._articles[path]
+        if self._template:
+            return self._template_html(article)
+        ld = json.dumps({
+            "@context": "https://schema.org",
+            "@type": "NewsArticle",
+            "headline": article["headline"],
+            "image": [article["image"]],
+            "datePublished": article["published"],
+            "articleBody": article["body"],
+        })
+        paragraphs = "".join(f"<p>{p}</p>" for p in article["body"].split("\n\n"))
+        return (
+            f'<html><head><title>{article["headline"]}</title>'
+            f'<meta property="og:image" content="{article["image"]}"/>'
+            f'<meta property="og:article:published_time" content="{article["published"]}"/>'
+            f'<script type="application/ld+json">{ld}</script></head>'
+            f'<body>{article["filler"]}<div class="content_wrapper arti-flow">{paragraphs}</div></body></html>'
+        )
+
+    def _template_html(self, article):
+        head, recorded = self._template
+        for key in ("headline", "image", "published"):
+            head = head.replace(recorded[key], article[key])
+        # The container variant renames the JSON-LD body, so extraction has to fall back to the markup
+        key = "articleBody" if article["variant"] == "json_ld" else "articleBodyRemoved"
+        paragraphs = "".join(f"<p>{p}</p>" for p in article["body"].split("\n\n"))
+        return (
+            f'{head}"{key}":{json.dumps(article["body"])}\n}}]\n</script></head>'
+            f'<body>{article["filler"]}<div class="content_wrapper arti-flow">{paragraphs}</div></body></html>'
+        )
+
+    # --- server ---
+
+    @property
+    def base_url(self):
+        return f"http://{HOST}:{self._server.server_address[1]}"
+
+    def category_urls(self):
+        return {name: f"{self.base_url}/news/business/{_slug(name)}/" for name in self.categories}
+
+    def article_urls(self):
+        return [f"{self.base_url}{path}" for path in self._articles]
+
+    def article_count(self):
+        return len(self._articles)
+
+    def inject_faults(self, count, status=503, retry_after=None):
+        """
+        Answers the next `count` requests with `status` (None: close the connection without
+        a response), with a Retry-After header if given.
+        """
+        with self.lock:
+            self._pending_faults += [(status, retry_after)] * count
+
+    def clear_faults(self):
+        with self.lock:
+            self._pending_faults = []
+
+    def _fault(self):
+        """(status, headers, body) of an injected fault for this request, or None."""
+        with self.lock:
+            if self._pending_faults:
+                status, retry_after = self._pending_faults.pop(0)
+            elif self.error_rate and self._fault_rng.random() < self.error_rate:
+                status, retry_after = self.error_status, None
+            else:
+                return None
+            self.faults += 1
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        return status, headers, b"injected fault"
+
+    def respond(self, handler):
+        """Returns (status, headers dict, body bytes) for a request; status None drops the connection."""
+        fault = self._fault()
+        if fault is not None:
+            return fault
+        path = handler.path.split("?", 1)[0]
+        if path in self._listings:
+            time.sleep(self.listing_latency)
+            body = self._listings[path].replace("{base}", self.base_url).encode("utf-8")
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+            if not self.validators:
+                return 200, headers, body
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            headers.update({"ETag": etag, "Last-Modified": self._modified[path]})
+            if handler.headers.get("If-None-Match") == etag:
+                with self.lock:
+                    self.not_modified += 1
+                return 304, {"ETag": etag}, b""
+            return 200, headers, body
+        elif path in self._articles:
+            time.sleep(self.article_latency)
+            body = self.article_html(path)
+        else:
+            return 404, {}, b"not found"
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body.encode("utf-8")
+
+    def start(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.connections += 1
+
+            def do_GET(self):
+                with standin.lock:
+                    standin.requests += 1
+                status, headers, body = standin.respond(self)
+                if status is None:
+                    self.close_connection = True
+                    return
+                with standin.lock:
+                    standin.bytes_sent += len(body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.connections = 0
+            self.not_modified = 0
+            self.bytes_sent = 0
+            self.faults = 0
+
+
+def _load_template(path):
+    """
+    A recorded article page cut off where its JSON-LD articleBody starts, and the
+    headline, image and publish time it carries (replaced per article).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    recorded = {
+        "headline": re.search(r"<title>(.*?)</title>", html, re.S).group(1),
+        "image": re.search(r'<meta content="([^"]+)" property="og:image"', html).group(1),
+        "published": re.search(r'<meta content="([^"]+)" property="og:article:published_time"', html).group(1),
+    }
+    return html[:html.index('"articleBody":')], recorded
@@ -0,0 +1,56 @@
+"""
+Synthetic article generator shared by the benchmark scripts.
+Produces dicts in the same shape as moneycontrol_news.json entries.
+"""
+import random
+from datetime import datetime, timedelta
+
+CATEGORIES = [
+    "Economy", "Companies", "Mutual Funds", "Personal Finance", "IPO", "Startup",
+    "Real Estate", "Banking", "Stocks", "Technical Analysis", "Equity Research",
+    "Commodities", "Currency", "Gold Rate", "Silver Rate", "AQI", "Earnings",
+]
+
+WORDS = (
+    "shares rally slump profit quarter results bank nifty sensex rupee gold silver crude "
+    "ipo listing subscription dividend buyback merger stake sale rating upgrade downgrade "
+    "inflation repo rate policy budget tax growth exports imports earnings revenue margin "
+    "reliance tata infosys hdfc icici adani wipro maruti bajaj kotak ongc coal power steel"
+).split()
+
+
+# Filler vocabulary so term frequencies look like real text (a few common words, a long tail)
+FILLER = [f"w{i}" for i in range(20_000)]
+
+
+def _words(rng, count, domain_share):
+    words = []
+    for _ in range(count):
+        if rng.random() < domain_share:
+            words.append(rng.choice(WORDS))
+        else:
+            # Pareto-distributed index -> Zipf-like frequency over the filler vocabulary
+            words.append(FILLER[min(int(rng.paretovariate(1.0)) - 1, len(FILLER) - 1)])
+    return " ".join(words)
+
+
+def make_articles(n, seed=42, with_content=True):
+    rng = random.Random(seed)
+    now = datetime.now()
+    articles = []
+    for i in range(n):
+        ts = now - timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+        headline = _words(rng, rng.randint(6, 14), 0.3).capitalize()
+        article = {
+            "category": rng.choice(CATEGORIES),
+            "headline": headline,
+            "link": f"https://www.moneycontrol.com/news/business/synthetic-{i}.html",
+            "image_url": f"https://images.moneycontrol.com/static-mcnews/synthetic_{i}.jpg",
+            "timestamp": ts.strftime("%d %b %Y, %I:%M %p"),
+            "sentiment": rng.choice(["positive", "negative", "neutral"]),
+            "sentiment_score": str(rng.random()),
+        }
+        if with_content:
+            article["full_content"] = _words(rng, rng.randint(200, 600), 0.02)
+        articles.append(article)
+    return articles
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, DateTime, Float, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Date, ForeignKey, DateTime, Float, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -6,10 +6,76 @@ import bcrypt
 import os
 from datetime import datetime
 
-DATABASE_URL = "sqlite:///./marketpulse.db"
-
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_PATH = "./marketpulse.db"
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+# Applied to every connection. WAL lets readers run alongside the single writer;
+# synchronous=NORMAL is durable across app crashes in WAL mode and skips an fsync per commit.
+SQLITE_PRAGMAS = {
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")) * -1,   # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE_MB", "256")) * 1024 * 1024,
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+}
+
+# Rows per multi-row insert and values per IN (...) list, well under SQLite's bound-parameter limit
+WRITE_BATCH_SIZE = 200
+IN_BATCH_SIZE = 500
+
+def chunks(values, size):
+    """Lists of at most `size` consecutive items of `values`, for batched statements."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def create_write_engine(path=DATABASE_PATH):
+    """Engine for writes: WAL journal, tuned pragmas, and explicit BEGIN so SAVEPOINTs nest correctly."""
+    write_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(write_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy drive transactions (pysqlite's implicit BEGIN breaks savepoints)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(write_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return write_engine
+
+def create_read_engine(path=DATABASE_PATH, pool_size=8):
+    """Read-only engine (mode=ro) with its own connection pool; never takes the write lock."""
+    read_engine = create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            if name != "synchronous":
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return read_engine
+
+engine = create_write_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Readers use a separate pool of read-only connections
+read_engine = create_read_engine()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
 class User(Base):
@@ -39,6 +105,9 @@ class NewsAnalytics(Base):
     id = Column(Integer, primary_key=True, index=True)
     news_link = Column(String, unique=True, index=True)
     views = Column(Integer, default=0)
+    # Time-decayed trending score as of trend_updated_at (see trending.py)
+    trend_score = Column(Float, nullable=True)
+    trend_updated_at = Column(DateTime, nullable=True)
 
 class SentNotification(Base):
     __tablename__ = "sent_notifications"
@@ -66,9 +135,85 @@ class NewsItem(Base):
     category = Column(String, index=True)
     sentiment = Column(String, nullable=True)
     sentiment_score = Column(Float, nullable=True)
+    # Hash of the stored fields, so a re-scraped article is only rewritten when it changed
+    content_hash = Column(String, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Composite index for keyset pagination on (timestamp, link)
+    __table_args__ = (Index("ix_news_items_timestamp_link", "timestamp", "link"),)
+
+class NewsSymbol(Base):
+    """Stock symbols an article is tagged with, for indexed /news?stocks= lookups."""
+    __tablename__ = "news_item_symbols"
+
+    id = Column(Integer, primary_key=True, index=True)
+    news_link = Column(String, index=True)
+    symbol = Column(String)
+
+    __table_args__ = (Index("ix_news_item_symbols_symbol_link", "symbol", "news_link"),)
+
+class AppState(Base):
+    """Small key/value table for process-shared bookkeeping (e.g. the news store version)."""
+    __tablename__ = "app_state"
+
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+class ArticleBody(Base):
+    """Compressed full text of a news article, kept apart from news_items and loaded only on demand (see article_store.py)."""
+    __tablename__ = "article_bodies"
+
+    link = Column(String, primary_key=True)
+    body = Column(LargeBinary)   # zlib-compressed UTF-8
+    size = Column(Integer)       # uncompressed bytes
+    body_hash = Column(String)
+    updated_at = Column(DateTime)
+
+class HttpCacheEntry(Base):
+    """Validators, body hash and parsed rows of a category listing page, for conditional re-fetches."""
+    __tablename__ = "http_cache"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String)
+    size = Column(Integer, default=0)
+    rows = Column(Text)   # JSON list of parsed listing rows
+    fetched_at = Column(DateTime)
+
+class SentimentCacheEntry(Base):
+    """Sentiment result per (model, normalized text) hash, evicted least-recently-used first."""
+    __tablename__ = "sentiment_cache"
+
+    key = Column(String, primary_key=True)
+    label = Column(String)
+    score = Column(Float)
+    last_used = Column(Float, index=True)   # epoch seconds
+
+# Columns added after a table was first created; create_all() won't add them to existing tables
+ADDED_COLUMNS = {
+    "news_analytics": {
+        "trend_score": "FLOAT",
+        "trend_updated_at": "DATETIME",
+    },
+    "news_items": {
+        "content_hash": "VARCHAR",
+        "updated_at": "DATETIME",
+    },
+}
+
+def migrate_columns():
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+                    print(f"Added column {table}.{name}")
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrate_columns()
 
 def get_db():
     db = SessionLocal()
@@ -77,6 +222,13 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def hash_password(password: str):
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
@@ -0,0 +1,157 @@
+"""
+Single-writer queue for SQLite.
+
+SQLite allows one writer at a time. With request handlers, the notification
+job, the view counter and ingestion each opening their own write
+transactions, writers pile up on the database lock and eventually fail
+with "database is locked". Instead, every write is submitted here as a
+function of a session and executed by one thread, which runs everything
+that queued up while the previous commit was in flight as one transaction
+(group commit): many small writes share a single commit.
+
+An operation that has to act once its writes are visible (e.g. drop a cache
+entry) registers that with after_commit; it runs after the commit, on the
+writer thread, and not at all if the operation's changes are rolled back.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from database import SessionLocal
+
+# Most operations folded into one commit
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "64"))
+
+_STOP = object()
+
+
+class DBWriter:
+    def __init__(self, db_session_factory=SessionLocal, max_batch=DB_WRITE_BATCH_SIZE):
+        self.db_session_factory = db_session_factory
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.commits = 0
+        self.operations = 0
+        self.failures = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._callbacks = None   # the running batch's after_commit callbacks (writer thread only)
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10):
+        """Finishes everything already queued, then stops the writer thread."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, operation):
+        """
+        Queues `operation(session)` and returns a Future for its result.
+        The operation must not commit (or call back into the writer); it runs
+        in a savepoint, so if it raises only its own changes are rolled back.
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Already on the writer thread: queueing would wait on ourselves
+            future.set_exception(RuntimeError("DBWriter.submit called from the writer thread"))
+            return future
+        if self._thread is None:
+            self.start()
+        self.queue.put((operation, future))
+        return future
+
+    def after_commit(self, callback):
+        """
+        Called from inside an operation: runs `callback()` once the operation's transaction has
+        committed. Outside an operation on this writer it runs at once.
+        """
+        if self._callbacks is None or threading.current_thread() is not self._thread:
+            callback()
+            return
+        self._callbacks.append(callback)
+
+    def run(self, operation, timeout=None):
+        """Blocking submit: returns the operation's result once it is committed, or raises its error."""
+        return self.submit(operation).result(timeout)
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            stop = False
+            # Group commit: everything that queued up behind the first operation joins its transaction
+            while len(batch) < self.max_batch:
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        db = self.db_session_factory()
+        done = []
+        callbacks = self._callbacks = []
+        try:
+            for operation, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                registered = len(callbacks)
+                try:
+                    with db.begin_nested():
+                        result = operation(db)
+                    done.append((future, result))
+                except Exception as e:
+                    # Rolled back to the savepoint: its callbacks go with it
+                    del callbacks[registered:]
+                    self.failures += 1
+                    future.set_exception(e)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error committing write batch: {e}")
+            self.failures += len(done)
+            for future, _ in done:
+                future.set_exception(e)
+            return
+        finally:
+            self._callbacks = None
+            db.close()
+
+        self.commits += 1
+        self.operations += len(done)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in after-commit callback: {e}")
+        for future, result in done:
+            future.set_result(result)
+
+    def stats(self):
+        return {
+            "commits": self.commits,
+            "operations": self.operations,
+            "failures": self.failures,
+            "queued": self.queue.qsize(),
+            "ops_per_commit": round(self.operations / self.commits, 2) if self.commits else 0.0,
+        }
+
+
+# Shared writer for the application database
+DB_WRITER = DBWriter()
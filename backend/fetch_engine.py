@@ -0,0 +1,156 @@
+"""
+Asyncio fetch engine for the scraper.
+
+One curl_cffi AsyncSession (a pooled, keep-alive client) is shared by
+listing and article fetches, instead of each ThreadPoolExecutor worker
+opening its own connection per request. Concurrency is capped per host,
+and each batch of fetches runs under an overall deadline, so one slow
+server can't hold up a scrape indefinitely. Requests go through the shared
+resilience layer (per-host rate limit, retries with backoff, circuit breaker).
+
+The event loop runs on its own daemon thread, so the (threaded) scraper
+calls in with plain blocking methods such as fetch_pages().
+"""
+import asyncio
+import os
+import threading
+from urllib.parse import urlsplit
+
+from curl_cffi.requests import AsyncSession
+
+from resilience import RESILIENCE, CircuitOpenError
+
+# Concurrent requests per host, and connections in the shared pool
+FETCH_CONCURRENCY_PER_HOST = int(os.getenv("FETCH_CONCURRENCY_PER_HOST", "16"))
+FETCH_MAX_CLIENTS = int(os.getenv("FETCH_MAX_CLIENTS", "32"))
+# Per-request timeout, and the overall deadline for one batch (e.g. all listing pages)
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+FETCH_BATCH_DEADLINE = float(os.getenv("FETCH_BATCH_DEADLINE", "60"))
+
+
+class FetchEngine:
+    def __init__(self, headers=None, per_host=FETCH_CONCURRENCY_PER_HOST, max_clients=FETCH_MAX_CLIENTS,
+                 timeout=FETCH_TIMEOUT, deadline=FETCH_BATCH_DEADLINE, impersonate="chrome", resilience=RESILIENCE):
+        self.headers = headers or {}
+        self.per_host = per_host
+        self.max_clients = max_clients
+        self.timeout = timeout
+        self.deadline = deadline
+        self.impersonate = impersonate
+        self.resilience = resilience
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0     # fetches refused by an open circuit breaker
+        self.timeouts = 0     # fetches cut off by a batch deadline
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._host_limits = {}
+        self._start_lock = threading.Lock()
+
+    # --- event loop thread ---
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="fetch-engine", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def submit(self, coro):
+        """Schedules a coroutine on the engine's loop. Returns a concurrent.futures.Future for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine on the engine's loop and waits for its result."""
+        return self.submit(coro).result(timeout)
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._session is not None:
+            self.run(self._session.close())
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._host_limits = {}
+
+    # --- fetching (on the loop) ---
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = AsyncSession(
+                headers=self.headers, impersonate=self.impersonate, max_clients=self.max_clients
+            )
+        return self._session
+
+    async def get(self, url, headers=None, timeout=None):
+        """
+        GETs one URL with extra request headers, retrying failures. Returns the response
+        (any status), or None on error or while the host's circuit breaker is open.
+        """
+        host = urlsplit(url).hostname
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        async with limit:
+            self.requests += 1
+            try:
+                return await self.resilience.call_async(
+                    url, lambda: self._get_session().get(url, headers=headers, timeout=timeout or self.timeout))
+            except CircuitOpenError:
+                self.rejected += 1
+                return None
+            except Exception as e:
+                self.errors += 1
+                print(f"Error fetching {url}: {e}")
+                return None
+
+    async def fetch(self, url, timeout=None):
+        """GETs one URL. Returns the response body as text, or None on any error / non-200."""
+        response = await self.get(url, timeout=timeout)
+        if response is None:
+            return None
+        if response.status_code != 200:
+            self.errors += 1
+            print(f"Error fetching {url}: HTTP {response.status_code}")
+            return None
+        return response.text
+
+    async def _gather(self, coros, deadline=None):
+        """Runs {key: coroutine} concurrently; anything unfinished at the deadline is cancelled. Returns {key: result or None}."""
+        if not coros:
+            return {}
+        tasks = {asyncio.ensure_future(coro): key for key, coro in coros.items()}
+        done, pending = await asyncio.wait(tasks, timeout=deadline or self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.timeouts += len(pending)
+            print(f"Fetch deadline reached: {len(pending)} of {len(coros)} requests cancelled.")
+        results = {key: None for key in coros}
+        for task in done:
+            results[tasks[task]] = task.result()
+        return results
+
+    async def fetch_all(self, urls, deadline=None):
+        """Fetches `urls` concurrently under the batch deadline. Returns {url: text or None}."""
+        return await self._gather({url: self.fetch(url) for url in dict.fromkeys(urls)}, deadline)
+
+    async def get_all(self, url_headers, deadline=None):
+        """GETs {url: extra headers} concurrently under the batch deadline. Returns {url: response or None}."""
+        return await self._gather({url: self.get(url, headers) for url, headers in url_headers.items()}, deadline)
+
+    # --- blocking entry points ---
+
+    def fetch_pages(self, urls, deadline=None):
+        return self.run(self.fetch_all(urls, deadline))
+
+    def get_pages(self, url_headers, deadline=None):
+        return self.run(self.get_all(url_headers, deadline))
+
+    def stats(self):
+        return {"requests": self.requests, "errors": self.errors, "timeouts": self.timeouts, "rejected": self.rejected}
@@ -0,0 +1,183 @@
+"""
+Persistent cache for category listing pages.
+
+For each listing URL the http_cache table keeps the response's ETag and
+Last-Modified, a hash of the body, and the rows parsed from it. The next
+refresh sends a conditional request. If the server answers 304, or sends
+a body with the same hash, the stored rows are reused and the page is not
+parsed again. Only changed pages go through BeautifulSoup.
+
+Per-run counts (304s, unchanged hashes, parsed pages, bytes saved) are
+kept in last_run and printed at the end of each scrape.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+
+from database import ReadSessionLocal, HttpCacheEntry
+from db_writer import DB_WRITER
+
+
+def body_hash(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+def _header(headers, name):
+    """Case-insensitive header lookup on a dict or a response's headers object."""
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+class ListingCache:
+    def __init__(self, db_session_factory=ReadSessionLocal, writer=DB_WRITER):
+        self.db_session_factory = db_session_factory
+        self.writer = writer
+        self.lock = threading.Lock()
+        self.entries = None   # url -> entry dict, loaded on first use
+        self.pending = {}     # url -> entry dict waiting to be written
+        self.last_run = None
+        self._new_run()
+
+    # --- entries ---
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        entries = {}
+        db = self.db_session_factory()
+        try:
+            for row in db.query(HttpCacheEntry).all():
+                entries[row.url] = {
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "content_hash": row.content_hash,
+                    "size": row.size or 0,
+                    "rows": json.loads(row.rows or "[]"),
+                }
+        except Exception as e:
+            # e.g. the table doesn't exist yet; everything is fetched in full
+            print(f"Error loading listing cache: {e}")
+        finally:
+            db.close()
+        self.entries = entries
+
+    def get(self, url):
+        with self.lock:
+            self._load()
+            return self.entries.get(url)
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for a cached URL (empty if it has never been parsed)."""
+        entry = self.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def invalidate(self, url=None):
+        """Forgets one URL (or all), so its next fetch is unconditional and parsed."""
+        with self.lock:
+            self._load()
+            urls = [url] if url is not None else list(self.entries)
+            for u in urls:
+                self.entries.pop(u, None)
+                self.pending.pop(u, None)
+
+        def delete(db):
+            query = db.query(HttpCacheEntry)
+            if url is not None:
+                query = query.filter(HttpCacheEntry.url == url)
+            query.delete(synchronize_session=False)
+        self.writer.run(delete)
+
+    # --- per-response bookkeeping ---
+
+    def cached_rows(self, url, status, headers=None, body=None):
+        """
+        Stored rows for a response that didn't change the page (a 304, or a
+        200 whose body hashes the same), else None: the caller parses `body`
+        and hands the rows to store().
+        """
+        with self.lock:
+            self._load()
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            if status == 304:
+                self.run["not_modified"] += 1
+                self.run["bytes_saved"] += entry["size"]
+                return entry["rows"]
+            if body is not None and body_hash(body) == entry["content_hash"]:
+                self.run["unchanged"] += 1
+                # Same content, possibly new validators; keep them for the next conditional request
+                etag, last_modified = _header(headers, "ETag"), _header(headers, "Last-Modified")
+                if (etag, last_modified) != (entry["etag"], entry["last_modified"]):
+                    entry["etag"], entry["last_modified"] = etag, last_modified
+                    self.pending[url] = entry
+                return entry["rows"]
+            return None
+
+    def store(self, url, headers, body, rows):
+        """Records a parsed page; written with the next flush()."""
+        entry = {
+            "etag": _header(headers, "ETag"),
+            "last_modified": _header(headers, "Last-Modified"),
+            "content_hash": body_hash(body),
+            "size": len(body),
+            "rows": rows,
+        }
+        with self.lock:
+            self._load()
+            self.entries[url] = entry
+            self.pending[url] = entry
+            self.run["parsed"] += 1
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        now = datetime.now()
+
+        def write(db):
+            for url, entry in pending.items():
+                db.merge(HttpCacheEntry(
+                    url=url,
+                    etag=entry["etag"],
+                    last_modified=entry["last_modified"],
+                    content_hash=entry["content_hash"],
+                    size=entry["size"],
+                    rows=json.dumps(entry["rows"], ensure_ascii=False),
+                    fetched_at=now,
+                ))
+        try:
+            self.writer.run(write)
+        except Exception as e:
+            print(f"Error saving listing cache: {e}")
+
+    # --- run stats ---
+
+    def _new_run(self):
+        self.run = {"not_modified": 0, "unchanged": 0, "parsed": 0, "bytes_saved": 0}
+
+    def finish_run(self):
+        """Writes pending entries, prints and returns this run's counts, and starts a new run."""
+        self.flush()
+        with self.lock:
+            stats, self.last_run = self.run, self.run
+            self._new_run()
+        print(f"Listing cache: {stats['not_modified']} not modified (304), {stats['unchanged']} unchanged, "
+              f"{stats['parsed']} parsed, {stats['bytes_saved'] / 1024:.0f} KB saved")
+        return stats
+
+
+LISTING_CACHE = ListingCache()
@@ -0,0 +1,26 @@
+"""
+One-time import of the legacy moneycontrol_news.json archive into news_items.
+
+The scraper also runs this automatically when the table is empty, so this is
+only needed to import a different file or to re-import after editing one.
+Re-running is safe: unchanged articles are skipped.
+
+    python import_news_json.py [path/to/news.json]
+"""
+import sys
+
+from database import init_db
+from news_store import NEWS_STORE
+
+DEFAULT_FILE = "moneycontrol_news.json"
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FILE
+    init_db()
+    written, _ = NEWS_STORE.import_json(path)
+    print(f"Imported {written} articles from {path}; news_items now has {NEWS_STORE.count()} rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+Deep fetch as a three-stage pipeline: fetch -> parse -> sentiment.
+
+The async deep fetch ran its steps one after another: every article page was
+fetched, then every headline went through the sentiment model, then every
+page was parsed in the scraper's thread, where BeautifulSoup/lxml held the
+GIL against the model and everything else in the API process. Here the
+stages run at the same time, joined by bounded queues:
+
+    fetch      article pages on the shared FetchEngine, PIPELINE_FETCH_CONCURRENCY
+               in flight (under the batch deadline, through the resilience layer)
+    parse      extract_article in a ProcessPoolExecutor of PIPELINE_PARSE_WORKERS
+               processes (0: in this process), two pages in flight per worker
+    sentiment  headlines in batches of up to PIPELINE_INFER_BATCH, sent as one
+               call to the sentiment batcher (a partial batch goes once no page
+               has arrived for PIPELINE_INFER_WAIT_MS)
+
+A stage that falls behind fills the queue in front of it (PIPELINE_QUEUE_SIZE
+pages), and the stage feeding that queue waits: fetching stops while parsing
+is behind, so at most a queue's worth of pages is held in memory.
+
+Each run records, per stage, items, wall time, throughput and time spent on
+items, and per queue its depth (max, average) and how long producers were
+blocked on it. The stage whose input queue is full and whose producer is
+blocked is the bottleneck. stats() is served on /debug/scheduler.
+
+A stage that raises still ends its output: it sends the error on, then DONE,
+and stops reading its input (the stage feeding it no longer waits on the
+queue). run() raises PipelineError once every stage has stopped.
+
+PIPELINE_START_METHOD picks the multiprocessing start method for the parse
+pool: forkserver by default (spawn where there is none). Workers are not
+forked from the API process, whose fetch engine, DB writer and scheduler
+threads may hold locks at fork time. PIPELINE_START_METHOD=fork opts back
+in. The workers only run parse_page, so it must stay importable from here.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from article_extractor import extract_article
+
+PIPELINE_FETCH_CONCURRENCY = int(os.getenv("PIPELINE_FETCH_CONCURRENCY", "16"))
+# Default: a core for every worker but one, left to the API and the model; none on a single core,
+# where a worker process only adds the cost of shipping pages to it
+PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", str(max((os.cpu_count() or 1) - 1, 0))))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+PIPELINE_INFER_BATCH = int(os.getenv("PIPELINE_INFER_BATCH", "32"))
+PIPELINE_INFER_WAIT_MS = float(os.getenv("PIPELINE_INFER_WAIT_MS", "50"))
+PIPELINE_START_METHOD = os.getenv("PIPELINE_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# End of a stage's output
+DONE = object()
+
+
+class PipelineError(Exception):
+    pass
+
+
+class StageFailed:
+    """Sent on by a stage that raised, ahead of its DONE."""
+
+    def __init__(self, stage, error):
+        self.stage = stage
+        self.error = error
+
+
+def parse_page(html, image_url, timestamp):
+    """extract_article for the parse workers. Returns (fields, None), or (None, error message)."""
+    try:
+        return extract_article(html, image_url, timestamp), None
+    except Exception as e:
+        return None, str(e)
+
+
+class StageQueue:
+    """A bounded queue that records its depth and how long producers waited on it."""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.queue = queue.Queue(maxsize)
+        self.max_depth = 0
+        self.depth_total = 0
+        self.puts = 0
+        self.blocked_seconds = 0.0
+        self.closed = False
+
+    def put(self, item):
+        """Waits for room; dropped once the consumer has closed the queue."""
+        started = time.perf_counter()
+        while True:
+            if self.closed:
+                return
+            try:
+                self.queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.blocked_seconds += time.perf_counter() - started
+        if item is not DONE and not isinstance(item, StageFailed):
+            depth = self.queue.qsize()
+            self.puts += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def get(self, timeout=None):
+        """The next item; raises queue.Empty after `timeout` seconds (None: wait)."""
+        return self.queue.get(timeout=timeout)
+
+    def close(self):
+        """The consumer stopped: later puts return at once."""
+        self.closed = True
+
+    def stats(self):
+        return {
+            "capacity": self.maxsize,
+            "max_depth": self.max_depth,
+            "avg_depth": round(self.depth_total / self.puts, 2) if self.puts else 0.0,
+            "producer_blocked_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+class StageMetrics:
+    def __init__(self, name, concurrency):
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0      # summed per-item time (fetch latency, parse time, batch time)
+        self.started = None
+        self.finished = None
+
+    def begin(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def record(self, seconds, items=1, error=False):
+        self.items += items
+        self.errors += error
+        self.busy_seconds += seconds
+        self.finished = time.perf_counter()
+
+    def stats(self):
+        wall = (self.finished - self.started) if self.started is not None and self.finished is not None else 0.0
+        return {
+            "concurrency": self.concurrency,
+            "items": self.items,
+            "errors": self.errors,
+            "wall_seconds": round(wall, 3),
+            "items_per_second": round(self.items / wall, 1) if wall else 0.0,
+            "avg_item_ms": round(self.busy_seconds / self.items * 1000, 2) if self.items else 0.0,
+        }
+
+
+class IngestPipeline:
+    def __init__(self, engine, classify, parse=parse_page, fetch_concurrency=PIPELINE_FETCH_CONCURRENCY,
+                 parse_workers=PIPELINE_PARSE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE,
+                 infer_batch=PIPELINE_INFER_BATCH, infer_wait_ms=PIPELINE_INFER_WAIT_MS,
+                 start_method=PIPELINE_START_METHOD):
+        """
+        engine: FetchEngine the pages are fetched on.
+        classify: function of a list of headlines returning one sentiment result per headline.
+        parse: function of (html, image_url, timestamp) returning (fields, error); must be picklable
+        (module-level) when parse_workers > 0.
+        """
+        self.engine = engine
+        self.classify = classify
+        self.parse = parse
+        self.fetch_concurrency = max(fetch_concurrency, 1)
+        self.parse_workers = max(parse_workers, 0)
+        self.queue_size = max(queue_size, 1)
+        self.infer_batch = max(infer_batch, 1)
+        self.infer_wait = infer_wait_ms / 1000
+        self.start_method = start_method
+        self.runs = 0
+        self.last_run = None
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.lock = threading.Lock()   # one run at a time
+
+    # --- parse pool ---
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None and self.parse_workers:
+                context = multiprocessing.get_context(self.start_method)
+                self._pool = ProcessPoolExecutor(self.parse_workers, mp_context=context)
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # --- stages ---
+
+    def _stage(self, name, body, source, out, *args):
+        """
+        Runs body(*args): its output always ends with DONE, after StageFailed if the body raised,
+        and its input is closed once it stopped reading it.
+        """
+        try:
+            body(*args)
+        except BaseException as e:
+            print(f"Pipeline {name} stage failed: {e!r}")
+            out.put(StageFailed(name, e))
+        finally:
+            if source is not None:
+                source.close()
+            out.put(DONE)
+
+    def _fetch_stage(self, items, out, metrics):
+        """Fetches pages, at most fetch_concurrency at once, and passes (index, html or None) on."""
+        metrics.begin()
+        deadline = time.perf_counter() + self.engine.deadline
+        pending = {}
+        todo = iter(enumerate(items))
+        exhausted = False
+        try:
+            while not exhausted or pending:
+                while not exhausted and len(pending) < self.fetch_concurrency:
+                    entry = next(todo, None)
+                    if entry is None:
+                        exhausted = True
+                        break
+                    index, item = entry
+                    pending[self.engine.submit(self.engine.fetch(item["link"]))] = (index, time.perf_counter())
+                if not pending or out.closed:
+                    break
+                finished, _ = wait(pending, timeout=max(deadline - time.perf_counter(), 0),
+                                   return_when=FIRST_COMPLETED)
+                if not finished:
+                    # Batch deadline: what is still in flight is cancelled, and the rest is not fetched
+                    skipped = list(pending.values()) + [(index, None) for index, _ in todo]
+                    for future in pending:
+                        future.cancel()
+                    self.engine.timeouts += len(skipped)
+                    print(f"Fetch deadline reached: {len(skipped)} of {len(items)} article pages not fetched.")
+                    for index, _ in skipped:
+                        out.put((index, None))
+                    break
+                for future in finished:
+                    index, started = pending.pop(future)
+                    html = future.result()
+                    metrics.record(time.perf_counter() - started, error=html is None)
+                    out.put((index, html))
+        finally:
+            # Still in flight if a fetch raised or the parse stage stopped reading
+            for future in pending:
+                future.cancel()
+
+    def _parse_stage(self, items, source, out, metrics):
+        """Parses fetched pages in the pool (two per worker in flight) and passes (index, fields or None) on."""
+        pool = self._get_pool()
+        limit = self.parse_workers * 2 if pool is not None else 1
+        pending = {}
+        done = False
+        metrics.begin()
+        try:
+            while (not done or pending) and not out.closed:
+                # Take more pages while there is room; only wait on the queue when nothing is in flight
+                while not done and len(pending) < limit:
+                    try:
+                        entry = source.get(timeout=0.1 if not pending else 0.005)
+                    except queue.Empty:
+                        break
+                    if entry is DONE:
+                        done = True
+                        break
+                    if isinstance(entry, StageFailed):
+                        out.put(entry)
+                        continue
+                    index, html = entry
+                    if html is None:
+                        out.put((index, None))
+                        continue
+                    item = items[index]
+                    args = (html, item.get("image_url"), item.get("timestamp"))
+                    started = time.perf_counter()
+                    if pool is not None:
+                        try:
+                            pending[pool.submit(self.parse, *args)] = (index, started)
+                            continue
+                        except BrokenProcessPool:
+                            print("Parse pool broke; parsing in this process from here on.")
+                            pool, limit = None, 1
+                            self.shutdown()
+                    self._parsed(items, index, self.parse(*args), started, out, metrics)
+                if pending:
+                    finished, _ = wait(pending, timeout=0.005, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index, started = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            # The page's worker died (BrokenProcessPool) or the pool was shut down under us
+                            result = (None, str(e) or type(e).__name__)
+                        self._parsed(items, index, result, started, out, metrics)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _parsed(self, items, index, result, started, out, metrics):
+        fields, error = result
+        if error is not None:
+            print(f"Error parsing article {items[index]['link']}: {error}")
+        metrics.record(time.perf_counter() - started, error=error is not None)
+        out.put((index, fields))
+
+    def _infer_stage(self, items, source, results, metrics, failures):
+        """
+        Runs headline sentiment in batches as parsed pages arrive; fills results[index] = (fields, sentiment).
+        Errors sent on by the stages before it go to `failures`.
+        """
+        batch = []
+        done = False
+        metrics.begin()
+        while not done:
+            try:
+                # A partial batch waits a little for more pages, then goes
+                entry = source.get(timeout=self.infer_wait if batch else None)
+            except queue.Empty:
+                entry = None
+            if entry is DONE:
+                done = True
+            elif isinstance(entry, StageFailed):
+                failures.append(entry)
+            elif entry is not None:
+                batch.append(entry)
+                if len(batch) < self.infer_batch:
+                    continue
+            if batch:
+                self._infer(items, batch, results, metrics)
+                batch = []
+
+    def _infer(self, items, batch, results, metrics):
+        started = time.perf_counter()
+        error = False
+        try:
+            sentiments = self.classify([items[index].get("headline", "") for index, _ in batch])
+        except Exception as e:
+            print(f"Sentiment analysis failed: {e}")
+            sentiments = [None] * len(batch)
+            error = True
+        for (index, fields), sentiment in zip(batch, sentiments):
+            results[index] = (fields, sentiment)
+        metrics.record(time.perf_counter() - started, items=len(batch), error=error)
+
+    # --- run ---
+
+    def run(self, items):
+        """
+        Fetches, parses and classifies `items` (article dicts with link, headline and the known
+        image_url / timestamp). Returns [(fields or None, sentiment result or None)] in item order:
+        fields are extract_article's, None if the page couldn't be fetched or parsed.
+        Raises PipelineError if a stage failed (not a page: the stage itself).
+        """
+        items = list(items)
+        if not items:
+            return []
+        with self.lock:
+            started = time.perf_counter()
+            fetched = StageQueue("fetch->parse", self.queue_size)
+            parsed = StageQueue("parse->sentiment", self.queue_size)
+            stages = {
+                "fetch": StageMetrics("fetch", self.fetch_concurrency),
+                "parse": StageMetrics("parse", self.parse_workers),
+                "sentiment": StageMetrics("sentiment", self.infer_batch),
+            }
+            results = [(None, None)] * len(items)
+            failures = []
+            threads = [
+                threading.Thread(target=self._stage, name="pipeline-fetch", daemon=True,
+                                 args=("fetch", self._fetch_stage, None, fetched,
+                                       items, fetched, stages["fetch"])),
+                threading.Thread(target=self._stage, name="pipeline-parse", daemon=True,
+                                 args=("parse", self._parse_stage, fetched, parsed,
+                                       items, fetched, parsed, stages["parse"])),
+            ]
+            for thread in threads:
+                thread.start()
+            # Inference runs in the calling thread
+            try:
+                self._infer_stage(items, parsed, results, stages["sentiment"], failures)
+            finally:
+                # Stops the parse stage if inference raised, and the parse stage stops the fetch stage
+                parsed.close()
+                for thread in threads:
+                    thread.join()
+            if failures:
+                raise PipelineError(f"{failures[0].stage} stage failed: {failures[0].error!r}") from failures[0].error
+
+            wall = time.perf_counter() - started
+            self.runs += 1
+            self.last_run = {
+                "articles": len(items),
+                "wall_seconds": round(wall, 3),
+                "articles_per_second": round(len(items) / wall, 1) if wall else 0.0,
+                "stages": {name: metrics.stats() for name, metrics in stages.items()},
+                "queues": {q.name: q.stats() for q in (fetched, parsed)},
+            }
+            print(f"Pipeline: {len(items)} articles in {wall:.2f}s; "
+                  + ", ".join(f"{name} {m['items_per_second']}/s" for name, m in self.last_run["stages"].items())
+                  + "; queue max depth "
+                  + ", ".join(f"{name} {q['max_depth']}/{q['capacity']}" for name, q in self.last_run["queues"].items()))
+            return results
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "fetch_concurrency": self.fetch_concurrency,
+            "parse_workers": self.parse_workers,
+            "queue_size": self.queue_size,
+            "infer_batch": self.infer_batch,
+            "last_run": self.last_run,
+        }
@@ -0,0 +1,143 @@
+"""
+News ingestion worker.
+
+Scraping runs here, off the request path: each tick refreshes the
+categories the RefreshScheduler says are due, saves the result to the
+news store and publishes a new NewsSnapshot. Request handlers only read
+the current snapshot, so they never start a scrape or wait on the network.
+
+INGEST_MODE picks where the worker runs:
+    "inline"   an APScheduler job inside the API process (default)
+    "process"  a separate process (python ingest_worker.py); the API only
+               polls the news store and swaps in each new version
+
+Run standalone from the backend directory:
+    python ingest_worker.py          # loop until interrupted
+    python ingest_worker.py --once   # one tick, e.g. from cron
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+
+from news_store import NEWS_STORE
+from news_snapshot import SNAPSHOTS
+import scraper
+
+INGEST_MODE = os.getenv("INGEST_MODE", "inline")
+# How often the worker checks for due categories
+INGEST_TICK_SECONDS = float(os.getenv("INGEST_TICK_SECONDS", "15"))
+# How often an API process in "process" mode checks the store for a new version
+SNAPSHOT_POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", "5"))
+
+
+class IngestWorker:
+    def __init__(self, publisher=SNAPSHOTS, store=NEWS_STORE, scheduler=None):
+        self.publisher = publisher
+        self.store = store
+        self.scheduler = scheduler or scraper.REFRESH_SCHEDULER
+        self.ticks = 0
+        self.last_tick = None
+        self.last_error = None
+        self._stop = threading.Event()
+
+    def bootstrap(self):
+        """First snapshot: the news store (importing the legacy JSON archive if it is empty), or a headline scrape."""
+        version, saved_at = self.store.state()
+        if version == 0 and os.path.exists(scraper.JSON_FILE):
+            print(f"News store is empty. Importing {scraper.JSON_FILE}...")
+            self.store.import_json(scraper.JSON_FILE)
+            version, saved_at = self.store.state()
+
+        if version:
+            news = self.store.load()
+            # An imported archive has no scrape time, so it is refreshed right away
+            self.scheduler.seed(saved_at or 0)
+            self.publisher.publish(news, version)
+            return
+
+        print("No existing data. Running initial headline scrape...")
+        self.scheduler.log_decision(scraper.CATEGORY_URLS, "initial")
+        headlines = scraper.scrape_moneycontrol()
+        if headlines:
+            # Headlines first; the next tick's ingest deep-fetches details
+            scraper.save_news(headlines)
+            self.publisher.publish(headlines, self.store.state()[0])
+
+    def tick(self):
+        """Publishes the first snapshot if there is none, then ingests the categories that are due."""
+        self.ticks += 1
+        self.last_tick = time.time()
+        try:
+            if self.publisher.get() is None:
+                self.bootstrap()
+                if self.publisher.get() is None:
+                    return
+
+            due = self.scheduler.due()
+            if not due:
+                return
+            print(f"{len(due)} categories due. Ingesting...")
+            self.scheduler.log_decision(due, "due")
+            news = scraper.ingest(list(self.publisher.items()), due)
+            if news is not None:
+                self.publisher.publish(news, self.store.state()[0])
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Ingest tick failed: {e}")
+
+    # --- running ---
+
+    def start(self, apscheduler):
+        """Runs tick() as an APScheduler job (inline mode), starting now."""
+        apscheduler.add_job(self.tick, "interval", seconds=INGEST_TICK_SECONDS, id="news-ingest",
+                            max_instances=1, coalesce=True, next_run_time=datetime.now())
+        print(f"Ingest worker scheduled ({INGEST_TICK_SECONDS:.0f}s tick).")
+
+    def run_forever(self):
+        """Standalone loop: tick, then sleep until the next category is due (at most one tick interval)."""
+        while not self._stop.is_set():
+            self.tick()
+            wait = min(max(self.scheduler.next_due_at() - time.time(), 1.0), INGEST_TICK_SECONDS)
+            self._stop.wait(wait)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "mode": INGEST_MODE,
+            "ticks": self.ticks,
+            "last_tick": datetime.fromtimestamp(self.last_tick).isoformat(timespec="seconds") if self.last_tick else None,
+            "last_error": self.last_error,
+            "snapshot": self.publisher.stats(),
+        }
+
+
+INGEST_WORKER = IngestWorker()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Moneycontrol into the news store on an adaptive schedule.")
+    parser.add_argument("--once", action="store_true", help="run a single tick and exit")
+    args = parser.parse_args()
+
+    from database import init_db
+    from db_writer import DB_WRITER
+    init_db()
+    try:
+        if args.once:
+            INGEST_WORKER.tick()
+        else:
+            INGEST_WORKER.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scraper.FETCH_ENGINE.close()
+        DB_WRITER.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,36 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime
 import uvicorn
 import os
+import time
+import hashlib
+from bisect import bisect_left
 import json
 import logging
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
 # Import our modules
-from scraper import get_latest_news
-from sentiment import init_model as init_sentiment
+from scraper import get_latest_news, REFRESH_SCHEDULER, FETCH_ENGINE, INGEST_PIPELINE
+from news_snapshot import SNAPSHOTS
+from ingest_worker import INGEST_WORKER, INGEST_MODE, SNAPSHOT_POLL_SECONDS
+from news_index import get_news_index, encode_cursor, decode_cursor
+from news_store import NEWS_STORE
+from article_store import ARTICLE_STORE
+from near_duplicates import NEAR_DUPLICATES
+from api_responses import FastJSONResponse, cached_json_response, compressed_json_response
+from search_index import SEARCH_INDEX
+from sentiment import init_model as init_sentiment, SENTIMENT, SENTIMENT_CACHE
+import market_data
+from resilience import RESILIENCE
 from market_data import get_market_data, get_stock_details, get_stock_history, get_stock_financials
 from chatbot import get_chat_response, init_gemini
-from database import init_db, get_db, User, WatchlistItem, NewsAnalytics, hash_password, verify_password
+from database import init_db, get_read_db, ReadSessionLocal, User, WatchlistItem, hash_password, verify_password
+from db_writer import DB_WRITER
+from view_counter import ViewCounter
+from trending import TRENDING
 
 # Scheduler & Notifications
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -24,6 +40,9 @@ from notification_manager import NotificationManager
 scheduler = BackgroundScheduler()
 notification_manager = None
 
+# In-memory view counts with write-behind to news_analytics
+view_counter = ViewCounter(ReadSessionLocal, trending=TRENDING)
+
 def run_notification_job():
     print("Executing scheduled notification job...")
     if notification_manager:
@@ -32,6 +51,18 @@ def run_notification_job():
 # Load env vars
 load_dotenv()
 
+# Where /news runs its filters: "index" (in-memory NewsIndex over the loaded articles)
+# or "db" (indexed queries on news_items, the source of truth)
+NEWS_QUERY_BACKEND = os.getenv("NEWS_QUERY_BACKEND", "index")
+
+# What news endpoints do before the first snapshot is published:
+# "empty" serves an empty feed, "gate" answers 503 (with Retry-After) until /ready passes
+COLD_START = os.getenv("COLD_START", "empty")
+
+# How long a /news ETag holds when the response carries live values (view counts, trending order):
+# those change without a new dataset version, so the tag also rolls over on this clock
+NEWS_LIVE_ETAG_SECONDS = int(os.getenv("NEWS_LIVE_ETAG_SECONDS", "60"))
+
 app = FastAPI(title="MarketPulse AI Backend")
 
 # CORS setup
@@ -123,12 +154,23 @@ async def startup_event():
     
     # Initialize Notification Manager
     global notification_manager
-    from database import SessionLocal
-    notification_manager = NotificationManager(SessionLocal)
+    notification_manager = NotificationManager(ReadSessionLocal)
+
+    # Load view counts and start the periodic flush
+    try:
+        view_counter.start()
+    except Exception as e:
+        print(f"Error starting view counter: {e}")
     
     # Start Scheduler
     try:
         if not scheduler.running:
+            if INGEST_MODE == "inline":
+                INGEST_WORKER.start(scheduler)
+            else:
+                # A separate ingest_worker process writes the store; swap in each new version it saves
+                scheduler.add_job(SNAPSHOTS.refresh_from_store, 'interval', seconds=SNAPSHOT_POLL_SECONDS,
+                                  max_instances=1, coalesce=True, next_run_time=datetime.now())
             scheduler.add_job(run_notification_job, 'interval', minutes=1)
             scheduler.start()
             print("Notification scheduler started (1 min interval).")
@@ -144,188 +186,308 @@ def shutdown_event():
     if scheduler.running:
         scheduler.shutdown()
         print("Scheduler shut down.")
+    INGEST_PIPELINE.shutdown()
+
+    # Write out any view increments still held in memory, then drain the write queue
+    view_counter.stop()
+    DB_WRITER.stop()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to MarketPulse AI API"}
 
-def get_paginated_news(db: Session, page: int, limit: int):
-    offset = (page - 1) * limit
-    total_count = db.query(NewsItem).count()
-    news_items = db.query(NewsItem).order_by(NewsItem.timestamp.desc()).offset(offset).limit(limit).all()
-    
+def news_etag(version, *params):
+    """
+    Weak ETag for a /news response: the news store's dataset version (persistent, so the same
+    in every process and after a restart) plus the request's filter parameters.
+    """
+    digest = hashlib.sha1(repr((version,) + params).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def collapse_clusters(index, ranks):
+    """
+    Keeps the first rank of each near-duplicate cluster, in order.
+    Returns the kept ranks and, per kept rank, how many of `ranks` it stands for.
+    """
+    kept = {}
+    sizes = {}
+    for rank, cluster in zip(ranks, NEAR_DUPLICATES.clusters(index.items[r].link for r in ranks)):
+        first = kept.setdefault(cluster, rank)
+        sizes[first] = sizes.get(first, 0) + 1
+    return list(kept.values()), sizes
+
+def build_news_page(index, views_map, page, limit, q, categories, stocks, filter_type, sort, cursor_position, fields,
+                    collapse=False):
+    """Filters, orders, paginates and projects one /news page from the presorted index."""
+    # Global Search - runs first so the remaining filters only see matching documents
+    ranks = index.all_ranks()
+    search_scores = None
+    if q and q.strip():
+        search_scores = SEARCH_INDEX.search(q)
+        ranks = sorted(index.rank_by_link[link] for link in search_scores if link in index.rank_by_link)
+
+    # Category Filter
+    if categories:
+        cat_list = split_param(categories)
+        if cat_list:
+            if search_scores is None:
+                ranks = index.ranks_for_categories(cat_list)
+            else:
+                ranks = [r for r in ranks if str(index.items[r].get("category") or "").lower() in cat_list]
+
+    # Stock/Watchlist Filter (Strict Headline Match)
+    # Articles are tagged with stock symbols at ingest, so this is a posting-list lookup
+    if stocks:
+        requested_symbols = set(split_param(stocks))
+        if requested_symbols:
+            matched = index.ranks_for_symbols(requested_symbols)
+            if isinstance(ranks, range):
+                ranks = matched
+            else:
+                keep = set(matched)
+                ranks = [r for r in ranks if r in keep]
+
+    # Filter Type (Trending, Week, etc.)
+    trending_order = None
+    if filter_type == 'trending':
+        # Direct read of the decayed top-K, in trending order
+        trending_order = [index.rank_by_link[link] for link, _ in TRENDING.top() if link in index.rank_by_link]
+        if isinstance(ranks, range):
+            ranks = trending_order
+        else:
+            keep = set(ranks)
+            ranks = [r for r in trending_order if r in keep]
+    elif filter_type == 'week':
+        # Same window as the old `(now - dt).days <= 7` check
+        cutoff = time.time() - 8 * 86400
+        ranks = [r for r in ranks if index.is_newer_than(r, cutoff)]
+    # ... more time filters can be added here ...
+
+    # 2. Ordering - ranks are already in timestamp-descending order (trending keeps score order)
+    if sort == 'relevance' and search_scores and trending_order is None:
+        # Stable sort, so equally relevant articles stay newest first
+        ranks = sorted(ranks, key=lambda r: search_scores[index.items[r]["link"]], reverse=True)
+
+    # Near-duplicate clusters (the same story under several categories or links) shown once
+    cluster_sizes = None
+    if collapse:
+        ranks, cluster_sizes = collapse_clusters(index, ranks)
+
+    # 3. Pagination
+    # Keyset: a cursor seeks to its (timestamp, link) position, so pages don't shift
+    # when new articles arrive. Relevance and trending orders have no stable key, so they stay page-based.
+    total_count = len(ranks)
+    keyset = (sort != 'relevance' or not search_scores) and trending_order is None
+    if cursor_position and keyset:
+        epoch, cursor_link = cursor_position
+        start = bisect_left(ranks, index.first_rank_after(epoch, cursor_link))
+    else:
+        start = max(page - 1, 0) * limit
+    page_ranks = ranks[start : start + limit]
+
+    # 4. Projection - the feed only needs the compact list fields; bodies come from /news/article
+    paginated_items = project_items([index.items[r] for r in page_ranks], views_map, fields)
+    if cluster_sizes is not None:
+        for item, rank in zip(paginated_items, page_ranks):
+            item["cluster_size"] = cluster_sizes[rank]
+
+    next_cursor = None
+    if keyset and page_ranks and start + limit < total_count:
+        last_rank = page_ranks[-1]
+        next_cursor = encode_cursor(index.epochs[last_rank], index.items[last_rank]["link"])
+
     return {
-        "items": news_items,
+        "items": paginated_items,
         "total": total_count,
         "page": page,
-        "pages": (total_count + limit - 1) // limit
+        "pages": (total_count + limit - 1) // limit if limit > 0 else 1,
+        "next_cursor": next_cursor
     }
 
-@app.get("/news")
+def build_news_page_db(views_map, page, limit, q, categories, stocks, filter_type, sort, cursor_position, fields):
+    """Same contract as build_news_page, with the filters run as indexed queries on news_items."""
+    links = None
+    scores = None
+    search_scores = None
+    if q and q.strip():
+        search_scores = SEARCH_INDEX.search(q)
+        links = set(search_scores)
+
+    since = None
+    if filter_type == 'trending':
+        scores = dict(TRENDING.top())
+        links = set(scores) if links is None else links & set(scores)
+    elif filter_type == 'week':
+        since = time.time() - 8 * 86400
+
+    if scores is None and sort == 'relevance' and search_scores:
+        scores = search_scores
+
+    result = NEWS_STORE.query_page(
+        page, limit,
+        categories=split_param(categories),
+        symbols=split_param(stocks),
+        since=since,
+        links=links,
+        scores=scores,
+        cursor_position=cursor_position if scores is None else None
+    )
+    total_count = result["total"]
+    return {
+        "items": project_items(result["items"], views_map, fields),
+        "total": total_count,
+        "page": page,
+        "pages": (total_count + limit - 1) // limit if limit > 0 else 1,
+        "next_cursor": result["next_cursor"]
+    }
+
+def split_param(value):
+    """Comma-separated query parameter -> lowercased, non-empty values."""
+    if not value:
+        return []
+    return [v.strip().lower() for v in value.split(",") if v.strip()]
+
+# Default /news item schema: what the feed cards render. full_content is only served by /news/article.
+LIST_FIELDS = ["category", "headline", "link", "image_url", "timestamp", "sentiment", "sentiment_score", "stock_symbols", "views"]
+
+def split_fields(fields):
+    """The `fields` query parameter as a list (empty if not given)."""
+    return [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+
+def project_items(items, views_map, fields):
+    out_fields = split_fields(fields) if fields else LIST_FIELDS
+    projected_items = []
+    for item in items:
+        projected = {f: item[f] for f in out_fields if f in item}
+        if "views" in out_fields:
+            projected["views"] = views_map.get(item["link"], 0)
+        projected_items.append(projected)
+    return projected_items
+
+def news_not_ready():
+    """Cold-start response for news endpoints before the first snapshot (COLD_START=gate)."""
+    return HTTPException(status_code=503, detail="News is not ready yet", headers={"Retry-After": "5"})
+
+@app.get("/ready")
+def readiness():
+    """Readiness gate: 200 once a news snapshot has been published, 503 before."""
+    stats = SNAPSHOTS.stats()
+    if not stats["ready"]:
+        return Response(status_code=503, headers={"Retry-After": "5"})
+    return stats
+
+@app.get("/news", response_class=FastJSONResponse)
 def read_news(
+    request: Request,
     page: int = 1, 
     limit: int = 24, 
     q: str = None, 
     categories: str = None, 
     stocks: str = None,
     filter_type: str = None,
-    db: Session = Depends(get_db)
+    sort: str = None,
+    cursor: str = None,
+    fields: str = None,
+    collapse: bool = False
 ):
+    cursor_position = None
+    if cursor:
+        try:
+            cursor_position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if COLD_START == "gate" and SNAPSHOTS.get() is None:
+        raise news_not_ready()
+
     try:
-        all_news = get_latest_news() 
+        # Version and items from the same snapshot, so a tag never names content it wasn't built from
+        snapshot = SNAPSHOTS.get()
+        all_news = snapshot.items if snapshot is not None else ()
         if not all_news:
-            return {"items": [], "total": 0, "page": page, "pages": 1}
+            return {"items": [], "total": 0, "page": page, "pages": 1, "next_cursor": None}
+
+        # View counts come from the in-memory counter; no database access on this path
+        views_map = view_counter.snapshot()
+
+        # 1. Apply Filters over the presorted index (newest first), so no per-request sort is needed
+        index = get_news_index(all_news)
+
+        # Conditional GET: unchanged dataset + same parameters -> 304 with no body.
+        # The week window moves with the clock, so those results roll over hourly. View counts
+        # and trending scores change between versions, so responses with them roll over on
+        # NEWS_LIVE_ETAG_SECONDS.
+        now = time.time()
+        week_bucket = int(now // 3600) if filter_type == 'week' else None
+        live = filter_type == 'trending' or "views" in (split_fields(fields) if fields else LIST_FIELDS)
+        live_bucket = int(now // NEWS_LIVE_ETAG_SECONDS) if live else None
+        etag = news_etag(snapshot.version, week_bucket, live_bucket, page, limit, q, categories, stocks, filter_type, sort, cursor,
+                         fields, collapse)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        if NEWS_QUERY_BACKEND == "db":
+            # Filtering runs in SQL there, so clusters aren't collapsed
+            build = lambda: build_news_page_db(views_map, page, limit, q, categories, stocks, filter_type, sort, cursor_position, fields)
+        else:
+            build = lambda: build_news_page(index, views_map, page, limit, q, categories, stocks, filter_type, sort, cursor_position, fields,
+                                            collapse)
 
-        # 0. Inject Views from Database
-        # Optimization: Only fetch views for links in current dataset (or all if dataset is small enough)
-        # For simplicity with sorting, we need views for ALL items first.
-        try:
-            analytics = db.query(NewsAnalytics).all()
-            views_map = {item.news_link: item.views for item in analytics}
-            
-            # Update all_news with views
-            for item in all_news:
-                item["views"] = views_map.get(item["link"], 0)
-        except Exception as e:
-            print(f"Error merging views: {e}")
-            # Continue without views if DB fails, defaulting to 0
-
-
-        # 1. Apply Filters before sorting/pagination
-        
-        # Category Filter
-        if categories:
-            cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()]
-            if cat_list:
-                all_news = [item for item in all_news if str(item.get("category") or "").lower() in cat_list]
-
-        # Stock/Watchlist Filter (Strict Headline Match)
-        if stocks:
-            import re
-            requested_symbols = {s.strip().lower() for s in stocks.split(",") if s.strip()}
-            if requested_symbols:
-                # Build a set of keywords (Names, Aliases, Symbols) for the requested stocks
-                # Optimization: In a real app, this mapping should be pre-computed.
-                target_keywords = set()
-                
-                # Add the symbols themselves first
-                for s in requested_symbols:
-                    target_keywords.add(s)
-
-                # Look up rich data from NSE_STOCKS global
-                for stock_obj in NSE_STOCKS:
-                    if stock_obj.get('symbol', '').lower() in requested_symbols:
-                        # Add Company Name
-                        if stock_obj.get('name'):
-                            name_clean = stock_obj['name'].lower()
-                            # Filter out very short names if any (unlikely for full names)
-                            if len(name_clean) >= 3:
-                                target_keywords.add(name_clean)
-                        
-                        # Add Aliases (Strict Filtering)
-                        if stock_obj.get('aliases'):
-                            for alias in stock_obj['aliases']:
-                                alias_clean = alias.lower().strip()
-                                # Rule: Must be >= 3 chars OR contain a digit (e.g. "3m", "20m")
-                                if len(alias_clean) >= 3 or any(c.isdigit() for c in alias_clean):
-                                    target_keywords.add(alias_clean)
-                
-                # Strict Filter: Must appear in HEADLINE using WORD BOUNDARIES
-                if target_keywords:
-                    # Create a massive regex OR pattern: \b(term1|term2|term3)\b
-                    # Sort by length descending to match longest phrases first (though regex engine handles this, it's safer)
-                    sorted_keywords = sorted(target_keywords, key=len, reverse=True)
-                    escaped_keywords = [re.escape(k) for k in sorted_keywords]
-                    pattern_str = r'\b(' + '|'.join(escaped_keywords) + r')\b'
-                    
-                    try:
-                        regex = re.compile(pattern_str, re.IGNORECASE)
-                        
-                        final_news = []
-                        for item in all_news:
-                            headline = str(item.get("headline") or "")
-                            if regex.search(headline):
-                                final_news.append(item)
-                        
-                        all_news = final_news
-                    except Exception as e:
-                        print(f"Regex error: {e}")
-                        # Fallback to empty if regex fails
-                        all_news = []
-                else:
-                    all_news = []
-
-        # Global Search
-        if q:
-            query = q.lower().strip()
-            all_news = [
-                item for item in all_news 
-                if query in str(item.get("headline") or "").lower() or 
-                   query in str(item.get("description") or "").lower() or
-                   query in str(item.get("category") or "").lower()
-            ]
-
-        # Filter Type (Trending, Week, etc.)
-        now = datetime.now()
-        if filter_type == 'trending':
-            all_news = [item for item in all_news if (item.get("views") or 0) > 15]
-        elif filter_type == 'week':
-            all_news = [item for item in all_news if item.get("timestamp") and (now - datetime.strptime(item["timestamp"], "%d %b %Y, %I:%M %p")).days <= 7]
-        # ... more time filters can be added here ...
-
-        # 2. Sorting - CRITICAL: Sort by timestamp descending
-        def get_timestamp(x):
-            ts = x.get("timestamp")
-            if not ts: return datetime.min
-            try:
-                # Handle formatted strings from our JSON
-                return datetime.strptime(ts, "%d %b %Y, %I:%M %p")
-            except:
-                try:
-                    # Fallback for ISO strings if any still exist
-                    return datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                except:
-                    return datetime.min
-
-        all_news.sort(key=get_timestamp, reverse=True)
-
-        # 3. Pagination
-        total_count = len(all_news)
-        offset = (page - 1) * limit
-        paginated_items = all_news[offset : offset + limit]
-        
-        return {
-            "items": paginated_items,
-            "total": total_count,
-            "page": page,
-            "pages": (total_count + limit - 1) // limit if limit > 0 else 1
-        }
+        # Rendered (and gzip/br compressed) once per dataset version and parameter set
+        return cached_json_response(
+            request, etag, None, build,
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
 
     except Exception as e:
         print(f"Error fetching news: {e}")
-        return {"items": [], "total": 0, "page": 1, "pages": 1}
+        return {"items": [], "total": 0, "page": 1, "pages": 1, "next_cursor": None}
+
+@app.get("/news/article", response_class=FastJSONResponse)
+def read_article(link: str, request: Request):
+    """Full record for one article, including full_content."""
+    if COLD_START == "gate" and SNAPSHOTS.get() is None:
+        raise news_not_ready()
+    all_news = get_latest_news()
+    index = get_news_index(all_news)
+    rank = index.rank_by_link.get(link)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    article = index.items[rank].to_dict()
+    # Bodies aren't part of the snapshot; this one comes from the article store's hot tier or disk
+    # Only the article's own body: a near-duplicate that wasn't deep-fetched has none
+    article["full_content"] = ARTICLE_STORE.body(link)
+    article["views"] = view_counter.get(link)
+    return compressed_json_response(request, article)
 
 class ViewRequest(BaseModel):
     link: str
 
 @app.post("/news/view")
-def increment_view(request: ViewRequest, db: Session = Depends(get_db)):
+def increment_view(request: ViewRequest):
     try:
-        item = db.query(NewsAnalytics).filter(NewsAnalytics.news_link == request.link).first()
-        if not item:
-            item = NewsAnalytics(news_link=request.link, views=1)
-            db.add(item)
-        else:
-            item.views += 1
-        db.commit()
-        return {"views": item.views}
+        # Absorbed in memory; the counter flushes to news_analytics in batches
+        return {"views": view_counter.increment(request.link)}
     except Exception as e:
         print(f"Error incrementing view: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/market")
-def read_market():
-    return get_market_data()
+def read_market(request: Request):
+    # Read the version before fetching: a refresh during the call is then re-rendered on the next request
+    version = market_data.LAST_MARKET_FETCH
+    data = get_market_data()
+    return cached_json_response(request, "market", version, lambda: data)
 
 @app.get("/stock/{symbol}")
 def read_stock_details(symbol: str):
@@ -335,14 +497,14 @@ def read_stock_details(symbol: str):
     return data
 
 @app.get("/stock/{symbol}/history")
-def read_stock_history(symbol: str, period: str = "1mo"):
+def read_stock_history(symbol: str, request: Request, period: str = "1mo"):
     data = get_stock_history(symbol, period)
-    return data
+    return compressed_json_response(request, data)
 
 @app.get("/stock/{symbol}/financials")
-def read_stock_financials(symbol: str):
+def read_stock_financials(symbol: str, request: Request):
     data = get_stock_financials(symbol)
-    return data
+    return compressed_json_response(request, data)
 
 @app.post("/chat")
 def chat(request: ChatRequest):
@@ -361,25 +523,26 @@ def get_news_summary(request: ViewRequest):
     return result
 
 @app.post("/auth/signup")
-def signup(user: UserSignup, db: Session = Depends(get_db)):
+def signup(user: UserSignup):
     email_lower = user.email.lower()
-    db_user = db.query(User).filter(User.email == email_lower).first()
-    if db_user:
+    # Hash outside the write queue; bcrypt is deliberately slow
+    password_hash = hash_password(user.password)
+
+    def create_user(db):
+        # Checked on the writer thread, so two concurrent signups can't both pass
+        if db.query(User).filter(User.email == email_lower).first():
+            return None
+        new_user = User(name=user.name, email=email_lower, password_hash=password_hash, dob=user.dob)
+        db.add(new_user)
+        return {"name": new_user.name, "email": new_user.email}
+
+    created = DB_WRITER.run(create_user)
+    if created is None:
         raise HTTPException(status_code=400, detail="Email already registered")
-    
-    new_user = User(
-        name=user.name,
-        email=email_lower,
-        password_hash=hash_password(user.password),
-        dob=user.dob
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return {"message": "User created successfully", "user": {"name": new_user.name, "email": new_user.email}}
+    return {"message": "User created successfully", "user": created}
 
 @app.post("/auth/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+def login(user: UserLogin, db: Session = Depends(get_read_db)):
     email_lower = user.email.lower()
     db_user = db.query(User).filter(User.email == email_lower).first()
     if not db_user:
@@ -400,18 +563,22 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     }
 
 @app.get("/search-stocks")
-def search_stocks(q: str):
+def search_stocks(q: str, request: Request):
     if not q:
         return []
     query = q.lower()
-    results = [
-        s for s in NSE_STOCKS 
-        if query in s["name"].lower() or query in s["symbol"].lower()
-    ]
-    return results
+
+    def build_results():
+        return [
+            s for s in NSE_STOCKS 
+            if query in s["name"].lower() or query in s["symbol"].lower()
+        ]
+
+    # NSE_STOCKS is loaded once per process, so its identity is the data version
+    return cached_json_response(request, ("search-stocks", query), id(NSE_STOCKS), build_results)
 
 @app.get("/watchlist/{email}")
-def get_watchlist(email: str, db: Session = Depends(get_db)):
+def get_watchlist(email: str, db: Session = Depends(get_read_db)):
     user = db.query(User).filter(User.email == email.lower()).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -419,46 +586,58 @@ def get_watchlist(email: str, db: Session = Depends(get_db)):
     return [{"symbol": item.symbol, "name": item.name} for item in user.watchlist]
 
 @app.post("/watchlist")
-def add_to_watchlist(request: WatchlistRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email.lower()).first()
-    if not user:
+def add_to_watchlist(request: WatchlistRequest):
+    def add_item(db):
+        user = db.query(User).filter(User.email == request.email.lower()).first()
+        if not user:
+            return "no_user"
+
+        # Check if already exists
+        exists = db.query(WatchlistItem).filter(
+            WatchlistItem.user_id == user.id, 
+            WatchlistItem.symbol == request.symbol
+        ).first()
+
+        if exists:
+            return "exists"
+
+        db.add(WatchlistItem(
+            user_id=user.id,
+            symbol=request.symbol,
+            name=request.name or request.symbol
+        ))
+        return "added"
+
+    result = DB_WRITER.run(add_item)
+    if result == "no_user":
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Check if already exists
-    exists = db.query(WatchlistItem).filter(
-        WatchlistItem.user_id == user.id, 
-        WatchlistItem.symbol == request.symbol
-    ).first()
-    
-    if exists:
+    if result == "exists":
         return {"message": "Already in watchlist"}
-    
-    new_item = WatchlistItem(
-        user_id=user.id,
-        symbol=request.symbol,
-        name=request.name or request.symbol
-    )
-    db.add(new_item)
-    db.commit()
     return {"message": "Added to watchlist"}
 
 @app.delete("/watchlist/{email}/{symbol}")
-def remove_from_watchlist(email: str, symbol: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email.lower()).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    item = db.query(WatchlistItem).filter(
-        WatchlistItem.user_id == user.id, 
-        WatchlistItem.symbol == symbol
-    ).first()
-    
-    if item:
+def remove_from_watchlist(email: str, symbol: str):
+    def remove_item(db):
+        user = db.query(User).filter(User.email == email.lower()).first()
+        if not user:
+            return "no_user"
+
+        item = db.query(WatchlistItem).filter(
+            WatchlistItem.user_id == user.id, 
+            WatchlistItem.symbol == symbol
+        ).first()
+
+        if not item:
+            return "missing"
         db.delete(item)
-        db.commit()
-        return {"message": "Removed from watchlist"}
-    
-    raise HTTPException(status_code=404, detail="Item not found in watchlist")
+        return "removed"
+
+    result = DB_WRITER.run(remove_item)
+    if result == "no_user":
+        raise HTTPException(status_code=404, detail="User not found")
+    if result == "missing":
+        raise HTTPException(status_code=404, detail="Item not found in watchlist")
+    return {"message": "Removed from watchlist"}
 
 @app.post("/debug/trigger-notifications")
 def trigger_notifications_manual():
@@ -468,5 +647,17 @@ def trigger_notifications_manual():
         return {"message": "Notification check triggered manually."}
     return {"message": "Notification manager not initialized."}
 
+@app.get("/debug/scheduler")
+def scheduler_state():
+    """
+    Per-category refresh rates, intervals and due times, recent refresh decisions, the ingest worker,
+    sentiment, the article store, near-duplicate clusters, per-host fetch health and the ingest pipeline.
+    """
+    return {**REFRESH_SCHEDULER.snapshot(), "ingest": INGEST_WORKER.stats(),
+            "sentiment": {**SENTIMENT.stats(), "cache": SENTIMENT_CACHE.stats()},
+            "articles": ARTICLE_STORE.stats(), "near_duplicates": NEAR_DUPLICATES.stats(),
+            "fetch": {"hosts": RESILIENCE.stats(), "engine": FETCH_ENGINE.stats()},
+            "pipeline": INGEST_PIPELINE.stats()}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -2,6 +2,18 @@ import yfinance as yf
 from datetime import datetime
 import concurrent.futures
 import time
+from resilience import RESILIENCE
+
+# Yahoo Finance host yfinance talks to; its calls share one retry/rate-limit/breaker policy
+YAHOO_HOST = "query1.finance.yahoo.com"
+
+def yahoo(fn):
+    """
+    Runs one Yahoo Finance read through the shared retry policy. yfinance fetches lazily
+    (e.g. on first access to a fast_info field), so `fn` is the access that triggers it.
+    Raises CircuitOpenError without a request while Yahoo is failing.
+    """
+    return RESILIENCE.call(YAHOO_HOST, fn)
 
 # In-memory cache for market data
 MARKET_CACHE = None
@@ -38,18 +50,18 @@ def get_market_data():
         try:
             ticker = yf.Ticker(symbol)
             # Fetch 1-day history with 5-minute intervals for sparkline
-            hist = ticker.history(period="1d", interval="5m")
+            hist = yahoo(lambda: ticker.history(period="1d", interval="5m"))
             
             # Fallback if 1d 5m is unavailable (e.g. market closed recently or data gap)
             if hist.empty or len(hist) < 5:
-                hist = ticker.history(period="5d", interval="15m")
+                hist = yahoo(lambda: ticker.history(period="5d", interval="15m"))
             if hist.empty:
-                hist = ticker.history(period="1mo")
+                hist = yahoo(lambda: ticker.history(period="1mo"))
             if hist.empty: return None
             
             current = hist["Close"].iloc[-1]
             try:
-                prev_close = ticker.fast_info.previous_close
+                prev_close = yahoo(lambda: ticker.fast_info.previous_close)
             except:
                 prev_close = hist["Open"].iloc[0]
             
@@ -70,7 +82,7 @@ def get_market_data():
         try:
             ticker = yf.Ticker(symbol)
             info = ticker.fast_info
-            price = info.last_price
+            price = yahoo(lambda: info.last_price)
             prev_close = info.previous_close
             if price and prev_close:
                 change = price - prev_close
@@ -135,8 +147,8 @@ def get_stock_details(symbol):
         # history for day range fallback if fast_info missing
         # hist = ticker.history(period="1d") 
         
-        # Essential Data
-        price = info.last_price
+        # Essential Data (the first access fetches the quote)
+        price = yahoo(lambda: info.last_price)
         prev_close = info.previous_close
         open_price = info.open
         day_high = info.day_high
@@ -145,14 +157,14 @@ def get_stock_details(symbol):
         # Extended Data (may need ticker.info for some)
         # fast_info is faster but has less data. 
         # market_cap is in fast_info
-        market_cap = info.market_cap
+        market_cap = yahoo(lambda: info.market_cap)
         
         # Volume usually requires history or regular info
         # Let's try to get recent volume
         volume = info.last_volume
 
         # 52 Week
-        year_high = info.year_high
+        year_high = yahoo(lambda: info.year_high)
         year_low = info.year_low
         
         change = price - prev_close
@@ -208,7 +220,7 @@ def get_stock_history(symbol, period="1mo"):
         elif period == "1mo":
             interval = "1d" # or 90m if available
             
-        hist = ticker.history(period=period, interval=interval)
+        hist = yahoo(lambda: ticker.history(period=period, interval=interval))
         
         if hist.empty:
             return []
@@ -246,7 +258,7 @@ def get_stock_financials(symbol):
         
         # Get Quarterly Income Statement
         # transposed so columns are dates
-        fin = ticker.quarterly_income_stmt
+        fin = yahoo(lambda: ticker.quarterly_income_stmt)
         
         if fin.empty:
             return []
@@ -0,0 +1,344 @@
+"""
+Near-duplicate detection: MinHash signatures over shingles, an LSH index, clusters.
+
+The same story is often listed under several categories, and syndicated
+rewrites appear under different links. Exact-link dedup misses both. Each
+article gets a MinHash signature of its headline shingles (words and word
+pairs), and of its body shingles (word triples) once the body has been
+fetched. An article joins the cluster of the most similar article that
+passes the threshold for either. Clusters are never merged with each other,
+so a chain of loosely related stories can't snowball into one cluster.
+
+Moneycontrol headlines are heavily templated ("X share price falls 2.05%;
+stock among top losers on Nifty Midcap 150", "X Consolidated December 2025
+Net Sales at Rs ... crore"), so word overlap alone puts different companies
+and different days in one cluster. A match also needs:
+- the exact headline Jaccard similarity (not just the MinHash estimate) at
+  DEDUP_HEADLINE_THRESHOLD
+- the same stock symbols tagged in the headline and the same numbers in it
+- publish times at most DEDUP_MAX_GAP_HOURS apart, when both are known
+
+Candidates come from an LSH index: a signature is cut into bands, and
+articles sharing a band land in the same bucket. A lookup only checks the
+articles in its buckets, so its cost doesn't grow with the archive.
+
+A cluster's first member is its representative. A headline match is only
+provisional: when both a member's and the representative's bodies are known
+and they don't match, the member leaves the cluster. Ingest holds back a
+newly listed member while its representative is in the dataset (it isn't
+fetched, saved or published), so nothing is ever copied between members.
+The feed can collapse the remaining clusters to one article each
+(/news?collapse=true).
+
+The index follows the published snapshot like the search index does
+(sync), so it also works in an API process with a separate ingest worker.
+Body signatures are only computed for articles that carry their body, so
+after a restart clusters are rebuilt from headlines.
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from article import parse_timestamp
+from article_extractor import NO_CONTENT
+from search_index import tokenize
+
+# Jaccard similarity at which two articles count as the same story: exact for headlines,
+# estimated from the signatures for bodies
+DEDUP_HEADLINE_THRESHOLD = float(os.getenv("DEDUP_HEADLINE_THRESHOLD", "0.85"))
+DEDUP_BODY_THRESHOLD = float(os.getenv("DEDUP_BODY_THRESHOLD", "0.7"))
+# Articles published further apart are different stories (daily columns reuse their headline)
+DEDUP_MAX_GAP_HOURS = float(os.getenv("DEDUP_MAX_GAP_HOURS", "12"))
+
+# 12 bands of 5 rows: pairs at the thresholds above almost always share a bucket,
+# unrelated headlines (similarity ~0.05) almost never do
+NUM_PERM = 60
+BANDS = 12
+ROWS = NUM_PERM // BANDS
+# Body shingles considered; a syndicated copy matches well within its opening paragraphs
+MAX_BODY_SHINGLES = 500
+# Words every headline has; they'd make unrelated headlines look alike
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or over than that the this to up "
+    "was were what will with after amid says how why".split()
+)
+
+NUMBER_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+_MASK = (1 << 64) - 1
+_rng = random.Random(1)
+# Multiply-add hashing mod 2^64, one (odd a, b) pair per permutation
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+if np is not None:
+    _A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+    _B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)[:, None]
+
+
+def headline_shingles(text):
+    tokens = [token for token in tokenize(text) if token not in STOPWORDS]
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def headline_numbers(text):
+    """The numbers in a headline (prices, percentages, targets), thousands separators dropped."""
+    return tuple(sorted(number.replace(",", "") for number in NUMBER_PATTERN.findall(text or "")))
+
+
+def body_shingles(text):
+    tokens = tokenize(text)
+    shingles = dict.fromkeys(" ".join(tokens[i:i + 3]) for i in range(max(len(tokens) - 2, 0)))
+    return set(list(shingles)[:MAX_BODY_SHINGLES])
+
+
+def _base_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(shingles):
+    """MinHash signature (tuple of NUM_PERM ints) of a set of shingles, or None if it is empty."""
+    if not shingles:
+        return None
+    hashes = [_base_hash(s) for s in shingles]
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)[None, :]
+        return tuple((_A * values + _B).min(axis=1).tolist())
+    return tuple(min([(a * h + b) & _MASK for h in hashes]) for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    if sig_a is None or sig_b is None:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _tag_symbols(text):
+    from stock_tagger import get_tagger
+    return get_tagger().tag(text)
+
+
+def _bands(kind, signature):
+    return [(kind, band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    def __init__(self, headline_threshold=DEDUP_HEADLINE_THRESHOLD, body_threshold=DEDUP_BODY_THRESHOLD,
+                 max_gap_hours=DEDUP_MAX_GAP_HOURS, tag_symbols=_tag_symbols):
+        """tag_symbols: function of a headline returning its stock symbols."""
+        self.thresholds = {"headline": headline_threshold, "body": body_threshold}
+        self.max_gap = max_gap_hours * 3600
+        self.tag_symbols = tag_symbols
+        self.buckets = {}       # (kind, band, values) -> set of links
+        self.signatures = {}    # link -> {"headline": sig, "body": sig}
+        self.shingles = {}      # link -> headline shingles, for the exact comparison
+        self.keys = {}          # link -> (symbols, numbers) of its headline
+        self.published = {}     # link -> publish time (epoch) or None
+        self.cluster_of = {}    # link -> cluster id (increasing, so a lower id is an older cluster)
+        self.members = {}       # cluster id -> member links, in the order they joined
+        self._next_id = 1
+        self.comparisons = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    # --- index ---
+
+    def _same_story(self, link, other):
+        """The checks besides similarity: same symbols and numbers, published close together."""
+        if self.keys[link] != self.keys[other]:
+            return False
+        a, b = self.published[link], self.published[other]
+        return a is None or b is None or abs(a - b) <= self.max_gap
+
+    def _score(self, link, other, kind, signature):
+        if kind == "headline":
+            return jaccard(self.shingles[link], self.shingles[other])
+        return similarity(signature, self.signatures[other].get(kind))
+
+    def _best_match(self, link, kind, signature):
+        """The most similar article sharing a bucket with `signature`, if it passes the threshold and the story checks."""
+        found = set()
+        for key in _bands(kind, signature):
+            found.update(self.buckets.get(key, ()))
+        found.discard(link)
+        self.comparisons += len(found)
+        threshold = self.thresholds[kind]
+        best, best_key = None, None
+        for other in found:
+            if not self._same_story(link, other):
+                continue
+            score = self._score(link, other, kind, signature)
+            # Ties go to the older cluster
+            key = (score, -self.cluster_of[other])
+            if score >= threshold and (best_key is None or key > best_key):
+                best, best_key = other, key
+        return best
+
+    def _insert(self, link, kind, signature):
+        self.signatures[link][kind] = signature
+        for key in _bands(kind, signature):
+            self.buckets.setdefault(key, set()).add(link)
+
+    def _join(self, link, match):
+        """Moves `link`, if it is still a cluster of its own, into the cluster of `match`."""
+        cid = self.cluster_of[link]
+        if match is None or len(self.members[cid]) > 1:
+            return
+        del self.members[cid]
+        target = self.cluster_of[match]
+        self.cluster_of[link] = target
+        self.members[target].append(link)
+
+    def _split(self, link):
+        """Moves `link` out of its cluster into a new cluster of its own."""
+        members = self.members[self.cluster_of[link]]
+        members.remove(link)
+        cid = self._next_id
+        self._next_id += 1
+        self.cluster_of[link] = cid
+        self.members[cid] = [link]
+
+    def _bodies_disagree(self, link, other):
+        a, b = self.signatures[link].get("body"), self.signatures[other].get("body")
+        return a is not None and b is not None and similarity(a, b) < self.thresholds["body"]
+
+    def add(self, link, headline, body=None, published=None):
+        """Indexes an article (if it isn't yet) and returns its cluster id. `published` is an epoch, if known."""
+        if not link:
+            return None
+        with self.lock:
+            if link not in self.signatures:
+                cid = self._next_id
+                self._next_id += 1
+                self.signatures[link] = {}
+                self.cluster_of[link] = cid
+                self.members[cid] = [link]
+                shingles = headline_shingles(headline)
+                self.shingles[link] = shingles
+                self.keys[link] = (tuple(self.tag_symbols(headline or "")), headline_numbers(headline))
+                self.published[link] = published
+                signature = minhash(shingles)
+                if signature is not None:
+                    match = self._best_match(link, "headline", signature)
+                    self._insert(link, "headline", signature)
+                    self._join(link, match)
+            # The no-content marker is the same text everywhere; it says nothing about the story
+            if body and body != NO_CONTENT and "body" not in self.signatures[link]:
+                self.add_body(link, body)
+            return self.cluster_of[link]
+
+    def add_body(self, link, body):
+        """
+        Adds the body signature of an indexed article. Members whose body doesn't match their
+        representative's leave the cluster; an article that is alone joins a matching body's
+        cluster. Returns the cluster id.
+        """
+        signature = minhash(body_shingles(body))
+        with self.lock:
+            if link not in self.signatures:
+                return None
+            if signature is not None and "body" not in self.signatures[link]:
+                match = self._best_match(link, "body", signature)
+                self._insert(link, "body", signature)
+                members = self.members[self.cluster_of[link]]
+                if members[0] == link:
+                    for other in [other for other in members[1:] if self._bodies_disagree(link, other)]:
+                        self._split(other)
+                elif self._bodies_disagree(link, members[0]):
+                    self._split(link)
+                self._join(link, match)
+            return self.cluster_of[link]
+
+    def remove(self, link):
+        with self.lock:
+            signatures = self.signatures.pop(link, None)
+            if signatures is None:
+                return
+            for kind, signature in signatures.items():
+                for key in _bands(kind, signature):
+                    bucket = self.buckets.get(key)
+                    if bucket is not None:
+                        bucket.discard(link)
+                        if not bucket:
+                            del self.buckets[key]
+            del self.shingles[link], self.keys[link], self.published[link]
+            cid = self.cluster_of.pop(link)
+            members = self.members[cid]
+            members.remove(link)
+            if not members:
+                del self.members[cid]
+
+    def retain(self, links):
+        """Drops every indexed article whose link is not in `links`. Returns how many."""
+        links = set(links)
+        with self.lock:
+            stale = [link for link in self.signatures if link not in links]
+            for link in stale:
+                self.remove(link)
+            return len(stale)
+
+    def sync(self, items):
+        """
+        Makes the index match `items` (the published snapshot): indexes new articles,
+        adds body signatures for the ones carrying a body, drops the rest.
+        """
+        items = list(items)
+        added = 0
+        with self.lock:
+            for item in items:
+                link = item.get("link")
+                if link not in self.signatures:
+                    added += 1
+                self.add(link, item.get("headline"), item.get("full_content"),
+                         parse_timestamp(item.get("timestamp")))
+            removed = self.retain(item.get("link") for item in items)
+        if added or removed:
+            print(f"Near-duplicate index updated: {added} added, {removed} removed, "
+                  f"{len(self.members)} clusters for {len(self)} articles.")
+        return added, removed
+
+    # --- lookups ---
+
+    def cluster(self, link):
+        """Cluster id of an article (its link, as a cluster of its own, if it isn't indexed)."""
+        with self.lock:
+            return self.cluster_of.get(link, link)
+
+    def clusters(self, links):
+        with self.lock:
+            return [self.cluster_of.get(link, link) for link in links]
+
+    def representative(self, link):
+        """The cluster member that is deep-fetched for the others: the earliest still present."""
+        with self.lock:
+            cid = self.cluster_of.get(link)
+            return self.members[cid][0] if cid is not None else link
+
+    def stats(self):
+        with self.lock:
+            sizes = [len(members) for members in self.members.values()]
+            return {
+                "articles": len(self.signatures),
+                "clusters": len(sizes),
+                "multi_article_clusters": sum(1 for size in sizes if size > 1),
+                "duplicates": len(self.signatures) - len(sizes),
+                "largest_cluster": max(sizes, default=0),
+                "buckets": len(self.buckets),
+                "comparisons": self.comparisons,
+            }
+
+
+# Shared index, kept in sync with the published news snapshot
+NEAR_DUPLICATES = NearDuplicateIndex()
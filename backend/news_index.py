@@ -0,0 +1,135 @@
+"""
+Precomputed in-memory index over the news dataset served by /news.
+
+The index is rebuilt only when a new news snapshot is published, so a request
+just walks presorted arrays instead of re-parsing and re-sorting every item.
+"""
+import base64
+import heapq
+import json
+import threading
+
+from article import Article
+from stock_tagger import tag_articles
+
+
+def _sort_key(epoch, link):
+    return (epoch if epoch is not None else float("-inf"), link or "")
+
+
+def encode_cursor(epoch, link):
+    """Opaque keyset cursor for the position of one article in the newest-first order."""
+    raw = json.dumps([epoch, link], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        epoch, link = json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if (epoch is not None and not isinstance(epoch, (int, float))) or not isinstance(link, str):
+        raise ValueError("Invalid cursor")
+    return epoch, link
+
+
+class NewsIndex:
+    """
+    Immutable view of one version of the news dataset.
+    Items are stored newest first, as Articles; everything else refers to them by rank (position).
+    """
+
+    def __init__(self, news_items, version):
+        self.version = version
+        self.source = news_items
+
+        articles = [Article.from_dict(item) for item in news_items]
+        # Newest first, ties broken by link so the order (and keyset cursors) are deterministic.
+        # Undated items sort last, same as datetime.min did in the old per-request sort.
+        keys = [_sort_key(article.epoch, article.link) for article in articles]
+        order = sorted(range(len(articles)), key=keys.__getitem__, reverse=True)
+
+        self.items = [articles[i] for i in order]
+        self.epochs = [articles[i].epoch for i in order]
+        self.sort_keys = [keys[i] for i in order]
+        self.rank_by_link = {item.link: rank for rank, item in enumerate(self.items)}
+
+        # Category buckets keyed by lowercased name, each a list of ranks in ascending order
+        self.category_buckets = {}
+        # Stock postings: lowercased symbol -> ranks of articles tagged with it at ingest
+        self.symbol_postings = {}
+        untagged = [item for item in self.items if item.stock_symbols is None]
+        if untagged:
+            tag_articles(untagged)
+        for rank, item in enumerate(self.items):
+            key = str(item.category or "").lower()
+            self.category_buckets.setdefault(key, []).append(rank)
+            for symbol in item["stock_symbols"]:
+                self.symbol_postings.setdefault(symbol.lower(), []).append(rank)
+
+    def __len__(self):
+        return len(self.items)
+
+    def all_ranks(self):
+        return range(len(self.items))
+
+    def ranks_for_categories(self, categories):
+        """Merges the presorted buckets of the requested (lowercased) categories."""
+        buckets = [self.category_buckets[c] for c in set(categories) if c in self.category_buckets]
+        if len(buckets) == 1:
+            return buckets[0]
+        return list(heapq.merge(*buckets))
+
+    def ranks_for_symbols(self, symbols):
+        """Articles tagged with any of the requested (lowercased) symbols, in rank order."""
+        postings = [self.symbol_postings[s] for s in set(symbols) if s in self.symbol_postings]
+        if len(postings) == 1:
+            return postings[0]
+        return sorted(set().union(*postings))
+
+    def first_rank_after(self, epoch, link):
+        """
+        Rank of the first article that sorts after the cursor position (epoch, link).
+        Works even if the cursor article itself has since dropped out of the dataset.
+        """
+        cursor_key = _sort_key(epoch, link)
+        lo, hi = 0, len(self.sort_keys)
+        # sort_keys is descending: find the first key strictly below the cursor
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.sort_keys[mid] < cursor_key:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def is_newer_than(self, rank, cutoff_epoch):
+        epoch = self.epochs[rank]
+        return epoch is not None and epoch > cutoff_epoch
+
+
+# Current index, swapped whenever a different snapshot's items are seen
+_current_index = None
+_index_version = 0
+_index_lock = threading.Lock()
+
+
+def get_news_index(news_items):
+    """
+    Returns the index for `news_items`, building it only if the list object changed.
+    Each published snapshot carries a new items tuple, so identity is enough.
+    """
+    global _current_index, _index_version
+
+    index = _current_index
+    if index is not None and index.source is news_items:
+        return index
+
+    with _index_lock:
+        if _current_index is None or _current_index.source is not news_items:
+            _index_version += 1
+            _current_index = NewsIndex(news_items, _index_version)
+            print(f"Built news index v{_index_version} ({len(news_items)} articles).")
+        return _current_index
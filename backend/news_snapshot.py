@@ -0,0 +1,105 @@
+"""
+Immutable, versioned news snapshots for the API.
+
+The ingestion worker builds a complete dataset off the request path and
+publishes it here as a NewsSnapshot; request handlers read whatever
+snapshot is current. Publishing replaces one reference, so a request
+sees either the old dataset or the new one, never a mix. A snapshot's
+items are never modified after it is published; ingestion builds new
+Articles instead of updating the served ones.
+
+A snapshot's version is the news store version it was saved as, so an
+API process with a separate ingestion process can tell when the store
+has moved on (refresh_from_store).
+
+Snapshots hold article metadata only: bodies are dropped on publish and
+read from the article store when needed, so a snapshot's size doesn't
+grow with article length.
+"""
+import threading
+import time
+
+from article import Article
+from article_store import ARTICLE_STORE
+from near_duplicates import NEAR_DUPLICATES
+from news_store import NEWS_STORE
+from search_index import SEARCH_INDEX
+
+
+class NewsSnapshot:
+    __slots__ = ("version", "items", "published_at")
+
+    def __init__(self, version, items):
+        object.__setattr__(self, "version", version)
+        # A tuple, so the published list can't be appended to or reordered
+        object.__setattr__(self, "items", tuple(items))
+        object.__setattr__(self, "published_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NewsSnapshot is immutable")
+
+    def __len__(self):
+        return len(self.items)
+
+
+class SnapshotPublisher:
+    def __init__(self, store=NEWS_STORE, search_index=SEARCH_INDEX, article_store=ARTICLE_STORE,
+                 near_duplicates=NEAR_DUPLICATES):
+        self.store = store
+        self.search_index = search_index
+        self.near_duplicates = near_duplicates
+        self.article_store = article_store
+        self.current = None
+        self.published = 0
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    def get(self):
+        """The current snapshot, or None before the first publish."""
+        return self.current
+
+    def items(self):
+        snapshot = self.current
+        return snapshot.items if snapshot is not None else ()
+
+    def publish(self, items, version):
+        """
+        Swaps in a new snapshot. The search and near-duplicate indexes are synced first, so the
+        new articles are searchable (and clustered) on arrival. The search index indexes the bodies
+        the items carry and loads the rest; the near-duplicate index only uses the carried ones.
+        """
+        items = list(items)
+        snapshot = NewsSnapshot(version, (Article.from_dict(item).without_body() for item in items))
+        with self.lock:
+            if self.current is not None and self.current.version > version:
+                # An older dataset finished late; keep the newer one
+                return self.current
+            self.search_index.sync(items, load_bodies=self.article_store.bodies)
+            self.near_duplicates.sync(items)
+            self.current = snapshot
+            self.published += 1
+        self.ready.set()
+        print(f"Published news snapshot v{version} ({len(snapshot)} articles).")
+        return snapshot
+
+    def refresh_from_store(self):
+        """Loads and publishes the news store if it has a version this process hasn't published. Returns True if it did."""
+        version, _ = self.store.state()
+        current = self.current
+        if not version or (current is not None and current.version == version):
+            return False
+        self.publish(self.store.load(), version)
+        return True
+
+    def stats(self):
+        snapshot = self.current
+        return {
+            "ready": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "articles": len(snapshot) if snapshot else 0,
+            "published_at": snapshot.published_at if snapshot else None,
+            "published": self.published,
+        }
+
+
+SNAPSHOTS = SnapshotPublisher()
@@ -0,0 +1,290 @@
+"""
+SQLite-backed news store (news_items + news_item_symbols).
+
+Replaces rewriting moneycontrol_news.json after every scrape: a save only
+upserts articles whose stored fields changed and deletes the ones that aged
+out, so the write cost of a scrape follows the number of new or updated
+articles, not the size of the archive. The /news filters can also run here
+as indexed queries (query_page).
+
+Article bodies (full_content) are not part of the rows: a save hands them
+to the article store, which keeps them compressed in article_bodies, and
+loaded articles come back without them.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.sqlite import insert
+
+from article import Article
+from article_store import ARTICLE_STORE
+from database import IN_BATCH_SIZE, WRITE_BATCH_SIZE, ReadSessionLocal, NewsItem, NewsSymbol, AppState, chunks
+from db_writer import DB_WRITER
+from news_index import encode_cursor
+from stock_tagger import tag_articles
+
+# Fields that make up an article's stored row; a change in any of them triggers a rewrite.
+# The body is hashed separately by the article store.
+STORED_FIELDS = ("category", "headline", "description", "image_url", "timestamp",
+                 "sentiment", "sentiment_score", "stock_symbols")
+
+
+def article_hash(item):
+    payload = json.dumps([item.get(field) for field in STORED_FIELDS], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _to_datetime(epoch):
+    return datetime.fromtimestamp(epoch) if epoch is not None else None
+
+
+def _to_article(row, symbols):
+    return Article(
+        row.link,
+        headline=row.title,
+        category=row.category,
+        description=row.description,
+        image_url=row.image_url,
+        epoch=row.timestamp.timestamp() if row.timestamp else None,
+        sentiment=row.sentiment,
+        sentiment_score=row.sentiment_score,
+        stock_symbols=symbols,
+    )
+
+
+class NewsStore:
+    def __init__(self, db_session_factory=ReadSessionLocal, writer=DB_WRITER, article_store=ARTICLE_STORE):
+        # Reads use their own (read-only) sessions; writes go through the single-writer queue
+        self.db_session_factory = db_session_factory
+        self.writer = writer
+        self.article_store = article_store
+
+    # --- store version ---
+
+    def state(self):
+        """(version, saved_at epoch) of the store; version changes whenever article rows do."""
+        db = self.db_session_factory()
+        try:
+            values = dict(db.query(AppState.key, AppState.value)
+                          .filter(AppState.key.in_(["news_version", "news_saved_at"])).all())
+        finally:
+            db.close()
+        saved_at = values.get("news_saved_at")
+        return int(values.get("news_version") or 0), float(saved_at) if saved_at else None
+
+    def _set_state(self, db, key, value):
+        stmt = insert(AppState).values(key=key, value=str(value))
+        db.execute(stmt.on_conflict_do_update(index_elements=[AppState.key], set_={"value": stmt.excluded.value}))
+
+    # --- reads ---
+
+    def _symbols_for(self, db, links=None):
+        query = db.query(NewsSymbol.news_link, NewsSymbol.symbol)
+        rows = []
+        if links is None:
+            rows = query.all()
+        else:
+            for chunk in chunks(links, IN_BATCH_SIZE):
+                rows.extend(query.filter(NewsSymbol.news_link.in_(chunk)).all())
+        symbols = {}
+        for link, symbol in rows:
+            symbols.setdefault(link, []).append(symbol)
+        for values in symbols.values():
+            values.sort()
+        return symbols
+
+    def load(self):
+        """Every stored article as an Article without its body, newest first."""
+        db = self.db_session_factory()
+        try:
+            rows = db.query(NewsItem).order_by(NewsItem.timestamp.desc(), NewsItem.link.desc()).all()
+            symbols = self._symbols_for(db)
+            return [_to_article(row, symbols.get(row.link, [])) for row in rows]
+        finally:
+            db.close()
+
+    def get(self, link):
+        db = self.db_session_factory()
+        try:
+            row = db.query(NewsItem).filter(NewsItem.link == link).first()
+            if row is None:
+                return None
+            return _to_article(row, self._symbols_for(db, [link]).get(link, []))
+        finally:
+            db.close()
+
+    def count(self):
+        db = self.db_session_factory()
+        try:
+            return db.query(NewsItem).count()
+        finally:
+            db.close()
+
+    # --- writes ---
+
+    def _row(self, item, content_hash, now):
+        return {
+            "title": item.headline,
+            "description": item.description,
+            "link": item.link,
+            "image_url": item.image_url,
+            "timestamp": _to_datetime(item.epoch),
+            "category": item.category,
+            "sentiment": item.sentiment,
+            "sentiment_score": item.sentiment_score,
+            "content_hash": content_hash,
+            "updated_at": now,
+        }
+
+    def save(self, items, removed_links=(), scraped=True):
+        """
+        Upserts the articles in `items` (Articles or dicts) that are new or changed
+        and deletes `removed_links`. Unchanged articles cost one indexed hash lookup.
+        Articles carrying their body have it stored too, in the same
+        transaction. `scraped` records this as the last scrape time.
+        Returns (written, removed).
+        """
+        by_link = {article.link: article for article in map(Article.from_dict, items) if article.link}
+        removed_links = [link for link in dict.fromkeys(removed_links) if link not in by_link]
+
+        def write(db):
+            stored_hashes = {}
+            for chunk in chunks(by_link, IN_BATCH_SIZE):
+                stored_hashes.update(db.query(NewsItem.link, NewsItem.content_hash)
+                                     .filter(NewsItem.link.in_(chunk)).all())
+
+            now = datetime.now()
+            rows = []
+            for link, item in by_link.items():
+                content_hash = article_hash(item)
+                if stored_hashes.get(link) != content_hash:
+                    rows.append(self._row(item, content_hash, now))
+            changed = [row["link"] for row in rows]
+
+            for batch in chunks(rows, WRITE_BATCH_SIZE):
+                stmt = insert(NewsItem).values(batch)
+                updates = {column: stmt.excluded[column] for column in batch[0] if column != "link"}
+                db.execute(stmt.on_conflict_do_update(index_elements=[NewsItem.link], set_=updates))
+
+            # Symbols of rewritten and removed articles are replaced wholesale
+            for chunk in chunks(changed + removed_links, IN_BATCH_SIZE):
+                db.query(NewsSymbol).filter(NewsSymbol.news_link.in_(chunk)).delete(synchronize_session=False)
+            symbol_rows = [{"news_link": link, "symbol": symbol}
+                           for link in changed for symbol in by_link[link].stock_symbols or ()]
+            for batch in chunks(symbol_rows, WRITE_BATCH_SIZE):
+                db.execute(insert(NewsSymbol).values(batch))
+
+            removed = 0
+            for chunk in chunks(removed_links, IN_BATCH_SIZE):
+                removed += db.query(NewsItem).filter(NewsItem.link.in_(chunk)).delete(synchronize_session=False)
+
+            bodies = {link: item.body for link, item in by_link.items() if item.has_body}
+            bodies_written = self.article_store.write(db, bodies)
+            self.article_store.delete(db, removed_links)
+
+            if changed or removed or bodies_written:
+                version = int(db.query(AppState.value).filter(AppState.key == "news_version").scalar() or 0)
+                self._set_state(db, "news_version", version + 1)
+            # Recorded even when nothing changed: it is the "last scraped" time the refresh logic reads
+            if scraped:
+                self._set_state(db, "news_saved_at", time.time())
+            return len(changed), removed
+
+        written, removed = self.writer.run(write)
+        print(f"News store: {written} written, {removed} removed, {len(by_link) - written} unchanged.")
+        return written, removed
+
+    def import_json(self, path):
+        """One-time import of a moneycontrol_news.json archive. Safe to re-run: unchanged articles are skipped."""
+        if not os.path.exists(path):
+            return 0, 0
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        # Archives saved before ingest-time tagging have no stock_symbols yet
+        tag_articles(items, only_missing=True)
+        return self.save(items, scraped=False)
+
+    # --- /news queries ---
+
+    def query_page(self, page, limit, categories=None, symbols=None, since=None,
+                   links=None, scores=None, cursor_position=None):
+        """
+        One /news page as indexed queries on news_items, newest first.
+        categories / symbols are lowercased names, since an epoch cutoff, links an
+        optional candidate set (search or trending). With `scores` the matching
+        articles are ordered by score instead (page-based; no keyset cursor).
+        Returns {"items", "total", "next_cursor"}.
+        """
+        empty = {"items": [], "total": 0, "next_cursor": None}
+        if links is not None and not links:
+            return empty
+
+        db = self.db_session_factory()
+        try:
+            filters = []
+            if categories:
+                # Category names are a small fixed set: resolve them case-insensitively off the index
+                wanted = set(categories)
+                names = [name for (name,) in db.query(NewsItem.category).distinct()
+                         if str(name or "").lower() in wanted]
+                if not names:
+                    return empty
+                filters.append(NewsItem.category.in_(names))
+            if symbols:
+                # Stored symbols are upper case, as in stocks.json
+                tagged = select(NewsSymbol.news_link).where(NewsSymbol.symbol.in_([s.upper() for s in symbols]))
+                filters.append(NewsItem.link.in_(tagged))
+            if since is not None:
+                filters.append(NewsItem.timestamp > datetime.fromtimestamp(since))
+            if links is not None:
+                filters.append(NewsItem.link.in_(list(links)))
+
+            order = (NewsItem.timestamp.desc(), NewsItem.link.desc())
+            start = max(page - 1, 0) * limit
+
+            if scores is not None:
+                ordered = [link for (link,) in db.query(NewsItem.link).filter(*filters).order_by(*order)]
+                # Stable sort, so equal scores stay newest first
+                ordered.sort(key=lambda link: scores.get(link, 0), reverse=True)
+                page_links = ordered[start:start + limit]
+                rows = {row.link: row for row in db.query(NewsItem).filter(NewsItem.link.in_(page_links))}
+                rows = [rows[link] for link in page_links]
+                total = len(ordered)
+                next_cursor = None
+            else:
+                total = db.query(NewsItem.id).filter(*filters).count()
+                query = db.query(NewsItem).filter(*filters).order_by(*order)
+                if cursor_position:
+                    # Keyset: seek on the (timestamp, link) index instead of using OFFSET
+                    epoch, link = cursor_position
+                    if epoch is None:
+                        query = query.filter(NewsItem.timestamp.is_(None), NewsItem.link < link)
+                    else:
+                        ts = datetime.fromtimestamp(epoch)
+                        query = query.filter(or_(
+                            NewsItem.timestamp < ts,
+                            and_(NewsItem.timestamp == ts, NewsItem.link < link),
+                            NewsItem.timestamp.is_(None)
+                        ))
+                else:
+                    query = query.offset(start)
+                rows = query.limit(limit + 1).all()
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    last = rows[-1]
+                    next_cursor = encode_cursor(last.timestamp.timestamp() if last.timestamp else None, last.link)
+
+            symbols_by_link = self._symbols_for(db, [row.link for row in rows])
+            items = [_to_article(row, symbols_by_link.get(row.link, [])) for row in rows]
+            return {"items": items, "total": total, "next_cursor": next_cursor}
+        finally:
+            db.close()
+
+
+# Shared store used by the scraper and /news
+NEWS_STORE = NewsStore()
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from database import User, SentNotification, NewsAnalytics
+from db_writer import DB_WRITER
 from scraper import get_latest_news_raw 
+from article_store import ARTICLE_STORE
 from email_service import EmailService
 from datetime import datetime
 import logging
@@ -25,6 +27,9 @@ class NotificationManager:
                 print("No news to check.")
                 return
             
+            # Article bodies, loaded from the article store only for articles some user hasn't been sent yet
+            contents = {}
+
             for user in users:
                 watchlist_items = user.watchlist
                 if not watchlist_items:
@@ -34,9 +39,10 @@ class NotificationManager:
                 watchlist_names = {item.name.lower() for item in watchlist_items}
                 
                 matches = []
+                unsent = []
                 
                 for news in news_items:
-                    link = news.get("link")
+                    link = news.link
                     if not link: continue
                     
                     # Check if already sent
@@ -48,12 +54,19 @@ class NotificationManager:
                     
                     if sent_record:
                         continue
-                        
-                    headline = news.get("headline", "").lower()
-                    full_content = news.get("full_content", "").lower()
+                    unsent.append(news)
+
+                missing = [news.link for news in unsent if news.link not in contents]
+                if missing:
+                    loaded = ARTICLE_STORE.bodies(missing)
+                    contents.update({link: loaded.get(link) or "" for link in missing})
+
+                for news in unsent:
+                    full_content = contents[news.link]
+                    headline = (news.headline or "").lower()
                     
                     # Search text
-                    search_text = f"{headline} {full_content}"
+                    search_text = f"{headline} {full_content.lower()}"
                     
                     # Basic Match Logic
                     # Look for symbol or name in text
@@ -78,7 +91,7 @@ class NotificationManager:
                                 break
                     
                     if is_match:
-                        matches.append(news)
+                        matches.append({**news.to_dict(), "full_content": full_content})
 
                 if matches:
                     self.send_notification(user, matches, db)
@@ -164,10 +177,8 @@ class NotificationManager:
         # Send Email
         if self.email_service.send_email(user.email, subject, body):
             try:
-                # Save sent notifications to DB
-                db.bulk_save_objects(sent_entries)
-                db.commit()
+                # Save sent notifications to DB (through the single writer; `db` is read-only)
+                DB_WRITER.run(lambda write_db: write_db.bulk_save_objects(sent_entries))
                 print(f"Sent notification to {user.email} for {len(articles)} articles.")
             except Exception as e:
                 print(f"Error saving sent notifications for {user.email}: {e}")
-                db.rollback()
@@ -0,0 +1,194 @@
+"""
+Adaptive per-category refresh scheduler.
+
+Instead of re-scraping every category when the news cache is 5 minutes
+old, each category is refreshed on its own interval, derived from how
+often new articles have been showing up on its listing page:
+
+    interval = REFRESH_INTERVAL_AT_ONE_PER_HOUR / sqrt(rate per hour), clamped to [min, max]
+
+The square root is the allocation that minimises the mean delay before a
+new article is picked up for a given number of requests: busy categories
+are polled more often, but not so often that quiet ones starve. The rate is the ratio of exponentially decayed totals of new articles
+and elapsed hours, kept separately for NSE market hours (Mon-Fri 09:15-15:30 IST)
+and off hours, since publishing slows down sharply once the market
+closes. Intervals are evaluated with the current session's rate, so
+categories speed up as soon as the market opens.
+
+A refresh whose listing couldn't be fetched is recorded as a failure, not
+as a refresh that found nothing: the rate and interval stay as they were,
+and the category is retried one interval after the failure. The next
+successful refresh covers the whole time since the last one.
+
+Only due categories are refreshed; recent decisions are kept for
+/debug/scheduler.
+"""
+import collections
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+REFRESH_MIN_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "60"))
+REFRESH_MAX_INTERVAL = float(os.getenv("REFRESH_MAX_INTERVAL", "1800"))
+# Interval used until a category's rate has been observed (the old fixed refresh age)
+REFRESH_DEFAULT_INTERVAL = float(os.getenv("REFRESH_DEFAULT_INTERVAL", "300"))
+# Interval for a category publishing one article an hour; others scale with 1/sqrt(rate)
+REFRESH_INTERVAL_AT_ONE_PER_HOUR = float(os.getenv("REFRESH_INTERVAL_AT_ONE_PER_HOUR", "600"))
+# Weight of the newest observation in the rate average
+REFRESH_RATE_ALPHA = float(os.getenv("REFRESH_RATE_ALPHA", "0.3"))
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = (9, 15)
+MARKET_CLOSE = (15, 30)
+
+
+def market_session(now=None):
+    """'market' during NSE trading hours (Mon-Fri 09:15-15:30 IST), else 'off'. Exchange holidays are not modelled."""
+    local = datetime.fromtimestamp(time.time() if now is None else now, IST)
+    if local.weekday() >= 5:
+        return "off"
+    return "market" if MARKET_OPEN <= (local.hour, local.minute) < MARKET_CLOSE else "off"
+
+
+class RefreshScheduler:
+    def __init__(self, categories, min_interval=REFRESH_MIN_INTERVAL, max_interval=REFRESH_MAX_INTERVAL,
+                 default_interval=REFRESH_DEFAULT_INTERVAL, interval_at_one_per_hour=REFRESH_INTERVAL_AT_ONE_PER_HOUR,
+                 alpha=REFRESH_RATE_ALPHA, history=50):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.interval_at_one_per_hour = interval_at_one_per_hour
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.categories = {}
+        for name in categories:
+            self.add_category(name)
+        self.decisions = collections.deque(maxlen=history)
+
+    def add_category(self, name):
+        self.categories.setdefault(name, {
+            # Per session: [decayed new articles, decayed hours observed]
+            "observed": {"market": [0.0, 0.0], "off": [0.0, 0.0]},
+            "last_refresh": None,
+            "last_new": None,
+            "last_failure": None,
+            "refreshes": 0,
+            "failures": 0,
+            "new_total": 0,
+        })
+
+    def seed(self, last_refresh):
+        """Treats categories that were never refreshed in this process as refreshed at `last_refresh` (e.g. the store's save time)."""
+        if not last_refresh:
+            # Never scraped (e.g. an imported archive): everything stays due, with no interval to observe
+            return
+        with self.lock:
+            for state in self.categories.values():
+                if state["last_refresh"] is None:
+                    state["last_refresh"] = last_refresh
+
+    # --- intervals ---
+
+    @staticmethod
+    def _rate(state, session):
+        """New articles per hour in `session`, or None before any observation."""
+        new, hours = state["observed"][session]
+        return new / hours if hours > 0 else None
+
+    def _interval(self, state, session):
+        rate = self._rate(state, session)
+        if rate is None:
+            return min(max(self.default_interval, self.min_interval), self.max_interval)
+        if rate <= 0:
+            return self.max_interval
+        return min(max(self.interval_at_one_per_hour / math.sqrt(rate), self.min_interval), self.max_interval)
+
+    def _next_due(self, state, session):
+        if state["last_refresh"] is None and state["last_failure"] is None:
+            return 0.0
+        return max(state["last_refresh"] or 0.0, state["last_failure"] or 0.0) + self._interval(state, session)
+
+    def due(self, now=None):
+        """Categories whose next refresh time has passed."""
+        now = time.time() if now is None else now
+        session = market_session(now)
+        with self.lock:
+            return [name for name, state in self.categories.items() if self._next_due(state, session) <= now]
+
+    def next_due_at(self, now=None):
+        """Earliest next refresh time over all categories."""
+        now = time.time() if now is None else now
+        session = market_session(now)
+        with self.lock:
+            return min((self._next_due(state, session) for state in self.categories.values()), default=now)
+
+    # --- observations ---
+
+    def record(self, name, new_articles, now=None):
+        """Records a refresh of `name` that found `new_articles` links not seen before."""
+        now = time.time() if now is None else now
+        with self.lock:
+            self.add_category(name)
+            state = self.categories[name]
+            if state["last_refresh"] is not None and now > state["last_refresh"]:
+                # Decayed totals of new articles and elapsed hours; their ratio is the rate. Averaging the
+                # totals (rather than per-refresh rates) keeps short, empty refreshes from dragging the rate down.
+                observed = state["observed"][market_session(now)]
+                observed[0] = observed[0] * (1 - self.alpha) + new_articles
+                observed[1] = observed[1] * (1 - self.alpha) + (now - state["last_refresh"]) / 3600
+            state["last_refresh"] = now
+            state["last_new"] = new_articles
+            state["refreshes"] += 1
+            state["new_total"] += new_articles
+
+    def record_failure(self, name, now=None):
+        """Records a refresh of `name` whose listing couldn't be fetched; retried one interval later."""
+        now = time.time() if now is None else now
+        with self.lock:
+            self.add_category(name)
+            state = self.categories[name]
+            state["last_failure"] = now
+            state["failures"] += 1
+
+    def log_decision(self, due, reason, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            self.decisions.append({
+                "at": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+                "session": market_session(now),
+                "due": list(due),
+                "reason": reason,
+            })
+
+    # --- inspection ---
+
+    def snapshot(self, now=None):
+        now = time.time() if now is None else now
+        session = market_session(now)
+        with self.lock:
+            categories = {}
+            for name, state in self.categories.items():
+                next_due = self._next_due(state, session)
+                categories[name] = {
+                    "rate_per_hour": {k: round(self._rate(state, k), 2) if self._rate(state, k) is not None else None
+                                      for k in state["observed"]},
+                    "interval_seconds": round(self._interval(state, session), 1),
+                    "last_refresh": datetime.fromtimestamp(state["last_refresh"]).isoformat(timespec="seconds")
+                    if state["last_refresh"] else None,
+                    "due_in_seconds": round(max(next_due - now, 0.0), 1),
+                    "last_new": state["last_new"],
+                    "last_failure": datetime.fromtimestamp(state["last_failure"]).isoformat(timespec="seconds")
+                    if state["last_failure"] else None,
+                    "refreshes": state["refreshes"],
+                    "failures": state["failures"],
+                    "new_total": state["new_total"],
+                }
+            return {
+                "session": session,
+                "bounds_seconds": {"min": self.min_interval, "max": self.max_interval},
+                "interval_at_one_per_hour": self.interval_at_one_per_hour,
+                "categories": categories,
+                "decisions": list(self.decisions),
+            }
@@ -0,0 +1,296 @@
+"""
+Per-host retry, backoff, rate limit and circuit breaker for outbound fetches.
+
+Scraper and market-data fetches used to try once with a fixed timeout and
+swallow the error, so a slow or failing host cost every worker its full
+timeout and the refresh quietly came back partial. Every fetch now goes
+through RESILIENCE, which keeps per host:
+
+- a token bucket (FETCH_HOST_RATE requests/second, bursts of FETCH_HOST_BURST):
+  callers wait for a token instead of hammering a host that is already slow
+- retries with jittered exponential backoff ("full jitter": a random delay
+  up to base * 2^attempt, capped) for connection errors, timeouts and
+  429/5xx responses. A Retry-After header is honoured, up to the cap. A call
+  gives up once the next delay would take it past FETCH_RETRY_BUDGET seconds.
+- a circuit breaker: after BREAKER_FAILURES failed calls in a row the host
+  is "open" and calls fail at once with CircuitOpenError, without a request.
+  After BREAKER_COOLDOWN seconds one probe call goes through ("half open"):
+  success closes the breaker, failure opens it for another cooldown.
+
+A 4xx other than 429 is an answer, not a failure: it is returned as is and
+counts as a success for the breaker.
+
+Blocking callers use call() / get(); the asyncio FetchEngine uses call_async().
+Counters per host are in stats() (served on /debug/scheduler).
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+FETCH_RETRY_ATTEMPTS = int(os.getenv("FETCH_RETRY_ATTEMPTS", "3"))
+FETCH_RETRY_BASE_DELAY = float(os.getenv("FETCH_RETRY_BASE_DELAY", "0.5"))
+FETCH_RETRY_MAX_DELAY = float(os.getenv("FETCH_RETRY_MAX_DELAY", "8"))
+# Overall time one call may spend, retries and backoff included
+FETCH_RETRY_BUDGET = float(os.getenv("FETCH_RETRY_BUDGET", "30"))
+FETCH_HOST_RATE = float(os.getenv("FETCH_HOST_RATE", "30"))
+FETCH_HOST_BURST = int(os.getenv("FETCH_HOST_BURST", "60"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+
+# Responses worth retrying: the host is overloaded or failing, not saying no
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while a host's circuit breaker is open."""
+
+
+def host_of(url_or_host):
+    return urlsplit(url_or_host).hostname if "://" in url_or_host else url_or_host
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token. Returns how long to wait before using it (0 if one was available)."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # Going into debt queues the callers: each waits for its own token to accrue
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0        # consecutive
+        self.opened_at = None
+        self.opens = 0
+        self._probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go ahead. In the half-open state only one probe is let through at a time."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CLOSED:
+                print(f"Circuit breaker for {self.name} closed.")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.opens += 1
+                print(f"Circuit breaker for {self.name} opened after {self.failures} failures; "
+                      f"failing fast for {self.cooldown:.0f}s.")
+
+
+class HostPolicy:
+    """Rate limit, breaker and counters for one host."""
+
+    def __init__(self, host, rate, burst, failures, cooldown, clock):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.breaker = CircuitBreaker(host, failures, cooldown, clock)
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0        # calls that failed after their retries
+        self.rejected = 0        # calls refused while the breaker was open
+        self.throttled_seconds = 0.0
+        self.backoff_seconds = 0.0
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "breaker_opens": self.breaker.opens,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+        }
+
+
+class Resilience:
+    def __init__(self, attempts=FETCH_RETRY_ATTEMPTS, base_delay=FETCH_RETRY_BASE_DELAY, max_delay=FETCH_RETRY_MAX_DELAY,
+                 budget=FETCH_RETRY_BUDGET, rate=FETCH_HOST_RATE, burst=FETCH_HOST_BURST,
+                 failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN, clock=time.monotonic, rng=None):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def policy(self, url_or_host):
+        host = host_of(url_or_host)
+        with self.lock:
+            policy = self.hosts.get(host)
+            if policy is None:
+                policy = self.hosts[host] = HostPolicy(host, self.rate, self.burst, self.failure_threshold,
+                                                       self.cooldown, self.clock)
+            return policy
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number `attempt` (1-based): full jitter, or the server's Retry-After."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    # --- one call: shared by the blocking and asyncio loops ---
+
+    def _admit(self, policy):
+        """Counts a new call; raises CircuitOpenError if the host is failing fast."""
+        policy.calls += 1
+        if not policy.breaker.allow():
+            policy.rejected += 1
+            raise CircuitOpenError(f"{policy.host} is failing; circuit breaker open")
+
+    def _throttle(self, policy):
+        delay = policy.bucket.reserve()
+        policy.attempts += 1
+        policy.throttled_seconds += delay
+        return delay
+
+    def _outcome(self, policy, attempt, started, result=None, error=None):
+        """
+        Settles one attempt. Returns None when the call is done (result returned or error raised
+        by the caller), else the delay before the next attempt.
+        """
+        status = getattr(result, "status_code", None) if error is None else None
+        if error is None and status not in RETRY_STATUSES:
+            policy.successes += 1
+            policy.breaker.record_success()
+            return None
+        delay = None
+        if attempt < self.attempts:
+            delay = self.backoff(attempt, _retry_after(result))
+            if self.clock() - started + delay > self.budget:
+                delay = None
+        if delay is None:
+            policy.failures += 1
+            policy.breaker.record_failure()
+            return None
+        policy.retries += 1
+        policy.backoff_seconds += delay
+        return delay
+
+    def call(self, url_or_host, fn):
+        """
+        Calls fn() (one request to the host) with rate limiting, retries and the breaker.
+        Returns its result; after the last attempt a retryable response is returned and an
+        exception re-raised. Raises CircuitOpenError if the host's breaker is open.
+        """
+        policy = self.policy(url_or_host)
+        self._admit(policy)
+        started = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            time.sleep(self._throttle(policy))
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._outcome(policy, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._outcome(policy, attempt, started, result=result)
+                if delay is None:
+                    return result
+            time.sleep(delay)
+
+    async def call_async(self, url_or_host, fn):
+        """call() for coroutines: fn() returns an awaitable, and waits don't block the event loop."""
+        policy = self.policy(url_or_host)
+        self._admit(policy)
+        started = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(self._throttle(policy))
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._outcome(policy, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._outcome(policy, attempt, started, result=result)
+                if delay is None:
+                    return result
+            await asyncio.sleep(delay)
+
+    def get(self, url, **kwargs):
+        """A blocking curl_cffi GET through call(). Keyword arguments go to requests.get."""
+        from curl_cffi import requests
+        return self.call(url, lambda: requests.get(url, **kwargs))
+
+    def stats(self):
+        with self.lock:
+            return {host: policy.stats() for host, policy in self.hosts.items()}
+
+
+def _retry_after(response):
+    """Seconds from a response's Retry-After header (the delta form), or None."""
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(float(headers.get("Retry-After")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared by the scraper's fetches, the FetchEngine and market data
+RESILIENCE = Resilience()
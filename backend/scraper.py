@@ -1,12 +1,23 @@
 from curl_cffi import requests
 from bs4 import BeautifulSoup
-import json
 import time
 from datetime import datetime, timedelta
 import os
 import concurrent.futures
 import threading
-from sentiment import analyze_sentiment
+from article import Article, TIMESTAMP_FORMAT, format_timestamp, parse_timestamp
+from sentiment import analyze_sentiment, analyze_sentiment_many
+from stock_tagger import get_tagger
+from news_store import NEWS_STORE
+from article_store import ARTICLE_STORE
+from news_snapshot import SNAPSHOTS
+from fetch_engine import FetchEngine
+from ingest_pipeline import IngestPipeline
+from article_extractor import extract_article, NO_CONTENT
+from http_cache import LISTING_CACHE
+from near_duplicates import NEAR_DUPLICATES
+from refresh_scheduler import RefreshScheduler
+from resilience import RESILIENCE, CircuitOpenError
 
 # CONFIG
 # CONFIG
@@ -37,6 +48,7 @@ CATEGORY_URLS = {
     
 }
 
+# Legacy archive; imported into the news_items table once, when the table is empty
 JSON_FILE = "moneycontrol_news.json"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
@@ -45,158 +57,74 @@ HEADERS = {
     "Referer": "https://www.google.com/"
 }
 
+# "pipeline": listing pages on one pooled FetchEngine; article pages through INGEST_PIPELINE
+#             (fetch -> parse in a process pool -> batched sentiment, all at once).
+# "async": the same FetchEngine, with fetch, sentiment and parsing run one after another.
+# "threads": the original ThreadPoolExecutor path with blocking requests, kept as a fallback.
+SCRAPER_MODE = os.getenv("SCRAPER_MODE", "pipeline")
+FETCH_ENGINE = FetchEngine(headers=HEADERS)
+INGEST_PIPELINE = IngestPipeline(FETCH_ENGINE, analyze_sentiment_many)
+
+# Decides which categories are due for a refresh, from each one's observed publishing rate
+REFRESH_SCHEDULER = RefreshScheduler(CATEGORY_URLS)
+
 def load_existing_news():
-    if os.path.exists(JSON_FILE):
-        try:
-            with open(JSON_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def save_news(news_list):
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(news_list, f, indent=4, ensure_ascii=False)
-
-# Global Cache for article details to avoid re-fetching
-# This will be populated from existing JSON on startup
-ARTICLE_CACHE = {}
-
-def populate_cache(news_items):
-    global ARTICLE_CACHE
-    for item in news_items:
-        if "link" in item:
-            ARTICLE_CACHE[item["link"]] = {
-                "image_url": item.get("image_url"),
-                "timestamp": item.get("timestamp"),
-                "sentiment": item.get("sentiment"),
-                "sentiment_score": item.get("sentiment_score"),
-                "full_content": item.get("full_content")
-            }
+    return NEWS_STORE.load()
+
+def save_news(news_list, removed_links=()):
+    """Upserts new/changed articles into news_items and deletes removed ones."""
+    return NEWS_STORE.save(news_list, removed_links)
 
 def fetch_details_single(link, basic_data):
-    """Fetches details for a single article link."""
-    image_url = basic_data.get("image_url")
-    timestamp = basic_data.get("timestamp") # Preserve existing timestamp if available
-    
+    """Fetches details for a single article link: one request, one parse for image, timestamp and body."""
+    html = None
     try:
-         article_res = requests.get(link, headers=HEADERS, timeout=5, impersonate="chrome")
+         article_res = RESILIENCE.get(link, headers=HEADERS, timeout=10, impersonate="chrome")
          if article_res.status_code == 200:
-             a_soup = BeautifulSoup(article_res.text, "html.parser")
-             
-             # Extract high-quality image from OG tag
-             og_image = a_soup.find("meta", property="og:image")
-             if og_image and og_image.get("content"):
-                 image_url = og_image.get("content")
-
-             # Try JSON-LD for data (most reliable for MoneyControl)
-             scripts = a_soup.find_all("script", type="application/ld+json")
-             for script in scripts:
-                if script.string:
-                    try:
-                        data = json.loads(script.string)
-                        if isinstance(data, list):
-                            for item in data:
-                                if "datePublished" in item and not timestamp:
-                                    timestamp = item["datePublished"]
-                                if "image" in item and not image_url:
-                                    if isinstance(item["image"], dict) and "url" in item["image"]:
-                                        image_url = item["image"]["url"]
-                                    elif isinstance(item["image"], str):
-                                        image_url = item["image"]
-                                
-                        elif isinstance(data, dict):
-                            if "datePublished" in data and not timestamp:
-                                timestamp = data["datePublished"]
-                            if "image" in data and not image_url:
-                                if isinstance(data["image"], dict) and "url" in data["image"]:
-                                    image_url = data["image"]["url"]
-                                elif isinstance(data["image"], str):
-                                    image_url = data["image"]
-                    except:
-                        continue
-                if timestamp:
-                    break
-             
-             # Fallback 1: Meta tag for article published time
-             if not timestamp:
-                 meta_date = a_soup.find("meta", property="article:published_time") or \
-                            a_soup.find("meta", property="og:article:published_time") or \
-                            a_soup.find("meta", attrs={"name": "datePublished"})
-                 if meta_date and meta_date.get("content"):
-                     timestamp = meta_date.get("content")
-             
-             # Fallback 2: OG published time
-             if not timestamp:
-                 og_date = a_soup.find("meta", property="og:published_time")
-                 if og_date and og_date.get("content"):
-                     timestamp = og_date.get("content")
-             
-             # Fallback 3: Look for timestamp in article body (MoneyControl specific)
-             if not timestamp:
-                 # MoneyControl often has publish time in span with class "article_schedule"
-                 time_span = a_soup.find("span", class_="article_schedule")
-                 if time_span:
-                     timestamp = time_span.get_text(strip=True)
-                 else:
-                     # Try to find time element
-                     time_elem = a_soup.find("time")
-                     if time_elem:
-                         timestamp = time_elem.get("datetime") or time_elem.get_text(strip=True)
-
+             html = article_res.text
     except Exception as e:
         print(f"Error fetching article details for {link}: {e}")
 
-    # Format timestamp
-    try:
-        if timestamp and isinstance(timestamp, str):
-            # Try parsing ISO format (from JSON-LD)
-            try:
-                dt_obj = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                timestamp = dt_obj.strftime("%d %b %Y, %I:%M %p")
-            except:
-                # Try parsing other common formats
-                # MoneyControl sometimes uses formats like "January 27, 2026 13:06 IST"
-                for fmt in [
-                    "%B %d, %Y %H:%M IST",
-                    "%d %B %Y, %I:%M %p",
-                    "%d %b %Y, %I:%M %p",
-                    "%Y-%m-%d %H:%M:%S",
-                    "%d-%m-%Y %H:%M:%S"
-                ]:
-                    try:
-                        dt_obj = datetime.strptime(timestamp, fmt)
-                        timestamp = dt_obj.strftime("%d %b %Y, %I:%M %p")
-                        break
-                    except:
-                        continue
-        
-        # Only use current time if we absolutely couldn't find a timestamp AND didn't have one before
-        if not timestamp and not basic_data.get("timestamp"):
-             print(f"Warning: No timestamp found for {link}. Marking for removal.")
-             timestamp = None 
-             
-    except Exception as e:
-        print(f"Error formatting timestamp for {link}: {e}")
+    return details_from_html(link, basic_data, html)
+
+def details_from_html(link, basic_data, html, sentiment_result=None):
+    """Detail fields for an article from its fetched page (None if the fetch failed)."""
+    image_url = basic_data.get("image_url")
+    timestamp = basic_data.get("timestamp") # Preserve existing timestamp if available
+    full_content = None
+    if html is not None:
+        try:
+            extracted = extract_article(html, image_url, timestamp)
+            image_url, timestamp, full_content = extracted["image_url"], extracted["timestamp"], extracted["full_content"]
+        except Exception as e:
+            print(f"Error parsing article {link}: {e}")
+    return build_article_details(link, basic_data, image_url, timestamp, full_content, sentiment_result)
+
+def build_article_details(link, basic_data, image_url, timestamp, full_content, sentiment_result=None):
+    """
+    Normalizes the timestamp, runs sentiment (unless `sentiment_result` was
+    computed already) and assembles the detail fields merged into an article.
+    """
+    # Normalize whatever format the page used to the stored one
+    epoch = parse_timestamp(timestamp)
+    if epoch is not None:
+        timestamp = format_timestamp(epoch)
+    elif basic_data.get("timestamp"):
         # Don't overwrite if we have something valid
-        if not timestamp:
-             timestamp = basic_data.get("timestamp") or None
+        timestamp = basic_data["timestamp"]
+    else:
+        print(f"Warning: No timestamp found for {link}. Marking for removal.")
+        timestamp = None
 
     # Analyze Sentiment
-    sentiment_result = {"label": "neutral", "score": 0.0}
-    try:
-        # Use headline for faster initial sentiment, but full_content is better if we have it
-        # However, for deep_fetch, headline is already available in basic_data
-        sentiment_result = analyze_sentiment(basic_data.get("headline", ""))
-    except Exception as e:
-        print(f"Sentiment analysis failed for {link}: {e}")
-
-    # Fetch Full Content
-    full_content = None
-    try:
-        full_content = scrape_article_content(link)
-    except Exception as e:
-        print(f"Error fetching content for {link}: {e}")
+    if sentiment_result is None:
+        sentiment_result = {"label": "neutral", "score": 0.0}
+        try:
+            # Use headline for faster initial sentiment, but full_content is better if we have it
+            # However, for deep_fetch, headline is already available in basic_data
+            sentiment_result = analyze_sentiment(basic_data.get("headline", ""))
+        except Exception as e:
+            print(f"Sentiment analysis failed for {link}: {e}")
 
     return {
         "image_url": image_url,
@@ -245,20 +173,41 @@ def extract_listing_timestamp(article_element):
     return None
 
 def scrape_category(url, category_name):
+    """Article records of a category's listing page, or None if the page couldn't be fetched."""
     print(f"Scraping [{category_name}] Headlines...")
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10, impersonate="chrome")
+        response = RESILIENCE.get(url, headers={**HEADERS, **LISTING_CACHE.conditional_headers(url)},
+                                  timeout=10, impersonate="chrome")
         response.raise_for_status()
-    except requests.RequestException as e:
+    except (requests.exceptions.RequestException, CircuitOpenError) as e:
         print(f"Error scraping {url}: {e}")
-        return []
+        return None
+
+    rows = listing_rows(url, response)
+    return category_records(rows, category_name) if rows is not None else None
+
+def listing_rows(url, response):
+    """Listing rows for a category page response: the cached rows if the page is unchanged (304 or same hash), else parsed."""
+    rows = LISTING_CACHE.cached_rows(url, response.status_code, response.headers, response.content)
+    if rows is not None:
+        return rows
+    if response.status_code != 200:
+        print(f"Error scraping {url}: HTTP {response.status_code}")
+        return None
+    rows = parse_listing_rows(response.text)
+    LISTING_CACHE.store(url, response.headers, response.content, rows)
+    return rows
 
-    soup = BeautifulSoup(response.text, "html.parser")
+def parse_category_page(html, category_name):
+    """Article records (headline, link, cached details or a deep-fetch placeholder) from a category listing page."""
+    return category_records(parse_listing_rows(html), category_name)
+
+def parse_listing_rows(html):
+    """Headline, link and listing time (ISO, or None) of each article on a category listing page."""
+    soup = BeautifulSoup(html, "html.parser")
     articles = soup.find_all("li", class_="clearfix")
-    
-    results = []
-    cutoff_date = datetime.now() - timedelta(days=7)  # Only articles from last 7 days
-    
+
+    rows = []
     # Fast Scrape: Only get headlines and links
     for article in articles[:24]:
         title_tag = article.find("h2")
@@ -271,6 +220,25 @@ def scrape_category(url, category_name):
         
         # Try to extract preliminary timestamp from listing page
         listing_timestamp = extract_listing_timestamp(article)
+        rows.append({
+            "headline": headline,
+            "link": link,
+            "listed_at": listing_timestamp.isoformat() if listing_timestamp else None,
+        })
+    return rows
+
+def category_records(rows, category_name):
+    """Article records for a category's listing rows: stored details, or a placeholder marked for deep fetch."""
+    results = []
+    cutoff_date = datetime.now() - timedelta(days=7)  # Only articles from last 7 days
+    tagger = get_tagger()
+    # Articles deep-fetched before (their bodies are in the article store) aren't fetched again
+    known = ARTICLE_STORE.details([row["link"] for row in rows])
+    
+    for row in rows:
+        headline = row["headline"]
+        link = row["link"]
+        listing_timestamp = datetime.fromisoformat(row["listed_at"]) if row["listed_at"] else None
         
         # Filter out old articles based on listing timestamp
         if listing_timestamp and listing_timestamp < cutoff_date:
@@ -278,23 +246,19 @@ def scrape_category(url, category_name):
             continue
 
         # Initial minimal record
-        if link in ARTICLE_CACHE and ARTICLE_CACHE[link].get("full_content"):
-            cached = ARTICLE_CACHE[link]
+        if link in known:
+            cached = known[link]
             # Also check cached timestamp
-            cached_time = cached.get("timestamp")
-            if cached_time:
-                try:
-                    cached_dt = datetime.strptime(cached_time, "%d %b %Y, %I:%M %p")
-                    if cached_dt < cutoff_date:
-                        print(f"Skipping cached old article: {headline[:50]}...")
-                        continue
-                except:
-                    pass
-                    
+            cached_epoch = parse_timestamp(cached.get("timestamp"))
+            if cached_epoch is not None and cached_epoch < cutoff_date.timestamp():
+                print(f"Skipping cached old article: {headline[:50]}...")
+                continue
+
             results.append({
                 "category": category_name,
                 "headline": headline,
                 "link": link,
+                "stock_symbols": tagger.tag(headline),
                 **cached
             })
         else:
@@ -303,11 +267,12 @@ def scrape_category(url, category_name):
                 "category": category_name,
                 "headline": headline,
                 "link": link,
-                "image_url": ARTICLE_CACHE.get(link, {}).get("image_url"),
-                # Use listing timestamp if available, otherwise checks cache, or leaves as None to be filled by deep fetch
-                "timestamp": ARTICLE_CACHE.get(link, {}).get("timestamp") or (listing_timestamp.strftime("%d %b %Y, %I:%M %p") if listing_timestamp else None),
-                "sentiment": ARTICLE_CACHE.get(link, {}).get("sentiment") or "neutral",
-                "sentiment_score": ARTICLE_CACHE.get(link, {}).get("sentiment_score") or 0.0,
+                "stock_symbols": tagger.tag(headline),
+                "image_url": None,
+                # Use listing timestamp if available, or leaves as None to be filled by deep fetch
+                "timestamp": listing_timestamp.strftime(TIMESTAMP_FORMAT) if listing_timestamp else None,
+                "sentiment": "neutral",
+                "sentiment_score": 0.0,
                 "needs_deep_fetch": True 
             })
 
@@ -322,6 +287,38 @@ def deep_fetch_metadata(news_list):
         return news_list
 
     print(f"Starting deep fetch for {len(to_fetch)} articles...")
+
+    if SCRAPER_MODE == "pipeline":
+        for item, (fields, sentiment_result) in zip(to_fetch, INGEST_PIPELINE.run(to_fetch)):
+            try:
+                if fields is None:
+                    # Not fetched or not parseable: keep what the listing gave
+                    fields = {"image_url": item.get("image_url"), "timestamp": item.get("timestamp"), "full_content": None}
+                details = build_article_details(item["link"], item, fields["image_url"], fields["timestamp"],
+                                                fields["full_content"], sentiment_result)
+                item.update(details)
+                item.pop("needs_deep_fetch", None)
+            except Exception as e:
+                print(f"Deep fetch failed for {item['link']}: {e}")
+        return news_list
+
+    if SCRAPER_MODE == "async":
+        # One request per article on the shared pool
+        pages = FETCH_ENGINE.fetch_pages(item["link"] for item in to_fetch)
+        # All headlines go to the sentiment model together, in full batches
+        try:
+            sentiments = analyze_sentiment_many([item.get("headline", "") for item in to_fetch])
+        except Exception as e:
+            print(f"Sentiment analysis failed: {e}")
+            sentiments = [None] * len(to_fetch)
+        for item, sentiment_result in zip(to_fetch, sentiments):
+            try:
+                details = details_from_html(item["link"], item, pages.get(item["link"]), sentiment_result)
+                item.update(details)
+                item.pop("needs_deep_fetch", None)
+            except Exception as e:
+                print(f"Deep fetch failed for {item['link']}: {e}")
+        return news_list
     
     # Limit workers to avoid overloading sentiment model/network
     with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
@@ -334,14 +331,23 @@ def deep_fetch_metadata(news_list):
                 # Update item in place
                 item.update(details)
                 item.pop("needs_deep_fetch", None)
-                # Update cache
-                ARTICLE_CACHE[item['link']] = details
             except Exception as e:
                 print(f"Deep fetch failed for {item['link']}: {e}")
     
     return news_list
 
-def scrape_moneycontrol():
+def selected_category_urls(categories=None):
+    """CATEGORY_URLS restricted to `categories` (all of them if None)."""
+    if categories is None:
+        return CATEGORY_URLS
+    return {name: CATEGORY_URLS[name] for name in categories if name in CATEGORY_URLS}
+
+def scrape_moneycontrol(categories=None, failed=None):
+    """Headlines of `categories` (all if None). Categories whose listing couldn't be fetched are added to `failed`."""
+    failed = failed if failed is not None else set()
+    if SCRAPER_MODE in ("pipeline", "async"):
+        return scrape_moneycontrol_async(categories, failed)
+
     all_scraped_news = []
     
     # Use ThreadPoolExecutor for parallel scraping
@@ -349,237 +355,203 @@ def scrape_moneycontrol():
         # Create a list of futures
         future_to_category = {
             executor.submit(scrape_category, url, name): name 
-            for name, url in CATEGORY_URLS.items()
+            for name, url in selected_category_urls(categories).items()
         }
         
         for future in concurrent.futures.as_completed(future_to_category):
             category = future_to_category[future]
             try:
                 news_items = future.result()
-                if news_items:
+                if news_items is None:
+                    failed.add(category)
+                else:
                     all_scraped_news.extend(news_items)
             except Exception as e:
                 print(f"Error scraping category {category}: {e}")
+                failed.add(category)
                 
+    LISTING_CACHE.finish_run()
+    return all_scraped_news
+
+def scrape_moneycontrol_async(categories=None, failed=None):
+    """scrape_moneycontrol on the shared FetchEngine: all listing pages fetched concurrently (conditionally), then parsed if changed."""
+    failed = failed if failed is not None else set()
+    category_urls = selected_category_urls(categories)
+    for name in category_urls:
+        print(f"Scraping [{name}] Headlines...")
+    responses = FETCH_ENGINE.get_pages({url: LISTING_CACHE.conditional_headers(url) for url in category_urls.values()})
+
+    all_scraped_news = []
+    for name, url in category_urls.items():
+        response = responses.get(url)
+        if response is None:
+            failed.add(name)
+            continue
+        try:
+            rows = listing_rows(url, response)
+            if rows is not None:
+                all_scraped_news.extend(category_records(rows, name))
+            else:
+                failed.add(name)
+        except Exception as e:
+            print(f"Error scraping category {name}: {e}")
+            failed.add(name)
+    LISTING_CACHE.finish_run()
     return all_scraped_news
 
+def invalidate_article(link):
+    """Forgets an article's fetched details, so the next scrape that lists it fetches the page again."""
+    ARTICLE_STORE.invalidate(link)
+
 def scrape_article_content(url):
     """
     Scrapes the full text content of a news article.
+    Articles already deep-fetched are served from the article store without a request.
     """
+    cached = ARTICLE_STORE.body(url)
+    if cached and cached != NO_CONTENT:
+        return cached
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10, impersonate="chrome")
+        response = RESILIENCE.get(url, headers=HEADERS, timeout=10, impersonate="chrome")
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Method 1: Try JSON-LD (Most reliable for Moneycontrol)
-        scripts = soup.find_all("script", type="application/ld+json")
-        for script in scripts:
-            if script.string:
-                try:
-                    data = json.loads(script.string)
-                    # JSON-LD can be a list or direct object
-                    if isinstance(data, list):
-                        for item in data:
-                            if "articleBody" in item:
-                                text = item["articleBody"]
-                                if len(text) > 100:
-                                    return text
-                    elif isinstance(data, dict):
-                        if "articleBody" in data:
-                            text = data["articleBody"]
-                            if len(text) > 100:
-                                return text
-                except json.JSONDecodeError:
-                    continue
-        
-        # Method 2: Fallback to scraping paragraphs
-        # Common text containers on Moneycontrol
-        content_div = soup.find("div", class_="content_wrapper") or \
-                      soup.find("div", class_="arti-flow") or \
-                      soup.find("div", id="article-main")
-                      
-        if content_div:
-            # aggressive cleaning
-            for tag in content_div(["script", "style", "aside", "div.ads", "div.related_news"]):
-                tag.decompose()
-            
-            paragraphs = content_div.find_all("p")
-            clean_text = []
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                
-                # Filter out garbage commonly causing hallucinations
-                if len(text) < 30: continue # Skip tiny fragments
-                
-                text_lower = text.lower()
-                # Stop phrases that indicate the end of the article
-                if "disclaimer" in text_lower and len(text) < 100: break
-                if "copyright" in text_lower and "all rights reserved" in text_lower: break
-
-                # Skip promotional/link noise
-                noise_phrases = ["read also", "click here", "read more", "follow us on", "download", "whatsapp channel"]
-                if any(phrase in text_lower for phrase in noise_phrases):
-                    continue
-                    
-                clean_text.append(text)
-                
-            return "\n\n".join(clean_text)
-
-        return "Could not extract article content."
+        return extract_article(response.text)["full_content"]
 
     except Exception as e:
         print(f"Error scraping article content: {e}")
         return None
 
-def remove_duplicates(existing_news, new_news):
-    existing_links = {item["link"] for item in existing_news}
-    unique_news = []
-    for item in new_news:
-        if item["link"] not in existing_links:
-            unique_news.append(item)
-    return unique_news
-
-# Global background thread lock
-import threading
+# One ingest at a time
 scrape_lock = threading.Lock()
 
-def background_scrape_and_save(existing_news):
+# Scraped links held back as near-duplicates of a story in the dataset: {link: representative link}.
+# They aren't saved, so without this every scrape that lists them again would count them as new.
+HELD_BACK = {}
+
+def hold_back_duplicates(scraped_news, existing):
+    """
+    Clusters the scraped articles with NEAR_DUPLICATES and holds back placeholders whose
+    cluster already has a representative (a scraped or existing article): they are not
+    deep-fetched, saved or published, as the representative stands for the story. A held-back
+    article whose representative leaves the dataset is fetched like any new one.
+    Returns {link: representative link} for the ones held back.
+    """
+    for item in scraped_news:
+        NEAR_DUPLICATES.add(item["link"], item.get("headline"), published=parse_timestamp(item.get("timestamp")))
+    scraped = {item["link"] for item in scraped_news}
+    held = {}
+    for item in scraped_news:
+        if not item.get("needs_deep_fetch") or item["link"] in existing:
+            continue
+        representative = NEAR_DUPLICATES.representative(item["link"])
+        if representative != item["link"] and (representative in scraped or representative in existing):
+            held[item["link"]] = representative
+    for link, representative in list(HELD_BACK.items()):
+        if representative not in scraped and representative not in existing:
+            del HELD_BACK[link]
+    HELD_BACK.update(held)
+    if held:
+        print(f"Near-duplicates: {len(held)} articles repeat an already listed story; holding them back.")
+    return held
+
+def record_refresh(categories, scraped_news, known_links, failed=()):
+    """
+    Tells the scheduler how many links not seen before each refreshed category listed;
+    categories in `failed` weren't fetched, which says nothing about their rate.
+    """
+    new_counts = dict.fromkeys(categories if categories is not None else CATEGORY_URLS, 0)
+    for item in scraped_news:
+        if item["link"] not in known_links and item.get("category") in new_counts:
+            new_counts[item["category"]] += 1
+    now = time.time()
+    for name, count in new_counts.items():
+        if name in failed:
+            REFRESH_SCHEDULER.record_failure(name, now)
+        else:
+            REFRESH_SCHEDULER.record(name, count, now)
+
+def ingest(existing_news, categories=None):
+    """
+    Scrapes `categories` (all if None), deep-fetches new articles, merges them
+    into `existing_news` and saves the result. Returns the new dataset as
+    Articles, updated ones built anew so the published snapshot `existing_news`
+    came from is never modified, or None if nothing was scraped.
+    """
     if scrape_lock.locked():
         print("Scrape already in progress. Skipping.")
-        return
+        return None
 
     with scrape_lock:
-        print("Starting background scrape...")
+        print(f"Starting ingest ({len(categories) if categories is not None else 'all'} categories)...")
         try:
             # Phase 1: Fast Headlines Scrape
-            new_scraped_news = scrape_moneycontrol()
+            failed = set()
+            new_scraped_news = scrape_moneycontrol(categories, failed)
+            record_refresh(categories, new_scraped_news, {item["link"] for item in existing_news} | set(HELD_BACK),
+                           failed)
             if new_scraped_news:
+                merged_map = {item["link"]: Article.from_dict(item) for item in existing_news}
+
+                # Near-duplicates of a story already listed are left out
+                held = hold_back_duplicates(new_scraped_news, merged_map)
+                new_scraped_news = [item for item in new_scraped_news if item["link"] not in held]
+
                 # Phase 2: Deep Metadata Fetch (Images/Sentiment/Content)
                 new_scraped_news = deep_fetch_metadata(new_scraped_news)
-                
+
                 # Merge logic: Use a map to handle duplicates and updates
                 # new_scraped_news contains the freshest data (including full_content)
-                merged_map = {item["link"]: item for item in existing_news}
                 for item in new_scraped_news:
                     if item["link"] in merged_map:
                         # Update existing item with new details if it was missing something
-                        merged_map[item["link"]].update(item)
+                        merged_map[item["link"]] = merged_map[item["link"]].merged(item)
                     else:
                         # New item
-                        merged_map[item["link"]] = item
+                        merged_map[item["link"]] = Article.from_dict(item)
                 
                 # Convert back to list
                 updated_news = list(merged_map.values())
                 
                 # Filter out articles older than 30 days (User requested "this month")
-                cutoff_date = datetime.now() - timedelta(days=30)
+                cutoff = (datetime.now() - timedelta(days=30)).timestamp()
                 filtered_news = []
                 for article in updated_news:
-                    try:
-                        timestamp_str = article.get("timestamp")
-                        # STRICT FILTER: Drop if no timestamp
-                        if not timestamp_str:
-                            print(f"Dropping undated article: {article.get('headline', '')[:50]}...")
-                            # REVERT: If user wants old articles, we might need to keep them?
-                            # But undated ones break the sorting.
-                            # Let's keep them but with a default very old date if we want to preserve them?
-                            # No, for now let's just log.
-                            continue
-
-                        article_date = datetime.strptime(timestamp_str, "%d %b %Y, %I:%M %p")
-                        if article_date >= cutoff_date:
-                            filtered_news.append(article)
-                        else:
-                            print(f"Filtering out old article: {article.get('headline', '')[:50]}... (Date: {timestamp_str})")
-                            # If we want to keep them: filtered_news.append(article)
-                    except:
-                        # If we can't parse the date, DROP IT to avoid crashes.
-                        print(f"Dropping article with invalid date: {article.get('headline', '')} ({article.get('timestamp')})")
+                    # STRICT FILTER: Drop if no (parseable) timestamp; undated ones break the sorting
+                    if article.epoch is None:
+                        print(f"Dropping undated article: {(article.headline or '')[:50]}...")
                         continue
+                    if article.epoch >= cutoff:
+                        filtered_news.append(article)
+                    else:
+                        print(f"Filtering out old article: {(article.headline or '')[:50]}... (Date: {article.timestamp})")
                 
                 # Sort by timestamp (most recent first)
-                try:
-                    filtered_news.sort(key=lambda x: datetime.strptime(x.get("timestamp", ""), "%d %b %Y, %I:%M %p") if x.get("timestamp") else datetime.min, reverse=True)
-                except:
-                    pass
+                filtered_news.sort(key=lambda article: article.epoch, reverse=True)
 
                 # Keep only last 1000 items
                 filtered_news = filtered_news[:1000] 
-                save_news(filtered_news)
-                
-                # Update in-memory cache
-                global NEWS_CACHE, LAST_SCRAPE_TIME
-                NEWS_CACHE = filtered_news
-                LAST_SCRAPE_TIME = time.time()
-                
-                print(f"Background scrape finished. Dataset now has {len(filtered_news)} recent articles (filtered from {len(updated_news)} total).")
+
+                # Write only what this scrape touched, plus deletes for articles that aged out
+                kept_links = {article.link for article in filtered_news}
+                scraped_links = dict.fromkeys(item["link"] for item in new_scraped_news)
+                removed_links = [link for link in merged_map if link not in kept_links]
+                save_news([merged_map[link] for link in scraped_links if link in kept_links], removed_links)
+
+                print(f"Ingest finished. Dataset now has {len(filtered_news)} recent articles (filtered from {len(updated_news)} total).")
+                return filtered_news
             else:
-                print("Background scrape finished. No articles found.")
+                print("Ingest finished. No articles found.")
         except Exception as e:
-            print(f"Background scrape failed: {e}")
-
-# In-memory news cache
-NEWS_CACHE = []
-LAST_SCRAPE_TIME = 0
+            print(f"Ingest failed: {e}")
+        return None
 
 def get_latest_news():
     """
-    Returns data immediately. 
-    If data is stale (> 5 mins), triggers a background refresh.
-    If no data exists, waits for a scrape (blocking).
+    Articles of the current news snapshot (empty before the first one is published).
+    Never scrapes or waits on the network: ingest_worker builds and publishes snapshots.
     """
-    global NEWS_CACHE, LAST_SCRAPE_TIME
-    
-    # 1. Check in-memory cache first
-    if NEWS_CACHE and (time.time() - LAST_SCRAPE_TIME < 300):
-        return NEWS_CACHE
-
-    # 2. Load Existing from Disk if memory cache is empty/stale
-    existing_news = []
-    if os.path.exists(JSON_FILE):
-        existing_news = load_existing_news()
-        
-        # Populate Cache for faster scraping
-        populate_cache(existing_news)
-        
-        last_modified = os.path.getmtime(JSON_FILE)
-        
-        # Update memory cache
-        NEWS_CACHE = existing_news
-        LAST_SCRAPE_TIME = last_modified
-
-        # 300 seconds = 5 minutes cache life
-        if time.time() - last_modified < 300 and existing_news: 
-            return existing_news
-        
-        # Cache is expired, but we have data to show while updating
-        if existing_news:
-            print("Cache expired. Serving stale data and triggering background refresh...")
-            # We already have NEWS_CACHE set
-            thread = threading.Thread(target=background_scrape_and_save, args=(existing_news,))
-            thread.daemon = True
-            thread.start()
-            return existing_news
-
-    # 2. No Data (or empty file) - Must Block
-    print("No existing data. Blocking for initial FAST scrape...")
-    new_scraped_news = scrape_moneycontrol() # Only headlines
-    if new_scraped_news:
-        save_news(new_scraped_news)
-        
-        # Trigger background deep fetch for details
-        print("Initial fast scrape complete. Starting background deep fetch for details...")
-        thread = threading.Thread(target=background_scrape_and_save, args=(new_scraped_news,))
-        thread.daemon = True
-        thread.start()
-        
-        NEWS_CACHE = new_scraped_news
-        return new_scraped_news
-    
-    return []
+    return SNAPSHOTS.items()
 
-# Helper to just return raw list if needed, but get_latest_news handles logic
+# Helper to just return raw list if needed
 def get_latest_news_raw():
     return get_latest_news()
 
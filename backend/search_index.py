@@ -0,0 +1,214 @@
+"""
+Tokenized inverted index with BM25 ranking for the /news `q` parameter.
+
+Articles are indexed once at ingest (headline, description, category and
+full_content) and updated incrementally as the scraper merges new ones, so
+a query only touches the postings of its own terms.
+
+Published articles don't carry their bodies (see article_store), so sync
+takes a loader for them and only calls it for articles it has to index.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights: a term in the headline counts as much as three in the body
+FIELD_WEIGHTS = {
+    "headline": 3,
+    "description": 2,
+    "category": 1,
+    "full_content": 1,
+}
+
+# Fields compared to decide whether an article without its body needs re-indexing
+META_FIELDS = tuple(field for field in FIELD_WEIGHTS if field != "full_content")
+
+# Cap on how many vocabulary terms a single prefix (e.g. "bank" -> "banking", "banks") can expand to
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}        # term -> {link: weighted term frequency}
+        self.vocabulary = []      # sorted terms, for prefix lookups
+        self.doc_terms = {}       # link -> {term: tf}, needed to un-index a document
+        self.doc_lengths = {}     # link -> weighted token count
+        self.doc_signatures = {}  # link -> hash of indexed text, to skip unchanged documents
+        self.doc_meta = {}        # link -> hash of the non-body fields, for articles published without bodies
+        self.total_length = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def _signature(self, item):
+        return hash(tuple(str(item.get(field) or "") for field in FIELD_WEIGHTS))
+
+    def _meta_signature(self, item):
+        return hash(tuple(str(item.get(field) or "") for field in META_FIELDS))
+
+    def _remove(self, link):
+        terms = self.doc_terms.pop(link, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(link, None)
+            if not posting:
+                del self.postings[term]
+                pos = bisect_left(self.vocabulary, term)
+                if pos < len(self.vocabulary) and self.vocabulary[pos] == term:
+                    self.vocabulary.pop(pos)
+        self.total_length -= self.doc_lengths.pop(link, 0)
+        self.doc_signatures.pop(link, None)
+        self.doc_meta.pop(link, None)
+
+    def upsert(self, item):
+        """Indexes one article. Returns True if it was (re)indexed, False if unchanged."""
+        link = item.get("link")
+        if not link:
+            return False
+
+        signature = self._signature(item)
+        with self.lock:
+            if self.doc_signatures.get(link) == signature:
+                return False
+            self._remove(link)
+
+            terms = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(item.get(field)):
+                    terms[token] = terms.get(token, 0) + weight
+
+            for term, tf in terms.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = {}
+                    insort(self.vocabulary, term)
+                posting[link] = tf
+
+            length = sum(terms.values())
+            self.doc_terms[link] = terms
+            self.doc_lengths[link] = length
+            self.doc_signatures[link] = signature
+            self.doc_meta[link] = self._meta_signature(item)
+            self.total_length += length
+            return True
+
+    def upsert_many(self, items):
+        with self.lock:
+            return sum(1 for item in items if self.upsert(item))
+
+    def retain(self, links):
+        """Drops every indexed document whose link is not in `links`."""
+        links = set(links)
+        with self.lock:
+            stale = [link for link in self.doc_lengths if link not in links]
+            for link in stale:
+                self._remove(link)
+            return len(stale)
+
+    def sync(self, items, load_bodies=None):
+        """
+        Makes the index match `items`, re-indexing only new or changed articles.
+        Items without a full_content key are compared on their other fields; the
+        ones that need indexing get their body from load_bodies(links) -> {link: body}.
+        """
+        items = list(items)
+        to_index = items
+        if load_bodies is not None:
+            with self.lock:
+                to_index = [item for item in items
+                            if "full_content" in item or self.doc_meta.get(item.get("link")) != self._meta_signature(item)]
+            pending = [item["link"] for item in to_index if "full_content" not in item and item.get("link")]
+            # Loaded outside the lock, so searches keep running meanwhile
+            bodies = load_bodies(pending) if pending else {}
+            to_index = [item if "full_content" in item else {**item, "full_content": bodies.get(item.get("link"))}
+                        for item in to_index]
+        with self.lock:
+            changed = self.upsert_many(to_index)
+            removed = self.retain(item.get("link") for item in items)
+        if changed or removed:
+            print(f"Search index updated: {changed} indexed, {removed} removed, {len(self)} total.")
+        return changed, removed
+
+    def _expand(self, token):
+        """Exact term plus vocabulary terms that start with it (search-as-you-type)."""
+        terms = []
+        pos = bisect_left(self.vocabulary, token)
+        while pos < len(self.vocabulary) and len(terms) < MAX_PREFIX_EXPANSIONS:
+            term = self.vocabulary[pos]
+            if not term.startswith(token):
+                break
+            terms.append(term)
+            pos += 1
+        return terms
+
+    def _bm25(self, tf, doc_length, idf, avg_length):
+        norm = self.k1 * (1 - self.b + self.b * doc_length / avg_length)
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def search(self, query):
+        """
+        Returns {link: score} for documents containing every query token
+        (each token may match as a prefix). Work is proportional to the
+        postings of the query terms, not to the corpus size.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return {}
+
+        with self.lock:
+            n_docs = len(self.doc_lengths)
+            if n_docs == 0:
+                return {}
+            avg_length = self.total_length / n_docs or 1.0
+
+            # Per token: the postings of every term it expands to
+            token_postings = []
+            for token in tokens:
+                postings = [self.postings[term] for term in self._expand(token)]
+                if not postings:
+                    return {}
+                token_postings.append(postings)
+
+            # Intersect starting from the rarest token so the candidate set stays small
+            token_postings.sort(key=lambda postings: sum(len(p) for p in postings))
+            candidates = set()
+            for posting in token_postings[0]:
+                candidates.update(posting)
+            for postings in token_postings[1:]:
+                candidates = {link for link in candidates if any(link in p for p in postings)}
+                if not candidates:
+                    return {}
+
+            scores = dict.fromkeys(candidates, 0.0)
+            for postings in token_postings:
+                idfs = [math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+                for link in candidates:
+                    doc_length = self.doc_lengths[link]
+                    # A prefix token scores as its best-matching expansion
+                    best = 0.0
+                    for posting, idf in zip(postings, idfs):
+                        tf = posting.get(link)
+                        if tf:
+                            best = max(best, self._bm25(tf, doc_length, idf, avg_length))
+                    scores[link] += best
+            return scores
+
+
+# Shared index, kept in sync with the published news snapshot
+SEARCH_INDEX = SearchIndex()
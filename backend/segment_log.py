@@ -0,0 +1,381 @@
+"""
+Append-only segment log of upserts keyed by link (line-delimited JSON).
+
+Replaces rewriting a whole indented JSON archive on every save: a save
+appends one line per new or changed record to the active segment, so its
+cost follows the number of changed records, not the size of the archive.
+A line is a record dict (an upsert, keyed by its link) or {"_deleted": link}.
+analysis.py keeps its per-article results in one; the articles themselves
+live in the news store.
+
+The log is a directory of numbered segments, seg-00000001.jsonl, ...; the
+highest one is the active segment and takes the appends. Once it passes
+SEGMENT_MAX_BYTES it is sealed and a new one is started. Compaction folds
+the sealed segments into a base file, base-<N>.jsonl, holding only the
+latest version of each live article as of segment N; it runs in a background
+thread once enough of the log is superseded lines, while appends carry on
+into the next segment.
+
+Crash safety:
+- Appends are flushed and fsynced per save. A torn last line, from a crash
+  mid-append, is dropped and truncated away on open.
+- A base is written to a .tmp file, fsynced and renamed into place. The
+  rename is what makes it take over, so a crash leaves either the old
+  segments or the new base, never a half-written base. Segments it covers
+  are deleted afterwards; leftovers from a crash are ignored and removed.
+
+Loading streams the base and the segments line by line instead of parsing
+one big document.
+
+    python segment_log.py convert moneycontrol_news.json news_log
+    python segment_log.py compact news_log
+    python segment_log.py stats news_log
+"""
+import json
+import os
+import re
+import sys
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Active segment size at which it is sealed and a new one started
+SEGMENT_MAX_BYTES = int(os.getenv("SEGMENT_MAX_BYTES", str(8 * 1024 * 1024)))
+# Compact once superseded lines make up this share of the log...
+COMPACT_DEAD_RATIO = float(os.getenv("SEGMENT_COMPACT_DEAD_RATIO", "0.5"))
+# ...and there are at least this many of them
+COMPACT_MIN_DEAD = int(os.getenv("SEGMENT_COMPACT_MIN_DEAD", "1000"))
+
+DELETED = "_deleted"
+SEGMENT_RE = re.compile(r"^(seg|base)-(\d{8})\.jsonl$")
+
+
+def _dumps(record):
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _fsync_dir(path):
+    # Makes a rename or a new file in `path` durable; not possible on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SegmentLog:
+    def __init__(self, directory, key="link", segment_max_bytes=SEGMENT_MAX_BYTES,
+                 compact_dead_ratio=COMPACT_DEAD_RATIO, compact_min_dead=COMPACT_MIN_DEAD, fsync=True):
+        self.directory = directory
+        self.key = key
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_dead_ratio = compact_dead_ratio
+        self.compact_min_dead = compact_min_dead
+        self.fsync = fsync
+        self.lock = threading.Lock()           # appends, rotation and the counters below
+        self.compact_lock = threading.Lock()   # one compaction at a time
+        self._compactor = None
+        self._file = None
+        self.live = None                       # keys of live articles, counted by the first load
+        self.lines = None                      # lines in the base and segments, likewise
+        self.base = 0                          # segment number the base covers (0: no base)
+        self.active = 0                        # number of the active segment
+        self.bytes_appended = 0
+        self.bytes_compacted = 0
+        self.compactions = 0
+        self.truncated = 0
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    # --- files ---
+
+    def _path(self, kind, number):
+        return os.path.join(self.directory, f"{kind}-{number:08d}.jsonl")
+
+    def _files(self):
+        """(bases, segments) as sorted lists of numbers."""
+        bases, segments = [], []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_RE.match(name)
+            if match:
+                (bases if match.group(1) == "base" else segments).append(int(match.group(2)))
+        return sorted(bases), sorted(segments)
+
+    def _chain(self, through=None):
+        """Paths to replay, oldest first: the newest base, then the segments after it (up to `through`)."""
+        bases, segments = self._files()
+        base = bases[-1] if bases else 0
+        paths = [self._path("base", base)] if base else []
+        return paths + [self._path("seg", n) for n in segments if n > base and (through is None or n <= through)]
+
+    def _recover(self):
+        """Drops leftovers of an interrupted compaction and truncates a torn last line."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+        bases, segments = self._files()
+        self.base = bases[-1] if bases else 0
+        self._remove_covered()
+        later = [n for n in segments if n > self.base]
+        self.active = later[-1] if later else self.base + 1
+
+        active_path = self._path("seg", self.active)
+        if os.path.exists(active_path):
+            self._truncate_torn(active_path)
+
+    def _remove_covered(self):
+        bases, segments = self._files()
+        for n in bases:
+            if n < self.base:
+                os.remove(self._path("base", n))
+        for n in segments:
+            if n <= self.base:
+                os.remove(self._path("seg", n))
+
+    def _truncate_torn(self, path):
+        with open(path, "rb+") as f:
+            data = f.read()
+            good = data.rfind(b"\n") + 1
+            if good < len(data):
+                # Last append was cut short: everything after the last complete line goes
+                f.truncate(good)
+                self.truncated += 1
+                print(f"Segment log: dropped a torn {len(data) - good}-byte record at the end of {path}.")
+
+    def _open_active(self):
+        if self._file is None:
+            self._file = open(self._path("seg", self.active), "ab")
+        return self._file
+
+    # --- reads ---
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield _loads(line)
+                except ValueError:
+                    print(f"Segment log: skipping unreadable line {number} of {path}.")
+
+    def scan(self):
+        """
+        Yields (key, article) for every line in log order, oldest first; article is None for deletes.
+        Compaction waits until the scan is done, so the files being read stay in place.
+        """
+        with self.compact_lock:
+            with self.lock:
+                paths = self._chain()
+            for path in paths:
+                for record in self._read(path):
+                    if DELETED in record:
+                        yield record[DELETED], None
+                    else:
+                        yield record.get(self.key), record
+
+    def load(self):
+        """Live articles, the latest version of each, in the order they were first written."""
+        articles = {}
+        lines = 0
+        for key, record in self.scan():
+            lines += 1
+            if record is None:
+                articles.pop(key, None)
+            else:
+                articles[key] = record
+        with self.lock:
+            # The same pass counts the log, unless something was appended first (which counted it then)
+            if self.lines is None:
+                self.lines, self.live = lines, set(articles)
+        return list(articles.values())
+
+    def _count(self):
+        """Counts lines and live keys if nothing has loaded the log yet."""
+        if self.lines is None:
+            self.load()
+
+    def count(self):
+        """Number of live articles."""
+        self._count()
+        return len(self.live)
+
+    # --- writes ---
+
+    def append(self, articles, deleted=()):
+        """Appends upserts for `articles` and deletes for the `deleted` keys. Returns the bytes written."""
+        lines = [_dumps(article) + b"\n" for article in articles]
+        lines += [_dumps({DELETED: key}) + b"\n" for key in deleted]
+        if not lines:
+            return 0
+        data = b"".join(lines)
+        self._count()
+        with self.lock:
+            f = self._open_active()
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self.bytes_appended += len(data)
+            self.lines += len(lines)
+            self.live.update(article[self.key] for article in articles)
+            self.live.difference_update(deleted)
+            if f.tell() >= self.segment_max_bytes:
+                self._rotate()
+        if self.should_compact():
+            self.compact_async()
+        return len(data)
+
+    def _rotate(self):
+        """Seals the active segment; the next append starts a new one. Call with self.lock held."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.active += 1
+        _fsync_dir(self.directory)
+
+    def should_compact(self):
+        dead = self.lines - len(self.live)
+        return dead >= self.compact_min_dead and dead >= self.compact_dead_ratio * self.lines
+
+    # --- compaction ---
+
+    def compact(self):
+        """
+        Folds the base and every sealed segment into a new base. The active segment
+        is sealed first, so appends made meanwhile go to a segment the base doesn't cover.
+        Returns the number of live articles written.
+        """
+        self._count()
+        with self.compact_lock:
+            with self.lock:
+                self._rotate()
+                through = self.active - 1
+                lines_before = self.lines
+            latest = {}
+            for path in self._chain(through):
+                for record in self._read(path):
+                    if DELETED in record:
+                        latest.pop(record[DELETED], None)
+                    else:
+                        latest[record.get(self.key)] = record
+
+            tmp = self._path("base", through) + ".tmp"
+            written = 0
+            with open(tmp, "wb") as f:
+                for record in latest.values():
+                    written += f.write(_dumps(record) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            # The rename is the commit point: from here on the base supersedes segments <= through
+            os.replace(tmp, self._path("base", through))
+            _fsync_dir(self.directory)
+
+            with self.lock:
+                self.base = through
+                self._remove_covered()
+                # Lines appended while compacting are still in their segments
+                self.lines = len(latest) + (self.lines - lines_before)
+                self.bytes_compacted += written
+                self.compactions += 1
+            return len(latest)
+
+    def compact_async(self):
+        """Starts a background compaction unless one is already running."""
+        with self.lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return False
+            self._compactor = threading.Thread(target=self._compact_quietly, name="segment-log-compactor", daemon=True)
+            self._compactor.start()
+            return True
+
+    def _compact_quietly(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Segment log compaction failed: {e}")
+
+    def wait(self, timeout=None):
+        """Waits for a background compaction to finish."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def close(self):
+        self.wait()
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- inspection ---
+
+    def stats(self):
+        self._count()
+        with self.lock:
+            paths = self._chain()
+            return {
+                "live": len(self.live),
+                "lines": self.lines,
+                "dead": self.lines - len(self.live),
+                "base": self.base,
+                "active_segment": self.active,
+                "files": len(paths),
+                "disk_bytes": sum(os.path.getsize(path) for path in paths if os.path.exists(path)),
+                "bytes_appended": self.bytes_appended,
+                "bytes_compacted": self.bytes_compacted,
+                "compactions": self.compactions,
+                "truncated": self.truncated,
+            }
+
+
+def convert_json(json_path, log, batch_size=1000):
+    """
+    Appends the articles of a legacy JSON archive (one big list) to `log`.
+    Returns how many were converted. The file is parsed once, here, and never again.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    articles = [item for item in items if isinstance(item, dict) and item.get(log.key)]
+    for i in range(0, len(articles), batch_size):
+        log.append(articles[i:i + batch_size])
+    return len(articles)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("convert", "compact", "stats"):
+        print("usage: python segment_log.py convert <news.json> <log dir> | compact <log dir> | stats <log dir>")
+        sys.exit(2)
+    command = sys.argv[1]
+    if command == "convert":
+        log = SegmentLog(sys.argv[3])
+        count = convert_json(sys.argv[2], log)
+        log.compact()
+        print(f"Converted {count} articles from {sys.argv[2]} into {sys.argv[3]}.")
+    elif command == "compact":
+        log = SegmentLog(sys.argv[2])
+        print(f"Compacted {sys.argv[2]}: {log.compact()} live articles.")
+    else:
+        log = SegmentLog(sys.argv[2])
+    print(log.stats())
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,191 @@
-try:
-    from transformers import BertTokenizer, BertForSequenceClassification, pipeline
-    import torch
-    HAS_AI = True
-except ImportError:
-    HAS_AI = False
+"""
+FinBERT sentiment, served through a micro-batching queue.
+
+Deep fetch calls analyze_sentiment from many threads, one headline each.
+Rather than running the model once per text, callers queue their text
+and get a Future: a single worker thread collects whatever arrives
+within SENTIMENT_BATCH_WAIT_MS (or up to SENTIMENT_BATCH_SIZE texts),
+runs them through the model as one padded batch, and resolves each
+caller's future. analyze_sentiment stays a blocking call.
+
+Results are cached on disk by model and normalized text (sentiment_cache),
+and the cache is checked before anything is queued, so a text the model
+has already seen, even before a restart, is never classified again.
+
+The model runs on the backend named by SENTIMENT_BACKEND (torch, torch-int8
+or onnx; see sentiment_backends). The backend is part of the cache's model
+ID, since quantized scores differ slightly from fp32 ones.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sentiment_backends import TorchClassifier, available, load_classifier
+from sentiment_cache import SENTIMENT_CACHE
+
+# torch (fp32), torch-int8 (dynamic quantization) or onnx (ONNX Runtime)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+HAS_AI = available(SENTIMENT_BACKEND)
+
+# Most texts per model call, and how long the first text waits for others to join its batch
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_BATCH_WAIT_MS = float(os.getenv("SENTIMENT_BATCH_WAIT_MS", "5"))
+NEUTRAL = {"label": "neutral", "score": 0.0}
 
 # Initialize model globally to avoid reloading on every request
 model_name = "ProsusAI/finbert"
-tokenizer = None
-model = None
-nlp = None
+# Identifies the model's outputs in the sentiment cache
+MODEL_ID = f"{model_name}:{SENTIMENT_BACKEND}"
+# Function of a list of texts returning their results, from the selected backend
+classifier = None
 
-import threading
 model_lock = threading.Lock()
 
 def init_model():
-    global tokenizer, model, nlp
+    global classifier
     if not HAS_AI:
-        print("AI dependencies (torch/transformers) missing. Sentiment analysis disabled.")
+        print(f"AI dependencies for the {SENTIMENT_BACKEND!r} sentiment backend missing. Sentiment analysis disabled.")
         return
-    
+
     with model_lock:
-        if nlp is None:
-            print("Loading FinBERT model...")
-            tokenizer = BertTokenizer.from_pretrained(model_name)
-            model = BertForSequenceClassification.from_pretrained(model_name)
-            nlp = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+        if classifier is None:
+            print(f"Loading FinBERT model ({SENTIMENT_BACKEND})...")
+            classifier = load_classifier(SENTIMENT_BACKEND, model_name)
             print("FinBERT model loaded.")
 
+def classify_batch(texts, model_=None, tokenizer_=None):
+    """
+    Labels for a list of texts from one padded forward pass: [{'label': 'positive', 'score': 0.95}, ...].
+    Uses the selected backend, or the given transformers model and tokenizer.
+    """
+    if model_ is not None:
+        return TorchClassifier(model_, tokenizer_)(texts)
+    return classifier(texts)
+
+
+class SentimentBatcher:
+    def __init__(self, classify=None, max_batch=SENTIMENT_BATCH_SIZE, max_wait_ms=SENTIMENT_BATCH_WAIT_MS,
+                 cache=None, model_id=MODEL_ID):
+        """
+        classify: function of a list of texts returning one result per text (the FinBERT model by default).
+        cache: optional SentimentCache consulted before queueing and filled with every model result.
+        """
+        self.classify = classify
+        self.cache = cache
+        self.model_id = model_id
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10):
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, text):
+        """Queues one text; the Future resolves to its {'label', 'score'}."""
+        future = Future()
+        if self._thread is None:
+            self.start()
+        self.queue.put((text or "", future))
+        return future
+
+    def analyze(self, text, timeout=None):
+        return self.analyze_many([text], timeout)[0]
+
+    def analyze_many(self, texts, timeout=None):
+        """Cached results where there are any; the rest are all queued before waiting, so they share batches."""
+        texts = [text or "" for text in texts]
+        results = self.cache.get_many(self.model_id, texts) if self.cache is not None else {}
+        futures = {i: self.submit(text) for i, text in enumerate(texts) if i not in results}
+        for i, future in futures.items():
+            results[i] = future.result(timeout)
+        return [results[i] for i in range(len(texts))]
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            stop = False
+            # Collect more texts until the batch is full or the first one has waited long enough
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    entry = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        futures = [future for _, future in batch if future.set_running_or_notify_cancel()]
+        texts = [text for text, future in batch if future.running()]
+        if not texts:
+            return
+        try:
+            classify = self.classify
+            if classify is None:
+                if classifier is None:
+                    init_model()
+                classify = classify_batch
+            results = classify(texts)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error in sentiment analysis: {e}")
+            results = [NEUTRAL] * len(texts)
+        else:
+            if self.cache is not None:
+                self.cache.put_many(self.model_id, texts, results)
+        self.batches += 1
+        self.items += len(texts)
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "queued": self.queue.qsize(),
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# Shared batcher for the FinBERT model
+SENTIMENT = SentimentBatcher(cache=SENTIMENT_CACHE)
+
 def analyze_sentiment(text):
-    if nlp is None:
-        init_model()
-    
-    try:
-        results = nlp(text)
-        # results is a list of dicts, e.g., [{'label': 'positive', 'score': 0.95}]
-        if results:
-            return results[0]
-    except Exception as e:
-        print(f"Error in sentiment analysis: {e}")
-    
-    return {"label": "neutral", "score": 0.0}
+    if not HAS_AI:
+        return dict(NEUTRAL)
+    return SENTIMENT.analyze(text)
+
+def analyze_sentiment_many(texts):
+    """analyze_sentiment for a list of texts, batched together."""
+    if not HAS_AI:
+        return [dict(NEUTRAL) for _ in texts]
+    return SENTIMENT.analyze_many(texts)
 
 if __name__ == "__main__":
     init_model()
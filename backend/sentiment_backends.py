@@ -0,0 +1,303 @@
+"""
+Inference backends for the FinBERT sentiment model.
+
+SENTIMENT_BACKEND selects how the model is run:
+
+    torch       the fp32 transformers model (the original behaviour)
+    torch-int8  the same model with its Linear layers dynamically quantized to int8
+    onnx        the model exported to ONNX and run by ONNX Runtime (doesn't need torch at runtime)
+
+Each backend loads from SENTIMENT_MODEL_DIR/<backend> when the export CLI
+has written artifacts there, and otherwise from the Hugging Face model
+(torch-int8 then quantizes at load; onnx has no fallback and must be
+exported first):
+
+    python sentiment_backends.py export --backend all
+    python sentiment_backends.py check
+
+`check` runs every exported backend on the labelled headlines in
+sentiment_headlines.json and reports accuracy and agreement with fp32.
+It exits non-zero if a backend agrees with fp32 on fewer than
+SENTIMENT_PARITY_MIN_AGREEMENT of them.
+"""
+import argparse
+import json
+import os
+import sys
+
+try:
+    from transformers import AutoTokenizer, AutoConfig, BertForSequenceClassification
+    HAS_TRANSFORMERS = True
+except ImportError:
+    HAS_TRANSFORMERS = False
+
+try:
+    import torch
+    from safetensors.torch import load_file, save_file
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
+
+try:
+    import numpy as np
+    import onnxruntime
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+SENTIMENT_MODEL_DIR = os.getenv("SENTIMENT_MODEL_DIR", "./models/finbert")
+# Token limit per text (BERT's maximum)
+SENTIMENT_MAX_TOKENS = 512
+SENTIMENT_PARITY_MIN_AGREEMENT = float(os.getenv("SENTIMENT_PARITY_MIN_AGREEMENT", "0.95"))
+
+HEADLINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentiment_headlines.json")
+
+INT8_WEIGHTS = "model_int8.safetensors"
+ONNX_MODEL = "model.onnx"
+
+
+def available(backend):
+    """True if the packages `backend` needs at runtime are installed."""
+    if backend not in BACKENDS:
+        return False
+    if backend == "onnx":
+        return HAS_TRANSFORMERS and HAS_ONNXRUNTIME
+    return HAS_TRANSFORMERS and HAS_TORCH
+
+
+def artifact_dir(backend, root=SENTIMENT_MODEL_DIR):
+    return os.path.join(root, backend)
+
+
+def is_exported(backend, root=SENTIMENT_MODEL_DIR):
+    path = artifact_dir(backend, root)
+    marker = {"torch": "config.json", "torch-int8": INT8_WEIGHTS, "onnx": ONNX_MODEL}[backend]
+    return os.path.exists(os.path.join(path, marker))
+
+
+# --- classifiers ---
+
+def _results(probabilities, id2label):
+    """[{'label', 'score'}] from rows of class probabilities."""
+    return [{"label": id2label[int(row.argmax())], "score": float(row.max())} for row in probabilities]
+
+
+class TorchClassifier:
+    """fp32 or dynamically quantized transformers model."""
+
+    def __init__(self, model, tokenizer):
+        model.eval()
+        self.model = model
+        self.tokenizer = tokenizer
+        self.id2label = model.config.id2label
+
+    def __call__(self, texts):
+        encoded = self.tokenizer(list(texts), padding=True, truncation=True, max_length=SENTIMENT_MAX_TOKENS,
+                                 return_tensors="pt")
+        with torch.inference_mode():
+            probabilities = torch.softmax(self.model(**encoded).logits, dim=-1)
+        return _results(probabilities, self.id2label)
+
+
+class OnnxClassifier:
+    """Exported model on an ONNX Runtime CPU session."""
+
+    def __init__(self, path, tokenizer, id2label):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Without the arena, memory freed after a batch goes back to the system instead of staying reserved
+        options.enable_cpu_mem_arena = False
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.inputs = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = tokenizer
+        self.id2label = {int(k): v for k, v in id2label.items()}
+
+    def __call__(self, texts):
+        encoded = self.tokenizer(list(texts), padding=True, truncation=True, max_length=SENTIMENT_MAX_TOKENS,
+                                 return_tensors="np")
+        feed = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.inputs}
+        logits = self.session.run(None, feed)[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return _results(exp / exp.sum(axis=-1, keepdims=True), self.id2label)
+
+
+def _quantize(model):
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _quantized_linears(model):
+    return [(name, module) for name, module in model.named_modules()
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)]
+
+
+def save_int8(model, path):
+    """
+    Saves a dynamically quantized model as plain tensors: each quantized Linear's int8 weight with
+    its scale and zero point, and every other parameter as is. Loading it needs no pickle.
+    """
+    tensors = {}
+    for name, module in _quantized_linears(model):
+        weight, bias = module._weight_bias()
+        tensors[f"{name}.weight"] = weight.int_repr()
+        tensors[f"{name}.weight_scale"] = torch.tensor(weight.q_scale(), dtype=torch.float64)
+        tensors[f"{name}.weight_zero_point"] = torch.tensor(weight.q_zero_point())
+        if bias is not None:
+            tensors[f"{name}.bias"] = bias.detach()
+    for name, tensor in list(model.named_parameters()) + list(model.named_buffers()):
+        tensors[name] = tensor.detach()
+    save_file({name: tensor.contiguous() for name, tensor in tensors.items()}, path)
+
+
+def load_int8(config, path):
+    """
+    Builds the quantized model from its config and the tensors written by save_int8. The model is
+    laid out on the meta device with its Linears swapped for quantized ones, so no fp32 weights are
+    ever allocated or initialised.
+    """
+    tensors = load_file(path)
+    with torch.device("meta"):
+        model = BertForSequenceClassification(config)
+    model.eval()
+    for name, linear in [(n, m) for n, m in model.named_modules() if isinstance(m, torch.nn.Linear)]:
+        module = torch.ao.nn.quantized.dynamic.Linear(linear.in_features, linear.out_features,
+                                                      bias_=linear.bias is not None, dtype=torch.qint8)
+        weight = torch._make_per_tensor_quantized_tensor(
+            tensors.pop(f"{name}.weight"),
+            float(tensors.pop(f"{name}.weight_scale")),
+            int(tensors.pop(f"{name}.weight_zero_point")),
+        )
+        module.set_weight_bias(weight, tensors.pop(f"{name}.bias", None))
+        model.set_submodule(name, module)
+    model.to_empty(device="cpu")
+    # Everything else (embeddings, layer norms, buffers) is copied into the allocated tensors
+    own = {**dict(model.named_parameters()), **dict(model.named_buffers())}
+    unexpected = [name for name in tensors if name not in own]
+    if unexpected:
+        raise ValueError(f"Unexpected tensors in {path}: {', '.join(unexpected[:5])}")
+    with torch.no_grad():
+        for name, tensor in tensors.items():
+            own[name].copy_(tensor)
+    return model
+
+
+def load_classifier(backend, model_name, root=SENTIMENT_MODEL_DIR):
+    """A function of a list of texts returning [{'label', 'score'}], for `backend`."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    path = artifact_dir(backend, root)
+    exported = is_exported(backend, root)
+
+    if backend == "onnx":
+        if not exported:
+            raise FileNotFoundError(f"No ONNX model in {path}; run `python sentiment_backends.py export --backend onnx`")
+        config = AutoConfig.from_pretrained(path)
+        return OnnxClassifier(os.path.join(path, ONNX_MODEL), AutoTokenizer.from_pretrained(path), config.id2label)
+
+    if backend == "torch":
+        source = path if exported else model_name
+        return TorchClassifier(BertForSequenceClassification.from_pretrained(source),
+                               AutoTokenizer.from_pretrained(source))
+
+    # torch-int8: build the quantized skeleton from the config and load the saved int8 weights,
+    # so the fp32 weights are never loaded
+    if exported:
+        model = load_int8(AutoConfig.from_pretrained(path), os.path.join(path, INT8_WEIGHTS))
+        return TorchClassifier(model, AutoTokenizer.from_pretrained(path))
+    print(f"No exported int8 model in {path}; quantizing {model_name} at load.")
+    model = BertForSequenceClassification.from_pretrained(model_name).eval()
+    return TorchClassifier(_quantize(model), AutoTokenizer.from_pretrained(model_name))
+
+
+# --- export ---
+
+def export(backend, model_name, root=SENTIMENT_MODEL_DIR):
+    """Writes `backend`'s artifacts (weights or graph, config, tokenizer) to artifact_dir(backend). Returns the directory."""
+    path = artifact_dir(backend, root)
+    os.makedirs(path, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = BertForSequenceClassification.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(path)
+
+    if backend == "torch":
+        model.save_pretrained(path)
+    elif backend == "torch-int8":
+        model.config.save_pretrained(path)
+        save_int8(_quantize(model), os.path.join(path, INT8_WEIGHTS))
+    elif backend == "onnx":
+        model.config.save_pretrained(path)
+        sample = tokenizer(["Sensex ends higher", "Rupee falls against the dollar"], padding=True, return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            os.path.join(path, ONNX_MODEL),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names}, "logits": {0: "batch"}},
+            opset_version=17,
+            dynamo=False,
+        )
+    else:
+        raise ValueError(f"Unknown sentiment backend {backend!r}")
+    print(f"Exported {model_name} ({backend}) to {path}")
+    return path
+
+
+# --- parity ---
+
+def load_headlines(path=HEADLINES_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def parity(classifiers, headlines, reference="torch"):
+    """
+    Accuracy of each classifier on the labelled headlines, and agreement with `reference`
+    (same label, and the largest difference in the winning probability).
+    """
+    texts = [h["text"] for h in headlines]
+    predictions = {backend: classify(texts) for backend, classify in classifiers.items()}
+    baseline = predictions.get(reference)
+    report = {}
+    for backend, results in predictions.items():
+        row = {"accuracy": sum(r["label"] == h["label"] for r, h in zip(results, headlines)) / len(headlines)}
+        if baseline is not None:
+            row["agreement"] = sum(r["label"] == b["label"] for r, b in zip(results, baseline)) / len(headlines)
+            row["max_score_diff"] = max(abs(r["score"] - b["score"]) for r, b in zip(results, baseline))
+        report[backend] = row
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export FinBERT for each sentiment backend and check their parity.")
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--backend", default="all", choices=BACKENDS + ("all",))
+    parser.add_argument("--model", default="ProsusAI/finbert", help="Hugging Face model ID or local directory")
+    parser.add_argument("--dir", default=SENTIMENT_MODEL_DIR, help="artifact directory")
+    args = parser.parse_args()
+    backends = BACKENDS if args.backend == "all" else (args.backend,)
+
+    if args.command == "export":
+        for backend in backends:
+            export(backend, args.model, args.dir)
+        return 0
+
+    # fp32 is the reference, so it is always loaded
+    classifiers = {backend: load_classifier(backend, args.model, args.dir)
+                   for backend in dict.fromkeys(("torch",) + backends)
+                   if backend != "onnx" or is_exported("onnx", args.dir)}
+    headlines = load_headlines()
+    report = parity(classifiers, headlines)
+    print(f"{len(headlines)} labelled headlines, reference torch (fp32)")
+    print(f"{'backend':<12} {'accuracy':>9} {'agreement':>10} {'max score diff':>15}")
+    ok = True
+    for backend, row in report.items():
+        print(f"{backend:<12} {row['accuracy']:>9.3f} {row['agreement']:>10.3f} {row['max_score_diff']:>15.4f}")
+        ok = ok and row["agreement"] >= SENTIMENT_PARITY_MIN_AGREEMENT
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Persistent sentiment cache.
+
+Results are stored in the sentiment_cache table, keyed by a hash of the
+model ID and the normalized text (whitespace collapsed, lowercased as
+FinBERT's uncased tokenizer does anyway). The same headline or summary
+input is therefore classified once, even across restarts. A small in-memory
+LRU sits in front of the table for hot texts.
+
+The table is bounded to SENTIMENT_CACHE_MAX_ENTRIES rows: each entry
+records when it was last used, and the least recently used ones are
+deleted once the bound is passed. Writes (new results, last-used
+touches, evictions) go through the single-writer queue in one operation
+per batch.
+"""
+import collections
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy.dialects.sqlite import insert
+
+from database import IN_BATCH_SIZE, ReadSessionLocal, SentimentCacheEntry, chunks
+from db_writer import DB_WRITER
+
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "100000"))
+# Entries kept in memory in front of the table
+SENTIMENT_CACHE_MEMORY_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MEMORY_ENTRIES", "4096"))
+
+# Last-used touches held back before they are written without a new result to go with them
+TOUCH_FLUSH_SIZE = 1000
+
+
+def normalize_text(text):
+    return " ".join((text or "").split()).lower()
+
+
+def cache_key(model_id, text):
+    return hashlib.sha1(f"{model_id}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    def __init__(self, db_session_factory=ReadSessionLocal, writer=DB_WRITER,
+                 max_entries=SENTIMENT_CACHE_MAX_ENTRIES, memory_entries=SENTIMENT_CACHE_MEMORY_ENTRIES):
+        self.db_session_factory = db_session_factory
+        self.writer = writer
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory = collections.OrderedDict()   # key -> result, most recently used last
+        self.touched = set()                     # keys read since the last write, for last_used
+        self.size = None                         # rows in the table, counted on first write
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(self, model_id, texts):
+        """Cached results for `texts` as {index: result}; missing indexes need the model."""
+        keys = [cache_key(model_id, text) for text in texts]
+        found = {}
+        with self.lock:
+            for key in set(keys):
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key]
+        missing = {key for key in keys if key not in found}
+        if missing:
+            db = self.db_session_factory()
+            try:
+                for chunk in chunks(missing, IN_BATCH_SIZE):
+                    rows = (db.query(SentimentCacheEntry.key, SentimentCacheEntry.label, SentimentCacheEntry.score)
+                            .filter(SentimentCacheEntry.key.in_(chunk)).all())
+                    for key, label, score in rows:
+                        found[key] = {"label": label, "score": score}
+            except Exception as e:
+                # e.g. the table doesn't exist yet; treat everything as a miss
+                print(f"Error reading sentiment cache: {e}")
+            finally:
+                db.close()
+
+        results = {i: dict(found[key]) for i, key in enumerate(keys) if key in found}
+        with self.lock:
+            for key in found:
+                self._remember(key, found[key])
+                self.touched.add(key)
+            self.hits += len(results)
+            self.misses += len(keys) - len(results)
+            flush = len(self.touched) >= TOUCH_FLUSH_SIZE
+        if flush:
+            # All hits for a while (e.g. re-ingesting after a restart): record the touches on their own
+            self.put_many(model_id, [], [])
+        return results
+
+    def put_many(self, model_id, texts, results):
+        """Stores new results, records last-used times for entries read since the last write, and evicts past the bound."""
+        entries = {cache_key(model_id, text): result for text, result in zip(texts, results)}
+        now = time.time()
+        with self.lock:
+            for key, result in entries.items():
+                self._remember(key, {"label": result["label"], "score": result["score"]})
+            touched, self.touched = self.touched - set(entries), set()
+
+        def write(db):
+            inserted = 0
+            rows = [{"key": key, "label": r["label"], "score": r["score"], "last_used": now} for key, r in entries.items()]
+            for chunk in chunks(rows, IN_BATCH_SIZE // 2):
+                stmt = insert(SentimentCacheEntry).values(chunk)
+                result = db.execute(stmt.on_conflict_do_update(
+                    index_elements=[SentimentCacheEntry.key],
+                    set_={"label": stmt.excluded.label, "score": stmt.excluded.score, "last_used": now},
+                ))
+                inserted += result.rowcount or 0
+            for chunk in chunks(touched, IN_BATCH_SIZE):
+                db.query(SentimentCacheEntry).filter(SentimentCacheEntry.key.in_(chunk)).update(
+                    {SentimentCacheEntry.last_used: now}, synchronize_session=False)
+
+            if self.size is None:
+                self.size = db.query(SentimentCacheEntry).count()
+            else:
+                # Upserts count updated rows too, so this can run high; the recount below corrects it
+                self.size += inserted
+            evicted = 0
+            if self.size > self.max_entries:
+                self.size = db.query(SentimentCacheEntry).count()
+                excess = self.size - self.max_entries
+                if excess > 0:
+                    oldest = (db.query(SentimentCacheEntry.key).order_by(SentimentCacheEntry.last_used)
+                              .limit(excess).scalar_subquery())
+                    evicted = (db.query(SentimentCacheEntry).filter(SentimentCacheEntry.key.in_(oldest))
+                               .delete(synchronize_session=False))
+                    self.size -= evicted
+            return evicted
+
+        if not entries and not touched:
+            return
+        try:
+            evicted = self.writer.run(write)
+        except Exception as e:
+            print(f"Error writing sentiment cache: {e}")
+            return
+        if evicted:
+            with self.lock:
+                self.evictions += evicted
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "entries": self.size,
+            "memory_entries": len(self.memory),
+        }
+
+
+SENTIMENT_CACHE = SentimentCache()
@@ -0,0 +1,163 @@
+"""
+Ingest-time stock entity tagging.
+
+Compiles one Aho-Corasick automaton from the names, aliases and symbols in
+stocks.json and tags each scraped article with the symbols its headline
+mentions. /news?stocks= then only has to look those symbols up.
+"""
+import json
+import os
+import threading
+from collections import deque
+
+from article import Article
+
+STOCKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stocks.json")
+
+
+def load_stock_list(path=STOCKS_FILE):
+    """Reads stocks.json (list or {"companies": {...}} format) into a list of stock dicts."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "companies" in data:
+        data = list(data["companies"].values())
+    elif not isinstance(data, list):
+        return []
+    return [s for s in data if isinstance(s, dict) and "name" in s and "symbol" in s]
+
+
+def stock_keywords(stock):
+    """Keywords that identify a stock, using the same rules as the old /news watchlist regex."""
+    keywords = set()
+    symbol = stock.get("symbol", "").lower().strip()
+    if symbol:
+        keywords.add(symbol)
+
+    name = (stock.get("name") or "").lower()
+    # Filter out very short names if any (unlikely for full names)
+    if len(name) >= 3:
+        keywords.add(name)
+
+    for alias in stock.get("aliases") or []:
+        alias_clean = alias.lower().strip()
+        # Rule: Must be >= 3 chars OR contain a digit (e.g. "3m", "20m")
+        if len(alias_clean) >= 3 or any(c.isdigit() for c in alias_clean):
+            keywords.add(alias_clean)
+    return keywords
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class StockTagger:
+    """Aho-Corasick automaton over stock keywords, matched case-insensitively on word boundaries."""
+
+    def __init__(self, stocks):
+        self.keywords = []            # keyword id -> keyword text
+        self.keyword_symbols = []     # keyword id -> tuple of symbols it identifies
+        self.goto = [{}]              # state -> {char: next state}
+        self.fail = [0]
+        self.output = [[]]            # state -> keyword ids ending here
+
+        symbols_by_keyword = {}
+        for stock in stocks:
+            for keyword in stock_keywords(stock):
+                symbols_by_keyword.setdefault(keyword, set()).add(stock["symbol"])
+
+        for keyword, symbols in symbols_by_keyword.items():
+            self._add(keyword, tuple(sorted(symbols)))
+        self._build_failure_links()
+
+        self.symbols = {s.lower(): s for symbols in self.keyword_symbols for s in symbols}
+
+    def _add(self, keyword, symbols):
+        state = 0
+        for ch in keyword:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(len(self.keywords))
+        self.keywords.append(keyword)
+        self.keyword_symbols.append(symbols)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def tag(self, text):
+        """Returns the sorted symbols whose keywords appear in `text` as whole words."""
+        if not text:
+            return []
+        text = str(text).lower()
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            for kid in output[state]:
+                symbols = self.keyword_symbols[kid]
+                if found.issuperset(symbols):
+                    continue
+                start = i - len(self.keywords[kid]) + 1
+                # Same semantics as regex \b on both ends of the keyword
+                before = _is_word_char(text[start - 1]) if start > 0 else False
+                after = _is_word_char(text[i + 1]) if i + 1 < n else False
+                if before != _is_word_char(text[start]) and after != _is_word_char(ch):
+                    found.update(symbols)
+        return sorted(found)
+
+    def tag_article(self, item):
+        """Tags an article (Article or dict) in place from its headline and returns the symbols."""
+        symbols = self.tag(item.get("headline"))
+        if isinstance(item, Article):
+            item.stock_symbols = tuple(symbols)
+        else:
+            item["stock_symbols"] = symbols
+        return symbols
+
+
+_tagger = None
+_tagger_lock = threading.Lock()
+
+
+def get_tagger():
+    """Shared tagger, compiled once from stocks.json on first use."""
+    global _tagger
+    if _tagger is None:
+        with _tagger_lock:
+            if _tagger is None:
+                stocks = load_stock_list()
+                _tagger = StockTagger(stocks)
+                print(f"Stock tagger compiled: {len(_tagger.keywords)} keywords for {len(stocks)} stocks.")
+    return _tagger
+
+
+def tag_articles(news_items, only_missing=False):
+    """Tags a batch of articles; with only_missing, skips ones that already carry tags."""
+    tagger = get_tagger()
+    for item in news_items:
+        if only_missing and "stock_symbols" in item:
+            continue
+        tagger.tag_article(item)
+    return news_items
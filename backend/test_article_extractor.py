@@ -0,0 +1,105 @@
+"""
+Fixture tests for article_extractor, built from moneycontrol_sample.html.
+
+The sample is the first 10 KB of a real article page, so it ends inside the
+JSON-LD articleBody. The tests use it as-is (meta tags only) and completed
+(JSON-LD closed, plus a content container), and check the lxml and
+BeautifulSoup paths agree.
+
+    python -m pytest test_article_extractor.py
+    python test_article_extractor.py
+"""
+import os
+
+from article_extractor import extract_article, lxml_html, NO_CONTENT
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "moneycontrol_sample.html")
+
+SAMPLE_IMAGE = "https://images.moneycontrol.com/static-mcnews/2026/01/20260127071557_Q3-Results-impacy-JSW-Energy.jpg"
+SAMPLE_PUBLISHED = "2026-01-27T12:47:36+05:30"
+
+PARSERS = [False, True] if lxml_html is not None else [False]
+
+CONTENT_TAIL = """
+<div class="content_wrapper arti-flow">
+  <p>Short caption</p>
+  <p>JSW Energy shares dropped to Rs 432.8 apiece after the company reported its quarterly numbers.</p>
+  <script>var ad = "should never appear in the body text";</script>
+  <p>Read more: the full list of Q3 results announced this week is on our results page.</p>
+  <p>Godrej Consumer Products shares fell too, as volume growth missed brokerage estimates.</p>
+  <p>Disclaimer: views are the experts' own.</p>
+  <p>This paragraph comes after the disclaimer and must not be included in the body.</p>
+</div>
+</body></html>"""
+
+
+def load_sample():
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def completed_sample():
+    """The sample with its truncated JSON-LD string, object list and script closed."""
+    return load_sample() + ' and more."\n}]\n</script></head><body>' + CONTENT_TAIL
+
+
+def without_ld_body(html):
+    """The sample with the JSON-LD articleBody removed, so the content container is used."""
+    return html.replace('"articleBody":', '"articleBodyRemoved":')
+
+
+def test_sample_metadata():
+    for use_lxml in PARSERS:
+        result = extract_article(load_sample(), use_lxml=use_lxml)
+        assert result["image_url"] == SAMPLE_IMAGE
+        # The JSON-LD is truncated, so the time comes from the og:article:published_time meta tag
+        assert result["timestamp"] == SAMPLE_PUBLISHED
+        assert result["full_content"] == NO_CONTENT
+
+
+def test_completed_sample_body_from_json_ld():
+    for use_lxml in PARSERS:
+        result = extract_article(completed_sample(), use_lxml=use_lxml)
+        assert result["image_url"] == SAMPLE_IMAGE
+        assert result["timestamp"] == SAMPLE_PUBLISHED
+        body = result["full_content"]
+        # Raw newlines inside the JSON string are accepted, and HTML entities decoded
+        assert body.startswith("The shares of JSW Energy and Godrej Consumer Products dropped around 10 percent")
+        assert "analysts’ expectations" in body
+        assert "India Cements shares meanwhile jumped nearly 5 percent on Tuesday." in body
+
+
+def test_content_container_fallback():
+    for use_lxml in PARSERS:
+        result = extract_article(without_ld_body(completed_sample()), use_lxml=use_lxml)
+        assert result["full_content"] == (
+            "JSW Energy shares dropped to Rs 432.8 apiece after the company reported its quarterly numbers."
+            "\n\n"
+            "Godrej Consumer Products shares fell too, as volume growth missed brokerage estimates."
+        )
+
+
+def test_known_values_are_kept():
+    for use_lxml in PARSERS:
+        # A timestamp from the listing page wins over the page's own; og:image still replaces the image
+        result = extract_article(load_sample(), image_url="listing.jpg", timestamp="27 Jan 2026, 12:00 PM",
+                                 use_lxml=use_lxml)
+        assert result["timestamp"] == "27 Jan 2026, 12:00 PM"
+        assert result["image_url"] == SAMPLE_IMAGE
+
+
+def test_parsers_agree():
+    pages = [load_sample(), completed_sample(), without_ld_body(completed_sample())]
+    for html in pages:
+        assert extract_article(html, use_lxml=True) == extract_article(html, use_lxml=False)
+
+
+def test_empty_page():
+    assert extract_article("", image_url="a.jpg") == {"image_url": "a.jpg", "timestamp": None, "full_content": None}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
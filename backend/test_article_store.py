@@ -0,0 +1,89 @@
+"""
+Tests for article_store's hot tier against writes: a rewritten body is not
+served stale, whether the read came before the write's commit or overlapped
+it, and a write that is rolled back leaves the hot tier alone.
+
+    python -m pytest test_article_store.py
+    python test_article_store.py
+"""
+import os
+import shutil
+import tempfile
+
+from sqlalchemy.orm import sessionmaker
+
+from article_store import ArticleStore
+from database import Base, create_write_engine
+from db_writer import DBWriter
+
+LINK = "https://www.moneycontrol.com/news/business/markets/a-1.html"
+
+
+def make_store():
+    tmp = tempfile.mkdtemp()
+    engine = create_write_engine(os.path.join(tmp, "articles.db"))
+    Base.metadata.create_all(bind=engine)
+    writer = DBWriter(sessionmaker(bind=engine))
+    return ArticleStore(sessionmaker(bind=engine), writer=writer), writer, tmp
+
+
+def test_rewritten_body_is_not_served_from_the_hot_tier():
+    store, writer, tmp = make_store()
+    try:
+        store.put_many({LINK: "old body"})
+        assert store.body(LINK) == "old body" and LINK in store.hot
+        store.put_many({LINK: "new body"})
+        assert store.body(LINK) == "new body"
+    finally:
+        writer.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_read_overlapping_a_write_does_not_admit_the_old_body():
+    store, writer, tmp = make_store()
+    try:
+        store.put_many({LINK: "old body"})
+        load = store._load
+
+        def load_then_write(links):
+            # The read has the old row; the rewrite commits before the read gets to admit it
+            loaded = load(links)
+            store.put_many({LINK: "new body"})
+            return loaded
+
+        store._load = load_then_write
+        assert store.body(LINK) == "old body"
+        store._load = load
+        assert LINK not in store.hot
+        assert store.body(LINK) == "new body"
+    finally:
+        writer.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_rolled_back_write_keeps_the_hot_entry():
+    store, writer, tmp = make_store()
+    try:
+        store.put_many({LINK: "body"})
+        assert store.body(LINK) == "body"
+
+        def failing(db):
+            store.write(db, {LINK: "never committed"})
+            raise RuntimeError("operation failed")
+
+        try:
+            writer.run(failing)
+        except RuntimeError:
+            pass
+        assert LINK in store.hot
+        assert store.body(LINK) == "body"
+    finally:
+        writer.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,131 @@
+"""
+Tests for ingest_pipeline: pages go through fetch, parse (in this process
+and in a forkserver pool) and sentiment in item order, and a stage that
+raises fails the run with PipelineError instead of leaving it waiting.
+
+    python -m pytest test_ingest_pipeline.py
+    python test_ingest_pipeline.py
+"""
+import os
+import threading
+from concurrent.futures import Future
+
+from ingest_pipeline import IngestPipeline, PipelineError, parse_page
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "moneycontrol_sample.html")
+
+
+class FakeEngine:
+    """Stands in for FetchEngine: every fetch is already done, with `page(link)` or as cancelled."""
+
+    def __init__(self, page=lambda link: f"<html><body><p>{link}</p></body></html>", cancelled=()):
+        self.page = page
+        self.cancelled = set(cancelled)
+        self.deadline = 5
+        self.timeouts = 0
+
+    def fetch(self, link):
+        return link
+
+    def submit(self, link):
+        future = Future()
+        if link in self.cancelled:
+            future.cancel()
+            future.set_running_or_notify_cancel()
+        else:
+            future.set_result(self.page(link))
+        return future
+
+
+def items(n):
+    return [{"link": f"https://www.moneycontrol.com/news/{i}.html", "headline": f"headline {i}"} for i in range(n)]
+
+
+def parse_link(html, image_url, timestamp):
+    return {"html": html}, None
+
+
+def classify(headlines):
+    return [{"label": headline} for headline in headlines]
+
+
+def run_with_timeout(pipeline, news, seconds=30):
+    """pipeline.run(news) in a thread: a run that hangs fails the test instead of the suite."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["results"] = pipeline.run(news)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "pipeline run did not finish"
+    return outcome
+
+
+def test_results_in_item_order():
+    news = items(70)
+    pipeline = IngestPipeline(FakeEngine(), classify, parse=parse_link, parse_workers=0, queue_size=4, infer_batch=8)
+    results = run_with_timeout(pipeline, news)["results"]
+    assert [sentiment["label"] for _, sentiment in results] == [item["headline"] for item in news]
+    assert all(item["link"] in fields["html"] for item, (fields, _) in zip(news, results))
+    assert pipeline.last_run["stages"]["parse"]["items"] == 70
+
+
+def test_parse_pool_start_method():
+    with open(SAMPLE_FILE, "r", encoding="utf-8") as f:
+        html = f.read()
+    pipeline = IngestPipeline(FakeEngine(page=lambda link: html), classify, parse_workers=1)
+    try:
+        assert pipeline.start_method != "fork"
+        results = run_with_timeout(pipeline, items(3), seconds=120)["results"]
+    finally:
+        pipeline.shutdown()
+    assert [fields for fields, _ in results] == [parse_page(html, None, None)[0]] * 3
+    assert results[0][0]["full_content"]
+
+
+def test_stage_that_raises_fails_the_run():
+    def broken_parse(html, image_url, timestamp):
+        raise RuntimeError("parser bug")
+
+    pipeline = IngestPipeline(FakeEngine(), classify, parse=broken_parse, parse_workers=0, queue_size=2)
+    error = run_with_timeout(pipeline, items(50))["error"]
+    assert isinstance(error, PipelineError) and "parser bug" in str(error)
+
+    # A fetch the engine cancelled under the fetch stage
+    news = items(10)
+    pipeline = IngestPipeline(FakeEngine(cancelled=[news[3]["link"]]), classify, parse=parse_link, parse_workers=0)
+    assert isinstance(run_with_timeout(pipeline, news)["error"], PipelineError)
+
+    # The pipeline still runs afterwards
+    assert len(run_with_timeout(pipeline, items(3))["results"]) == 3
+
+
+def test_pool_shut_down_under_a_run_fails_it():
+    pipeline = IngestPipeline(FakeEngine(), classify, parse=parse_link, parse_workers=1)
+    pipeline._get_pool().shutdown()
+    try:
+        error = run_with_timeout(pipeline, items(5))["error"]
+    finally:
+        pipeline.shutdown()
+    assert isinstance(error, PipelineError)
+
+
+def test_sentiment_stage_that_raises_stops_the_others():
+    def broken_classify(headlines):
+        raise KeyboardInterrupt
+
+    pipeline = IngestPipeline(FakeEngine(), broken_classify, parse=parse_link, parse_workers=0,
+                              queue_size=2, infer_batch=1)
+    assert isinstance(run_with_timeout(pipeline, items(200))["error"], KeyboardInterrupt)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,97 @@
+"""
+Tests for near_duplicates on real Moneycontrol headlines from moneycontrol_news.json:
+templated headlines about different companies, figures or days stay apart,
+relisted stories cluster, and a member whose body disagrees leaves its cluster.
+
+    python -m pytest test_near_duplicates.py
+    python test_near_duplicates.py
+"""
+import json
+import os
+
+from article import parse_timestamp
+from near_duplicates import NearDuplicateIndex
+
+ARCHIVE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "moneycontrol_news.json")
+
+# (headline, timestamp) groups the index used to put in one cluster: different companies, figures or days
+DIFFERENT_STORIES = [
+    [("Neutral IndusInd Bank; target of Rs 930: Motilal Oswal", "29 Jan 2026, 02:43 PM"),
+     ("Neutral Axis Bank; target of Rs 1400: Motilal Oswal", "29 Jan 2026, 02:43 PM")],
+    [("NDTV Consolidated December 2025 Net Sales at Rs 150.41 crore, up 13.31% Y-o-Y", "29 Jan 2026, 02:22 PM"),
+     ("Cochin Shipyard Consolidated December 2025 Net Sales at Rs 1,350.41 crore, up 17.67% Y-o-Y", "29 Jan 2026, 02:22 PM"),
+     ("Prerna Infra Consolidated December 2025 Net Sales at Rs 2.99 crore, up 117.71% Y-o-Y", "28 Jan 2026, 01:55 PM")],
+    [("Tata Elxsi share price falls 2.05%; stock among top losers on Nifty Midcap 150", "29 Jan 2026, 01:05 PM"),
+     ("Patanjali Foods share price falls 2.05%; stock among top losers on Nifty Midcap 150 today", "28 Jan 2026, 02:43 PM"),
+     ("Tata Technologies share price falls 2.02%; stock among top losers on Nifty Midcap 150", "27 Jan 2026, 03:01 PM")],
+    [("Sun Pharmaceutical Industries shares decline 0.81% amid volume surge", "29 Jan 2026, 01:06 PM"),
+     ("Sun Pharmaceutical Industries shares decline 2.03% amid volume surge", "28 Jan 2026, 02:41 PM")],
+    [("Kaya Consolidated December 2025 Net Sales at Rs 60.04 crore, up 3.3% Y-o-Y", "29 Jan 2026, 02:22 PM"),
+     ("Kaya Standalone December 2025 Net Sales at Rs 60.04 crore, up 2.89% Y-o-Y", "29 Jan 2026, 01:11 PM")],
+    [("Buy Kotak Mahindra Bank; target of Rs 500: Motilal Oswal", "27 Jan 2026, 03:17 PM"),
+     ("Buy Kotak Mahindra Bank; target of Rs 500: Prabhudas Lilladher", "27 Jan 2026, 02:17 PM")],
+    # A daily column: the same headline on another day
+    [("First Tick: Top global cues to watch in today’s trade", "28 Jan 2026, 07:16 AM"),
+     ("First Tick: Top global cues to watch in today’s trade", "27 Jan 2026, 02:16 PM")],
+]
+
+# The same story listed under two links
+SAME_STORY = [("IRCTC share price hits 52-week low at Rs 602.10, falls 2.54%", "27 Jan 2026, 03:17 PM"),
+              ("IRCTC share price hits 52-week low at Rs 602.10, falls 2.54%", "27 Jan 2026, 03:12 PM")]
+
+
+def index_of(headlines):
+    index = NearDuplicateIndex()
+    links = []
+    for n, (headline, timestamp) in enumerate(headlines):
+        links.append(f"https://www.moneycontrol.com/news/{n}.html")
+        index.add(links[-1], headline, published=parse_timestamp(timestamp))
+    return index, links
+
+
+def test_templated_headlines_stay_apart():
+    for group in DIFFERENT_STORIES:
+        index, links = index_of(group)
+        assert len(set(index.clusters(links))) == len(links), group
+        assert all(index.representative(link) == link for link in links)
+
+
+def test_relisted_story_clusters():
+    index, links = index_of(SAME_STORY)
+    assert index.cluster(links[0]) == index.cluster(links[1])
+    assert index.representative(links[1]) == links[0]
+
+
+def test_bodies_confirm_or_split_a_cluster():
+    body = "IRCTC shares fell to a 52-week low of Rs 602.10 on the NSE as the stock extended its losses " * 3
+    index, links = index_of(SAME_STORY)
+    index.add_body(links[0], body)
+    index.add_body(links[1], body)
+    assert index.cluster(links[1]) == index.cluster(links[0])
+
+    other = "Railway stocks were mixed in afternoon trade while the broader market recovered its early losses " * 3
+    index, links = index_of(SAME_STORY)
+    index.add_body(links[0], body)
+    index.add_body(links[1], other)
+    assert index.cluster(links[1]) != index.cluster(links[0])
+    assert index.representative(links[1]) == links[1]
+
+
+def test_archive_clusters_only_repeat_headlines():
+    with open(ARCHIVE_FILE, "r", encoding="utf-8") as f:
+        news = json.load(f)
+    index = NearDuplicateIndex()
+    for item in news:
+        index.add(item["link"], item["headline"], published=parse_timestamp(item.get("timestamp")))
+    headlines = {item["link"]: item["headline"] for item in news}
+    clusters = [members for members in index.members.values() if len(members) > 1]
+    assert clusters
+    for members in clusters:
+        assert len({headlines[link] for link in members}) == 1, [headlines[link] for link in members]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
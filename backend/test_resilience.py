@@ -0,0 +1,200 @@
+"""
+Tests for resilience: backoff, token bucket and circuit breaker on a fake
+clock, then retries and fail-fast against the local stand-in server with
+injected faults (503s, dropped connections), blocking and through FetchEngine.
+
+    python -m pytest test_resilience.py
+    python test_resilience.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from fetch_engine import FetchEngine
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, Resilience, TokenBucket
+from standin import StandinServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def standin():
+    server = StandinServer(["Economy"], articles_per_category=2, listing_latency=0, article_latency=0,
+                           page_padding=0, validators=False)
+    server.start()
+    return server, server.category_urls()["Economy"]
+
+
+def fast_policy(**kwargs):
+    return Resilience(**{"attempts": 3, "base_delay": 0.01, "max_delay": 0.05, "rate": 0, **kwargs})
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = Resilience(base_delay=0.5, max_delay=4, rng=random.Random(0))
+    for attempt in range(1, 7):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        cap = min(4, 0.5 * 2 ** (attempt - 1))
+        assert all(0 <= delay <= cap for delay in delays)
+        # Jittered, not a fixed schedule
+        assert len(set(delays)) > 100
+    assert policy.backoff(1, retry_after=2) == 2
+    assert policy.backoff(1, retry_after=60) == 4
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.1, 0.2]
+    clock.now = 10
+    # Refills to the burst size, not beyond
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.1]
+    assert TokenBucket(rate=0, burst=1).reserve() == 0
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("host", failures=3, cooldown=30, clock=clock)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 31
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    # One probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opens == 2
+
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0 and breaker.allow()
+
+
+def test_retries_recover_from_transient_faults():
+    server, url = standin()
+    try:
+        policy = fast_policy()
+        server.inject_faults(1, status=503)
+        server.inject_faults(1, status=None)
+        response = policy.get(url)
+        assert response.status_code == 200
+        assert server.requests == 3
+        stats = policy.stats()[policy.policy(url).host]
+        assert (stats["calls"], stats["attempts"], stats["retries"], stats["successes"]) == (1, 3, 2, 1)
+        assert stats["state"] == CLOSED
+    finally:
+        server.stop()
+
+
+def test_gives_up_after_the_last_attempt():
+    server, url = standin()
+    try:
+        policy = fast_policy()
+        server.inject_faults(3, status=503)
+        assert policy.get(url).status_code == 503
+        server.inject_faults(3, status=None)
+        raised = None
+        try:
+            policy.get(url)
+        except Exception as e:
+            raised = e
+        # The connection error of the last attempt
+        assert raised is not None and not isinstance(raised, CircuitOpenError)
+        assert server.requests == 6
+        assert policy.stats()[policy.policy(url).host]["failures"] == 2
+    finally:
+        server.stop()
+
+
+def test_client_errors_are_not_retried():
+    server, url = standin()
+    try:
+        policy = fast_policy(failures=1)
+        assert policy.get(url + "missing.html").status_code == 404
+        assert server.requests == 1
+        # An answer, not a failure: the breaker stays closed
+        assert policy.policy(url).breaker.state == CLOSED
+    finally:
+        server.stop()
+
+
+def test_open_breaker_fails_fast_without_requests():
+    server, url = standin()
+    try:
+        policy = fast_policy(attempts=1, failures=2, cooldown=0.3)
+        server.inject_faults(2, status=500)
+        policy.get(url)
+        policy.get(url)
+        assert policy.policy(url).breaker.state == OPEN
+
+        started = time.monotonic()
+        for _ in range(20):
+            try:
+                policy.get(url)
+                assert False, "the breaker should be open"
+            except CircuitOpenError:
+                pass
+        assert time.monotonic() - started < 0.2
+        assert server.requests == 2
+        assert policy.stats()[policy.policy(url).host]["rejected"] == 20
+
+        # After the cooldown one probe goes through; the host has recovered
+        time.sleep(0.35)
+        assert policy.get(url).status_code == 200
+        assert policy.policy(url).breaker.state == CLOSED
+    finally:
+        server.stop()
+
+
+def test_rate_limit_spaces_requests():
+    server, url = standin()
+    try:
+        policy = fast_policy(rate=20, burst=1)
+        started = time.monotonic()
+        for _ in range(5):
+            policy.get(url)
+        # The first token is there; the other four accrue at 20/s
+        assert time.monotonic() - started >= 0.19
+        assert policy.stats()[policy.policy(url).host]["throttled_seconds"] > 0
+    finally:
+        server.stop()
+
+
+def test_fetch_engine_retries_and_fails_fast():
+    server, url = standin()
+    policy = fast_policy(failures=1, cooldown=60)
+    engine = FetchEngine(resilience=policy)
+    try:
+        server.inject_faults(2, status=502)
+        assert engine.fetch_pages([url])[url] is not None
+        assert server.requests == 3
+
+        # (Not dropped connections here: curl itself re-sends on a dropped keep-alive connection)
+        server.inject_faults(3, status=503)
+        assert engine.fetch_pages([url])[url] is None
+        assert policy.policy(url).breaker.state == OPEN
+        requests = server.requests
+        results = engine.fetch_pages([url + f"?page={i}" for i in range(10)])
+        assert all(text is None for text in results.values())
+        assert server.requests == requests
+        assert engine.stats()["rejected"] == 10
+    finally:
+        engine.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
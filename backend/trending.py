@@ -0,0 +1,129 @@
+"""
+Time-decayed trending engine for /news?filter_type=trending.
+
+Every view adds 1 to an article's score, and scores decay exponentially
+with a configurable half-life, so yesterday's hits drop off the list on
+their own. Scores are kept with forward decay (log of sum of e^(λ·t) over
+view times): an article's stored value only changes when it is viewed, and
+the ordering between articles never changes just because time passes. That
+lets a top-K heap be maintained incrementally on each view, and reading
+the trending list is a direct read of that heap.
+"""
+import heapq
+import math
+import os
+import threading
+import time
+
+TRENDING_HALF_LIFE_MINUTES = float(os.getenv("TRENDING_HALF_LIFE_MINUTES", "360"))
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "100"))
+# Decayed score an article needs to count as trending (roughly "views in the last half-life")
+TRENDING_MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", "5"))
+
+
+def _logaddexp(a, b):
+    if a == -math.inf:
+        return b
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+class TrendingEngine:
+    def __init__(self, half_life_minutes=TRENDING_HALF_LIFE_MINUTES, top_k=TRENDING_TOP_K,
+                 min_score=TRENDING_MIN_SCORE):
+        self.decay_rate = math.log(2) / (half_life_minutes * 60)  # per second
+        self.top_k = top_k
+        self.min_score = min_score
+
+        self.log_scores = {}      # link -> forward-decayed log score
+        self.members = {}         # top-K link -> its log score when it last entered/changed
+        self.heap = []            # (log score, link) min-heap over members, with stale entries
+
+        self.lock = threading.Lock()
+
+    # --- scoring ---
+
+    def _log_weight(self, at):
+        return self.decay_rate * at
+
+    def score(self, link, now=None):
+        """Decayed score of one article at `now`."""
+        now = time.time() if now is None else now
+        log_score = self.log_scores.get(link)
+        if log_score is None:
+            return 0.0
+        return math.exp(log_score - self._log_weight(now))
+
+    def record(self, link, count=1, now=None):
+        """Registers `count` views of `link` at time `now`."""
+        now = time.time() if now is None else now
+        with self.lock:
+            log_score = _logaddexp(self.log_scores.get(link, -math.inf), math.log(count) + self._log_weight(now))
+            self.log_scores[link] = log_score
+            self._offer(link, log_score)
+
+    def restore(self, link, score, updated_at):
+        """Loads a persisted decayed score (as of `updated_at`, epoch seconds)."""
+        if not score or score <= 0:
+            return
+        with self.lock:
+            log_score = math.log(score) + self._log_weight(updated_at)
+            self.log_scores[link] = _logaddexp(self.log_scores.get(link, -math.inf), log_score)
+            self._offer(link, self.log_scores[link])
+
+    # --- top-K ---
+
+    def _offer(self, link, log_score):
+        if link in self.members:
+            self.members[link] = log_score
+            heapq.heappush(self.heap, (log_score, link))
+        elif len(self.members) < self.top_k:
+            self.members[link] = log_score
+            heapq.heappush(self.heap, (log_score, link))
+        else:
+            self._drop_stale()
+            if log_score > self.heap[0][0]:
+                _, evicted = heapq.heappop(self.heap)
+                del self.members[evicted]
+                self.members[link] = log_score
+                heapq.heappush(self.heap, (log_score, link))
+
+        # Stale entries accumulate as members get re-scored; compact occasionally
+        if len(self.heap) > 4 * self.top_k:
+            self.heap = [(s, l) for l, s in self.members.items()]
+            heapq.heapify(self.heap)
+
+    def _drop_stale(self):
+        while self.heap and self.members.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def top(self, limit=None, now=None):
+        """Trending articles as [(link, decayed score)], highest first, above min_score."""
+        now = time.time() if now is None else now
+        with self.lock:
+            ranked = sorted(self.members.items(), key=lambda m: m[1], reverse=True)
+        offset = self._log_weight(now)
+        result = []
+        for link, log_score in ranked:
+            score = math.exp(log_score - offset)
+            if score < self.min_score:
+                break
+            result.append((link, score))
+            if limit and len(result) >= limit:
+                break
+        return result
+
+    def prune(self, now=None, min_score=0.01):
+        """Forgets articles whose score has decayed to (nearly) nothing. Returns how many."""
+        now = time.time() if now is None else now
+        cutoff = math.log(min_score) + self._log_weight(now)
+        with self.lock:
+            stale = [link for link, log_score in self.log_scores.items()
+                     if log_score < cutoff and link not in self.members]
+            for link in stale:
+                del self.log_scores[link]
+        return len(stale)
+
+
+# Shared engine, fed by the view counter
+TRENDING = TrendingEngine()
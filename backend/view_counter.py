@@ -0,0 +1,137 @@
+"""
+Write-behind view counter for /news/view.
+
+Clicks are absorbed in memory and written to news_analytics in periodic
+batched upserts, and view counts for /news are served from the in-memory
+map, so neither endpoint touches SQLite on the request path.
+"""
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert
+
+from database import NewsAnalytics
+from db_writer import DB_WRITER
+
+# Upper bound (seconds) on how long an increment can sit in memory before it is written.
+# This is also the most view data a crash can lose.
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+
+# Rows per upsert statement, well under SQLite's bound-parameter limit
+FLUSH_BATCH_SIZE = 400
+
+
+class ViewCounter:
+    def __init__(self, db_session_factory, flush_interval=VIEW_FLUSH_INTERVAL, trending=None, writer=DB_WRITER):
+        # Sessions for reading; writes go through the single-writer queue
+        self.db_session_factory = db_session_factory
+        self.writer = writer
+        self.flush_interval = flush_interval
+        # Optional TrendingEngine fed with every view; its scores are persisted alongside the counts
+        self.trending = trending
+        self.views = {}     # link -> total views, what readers see
+        self.pending = {}   # link -> increments not yet in the database
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def load(self):
+        """Seeds the in-memory map from news_analytics (one query at startup)."""
+        db = self.db_session_factory()
+        try:
+            rows = db.query(
+                NewsAnalytics.news_link, NewsAnalytics.views,
+                NewsAnalytics.trend_score, NewsAnalytics.trend_updated_at
+            ).all()
+        finally:
+            db.close()
+        if self.trending is not None:
+            for link, _, trend_score, trend_updated_at in rows:
+                if trend_score and trend_updated_at:
+                    self.trending.restore(link, trend_score, trend_updated_at.timestamp())
+        with self.lock:
+            loaded = {link: views or 0 for link, views, _, _ in rows}
+            # Keep increments that arrived before the load finished
+            for link, delta in self.pending.items():
+                loaded[link] = loaded.get(link, 0) + delta
+            self.views = loaded
+        print(f"View counter loaded {len(rows)} rows from news_analytics.")
+
+    def start(self):
+        self.load()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+        self._thread.start()
+        print(f"View counter started (flush every {self.flush_interval}s).")
+
+    def stop(self):
+        """Stops the flush thread and writes out whatever is still pending."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        print("View counter stopped.")
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def increment(self, link, amount=1):
+        with self.lock:
+            total = self.views.get(link, 0) + amount
+            self.views[link] = total
+            self.pending[link] = self.pending.get(link, 0) + amount
+        if self.trending is not None:
+            self.trending.record(link, amount)
+        return total
+
+    def get(self, link):
+        return self.views.get(link, 0)
+
+    def snapshot(self):
+        """The live link -> views map. Treat as read-only."""
+        return self.views
+
+    def flush(self):
+        """Writes pending increments as batched upserts. Returns the number of links written."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+            if not batch:
+                return 0
+
+            now = datetime.now()
+            rows = []
+            for link, delta in batch.items():
+                row = {"news_link": link, "views": delta}
+                if self.trending is not None:
+                    row["trend_score"] = self.trending.score(link, now.timestamp())
+                    row["trend_updated_at"] = now
+                rows.append(row)
+
+            def write(db):
+                for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                    stmt = insert(NewsAnalytics).values(rows[i:i + FLUSH_BATCH_SIZE])
+                    updates = {"views": NewsAnalytics.views + stmt.excluded.views}
+                    if self.trending is not None:
+                        updates["trend_score"] = stmt.excluded.trend_score
+                        updates["trend_updated_at"] = stmt.excluded.trend_updated_at
+                    stmt = stmt.on_conflict_do_update(index_elements=[NewsAnalytics.news_link], set_=updates)
+                    db.execute(stmt)
+
+            try:
+                self.writer.run(write)
+            except Exception as e:
+                print(f"Error flushing view counts: {e}")
+                # Put the increments back so the next flush retries them
+                with self.lock:
+                    for link, delta in batch.items():
+                        self.pending[link] = self.pending.get(link, 0) + delta
+                return 0
+
+            if self.trending is not None:
+                self.trending.prune()
+            return len(rows)